@@ -1,7 +1,8 @@
 __version__ = '0.4.0b0'
-__all__ = ['Repository', 'make_tf_dataset', 'make_torch_dataset']
+__all__ = ['Repository', 'SampleCache', 'make_tf_dataset', 'make_torch_dataset']
 
 from functools import partial
+from .cache import SampleCache
 from .repository import Repository
 
 
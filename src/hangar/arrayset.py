@@ -1,23 +1,33 @@
 import hashlib
+import json
+import math
 import os
 import warnings
+import weakref
+from collections import defaultdict
+from functools import partial
 from multiprocessing import cpu_count, get_context
 from typing import (
-    Iterator, Iterable, List, Mapping, Optional, Tuple, Union, NamedTuple)
-import json
-
+    Dict, Iterator, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union, NamedTuple)
 
 import lmdb
 import numpy as np
-import struct
 
 from .backends import BACKEND_ACCESSOR_MAP
 from .backends import backend_decoder
 from .backends import is_local_backend
 from .backends import parse_user_backend_opts
+from .backends.verification import ChecksumVerifier
+from .backends.handle_pool import HANDLE_POOL
+from .cache import SampleCache
+from .hashing import HashingEngine
+from .write_behind import WriteBehindQueue
 from .context import TxnRegister
-from .utils import cm_weakref_obj_proxy, is_suitable_user_key, is_ascii
+from .utils import cm_weakref_obj_proxy, is_suitable_user_key, is_ascii, shape_bucket
+from .records import stage_digest
 from .records.queries import RecordQuery
+from .records.sample_specs import LazySampleSpecs, SampleSpecTable
+from .records.spec_index import SpecIndex
 from .records.parsing import hash_data_db_key_from_raw_key
 from .records.parsing import generate_sample_name
 from .records.parsing import hash_schema_db_key_from_raw_key
@@ -58,7 +68,12 @@ class ArraysetDataReader(object):
                  mode: str,
                  default_schema_backend: str,
                  default_backend_opts: str,
-                 *args, **kwargs):
+                 *args,
+                 pool: Optional['ReaderWorkerPool'] = None,
+                 verifier: Optional[ChecksumVerifier] = None,
+                 lazy_specs: bool = False,
+                 spec_index: Optional[SpecIndex] = None,
+                 **kwargs):
         """Developer documentation for init method
 
         The location of the data references can be transparently specified by
@@ -89,6 +104,20 @@ class ArraysetDataReader(object):
         mode : str, optional
             mode to open the file handles in. 'r' for read only, 'a' for read/write, defaults
             to 'r'
+        pool : Optional[ReaderWorkerPool], kwarg-only
+            worker pool owned by the checkout which serves :meth:`get_batch`
+            requests. If None, batches are read sequentially in this process.
+        verifier : Optional[ChecksumVerifier], kwarg-only
+            checksum verification policy shared by all arraysets in the
+            checkout. If None, backends verify every read.
+        lazy_specs : bool, kwarg-only
+            If True (only valid in read-only mode), sample specs are resolved
+            from the record databases the first time each sample is accessed,
+            rather than all at once here. Default is False.
+        spec_index : Optional[SpecIndex], kwarg-only
+            persisted spec index of the commit being read (only used in
+            read-only mode without ``lazy_specs``). If None, spec tables are
+            always built from the record databases.
         """
         self._mode = mode
         self._path = repo_pth
@@ -102,13 +131,71 @@ class ArraysetDataReader(object):
         self._dflt_backend_opts = default_backend_opts
 
         self._is_conman: bool = False
+        self._pool = pool
+        self._verifier = verifier
+        self._zero_copy: bool = False
+        self._cache: Optional[SampleCache] = None
         self._index_expr_factory = np.s_
         self._index_expr_factory.maketuple = False
         self._contains_partial_remote_data: bool = False
 
         # -------------- Sample backend specification parsing -----------------
 
-        self._sspecs = {}
+        if lazy_specs:
+            if self._mode != 'r':
+                raise ValueError(f'lazy sample specs require read-only mode, not: {self._mode}')
+            self._sspecs = LazySampleSpecs(self._asetn, dataenv, hashenv)
+            self._sdigests = self._sspecs.digests
+            # determined when first needed; requires every spec to be resolved.
+            self._contains_partial_remote_data = None
+            used_bes = set(be for be in BACKEND_ACCESSOR_MAP if is_local_backend(be))
+        else:
+            self._sspecs = {}
+            self._sdigests = {}
+            used_bes = self._load_sample_specs(
+                dataenv, hashenv, spec_index if self._mode == 'r' else None)
+
+        # ------------------------ backend setup ------------------------------
+
+        self._fs = {}
+        for be, accessor in BACKEND_ACCESSOR_MAP.items():
+            if (self._mode == 'a') or (be in used_bes):
+                if accessor is None:
+                    continue
+                self._fs[be] = accessor(
+                    repo_path=self._path,
+                    schema_shape=self._schema_max_shape,
+                    schema_dtype=np.typeDict[self._schema_dtype_num])
+                self._fs[be].open(mode=self._mode)
+        self._configure_backends()
+
+    def _load_sample_specs(self, dataenv: lmdb.Environment, hashenv: lmdb.Environment,
+                           spec_index: Optional[SpecIndex] = None) -> set:
+        """Eagerly read and decode the backend spec of every sample in the arrayset.
+
+        Parameters
+        ----------
+        dataenv : lmdb.Environment
+            environment where the arrayset data records are stored.
+        hashenv : lmdb.Environment
+            environment where the data hash -> backend spec records are stored.
+        spec_index : Optional[SpecIndex]
+            persisted spec index of the commit (read-only mode only). If the
+            table of this arrayset has been saved it is memory mapped instead
+            of decoding every record; otherwise the table built is saved.
+
+        Returns
+        -------
+        set
+            backend format codes used by the samples of the arrayset.
+        """
+        if spec_index is not None:
+            table = spec_index.load(self._asetn)
+            if table is not None:
+                self._sspecs = table
+                self._sdigests = table.digests
+                return table.backends
+
         _TxnRegister = TxnRegister()
         hashTxn = _TxnRegister.begin_reader_txn(hashenv)
         try:
@@ -119,8 +206,20 @@ class ArraysetDataReader(object):
                 hash_ref = hashTxn.get(hashKey)
                 be_loc = backend_decoder(hash_ref)
                 self._sspecs[asetNames.data_name] = be_loc
+                self._sdigests[asetNames.data_name] = dataSpec.data_hash
                 used_bes.add(be_loc.backend)
 
+            if self._mode == 'r':
+                # samples of a committed arrayset never change; pack the specs
+                # into a compact table rather than holding millions of tuples.
+                self._sspecs = SampleSpecTable(
+                    list(self._sspecs.keys()),
+                    list(self._sspecs.values()),
+                    list(self._sdigests.values()))
+                self._sdigests = self._sspecs.digests
+                if spec_index is not None:
+                    spec_index.save(self._asetn, self._sspecs)
+
             if not all([is_local_backend(be) for be in used_bes]):
                 self._contains_partial_remote_data = True
                 warnings.warn(
@@ -129,19 +228,7 @@ class ArraysetDataReader(object):
                     f'operation is required to access these samples.', UserWarning)
         finally:
             _TxnRegister.abort_reader_txn(hashenv)
-
-        # ------------------------ backend setup ------------------------------
-
-        self._fs = {}
-        for be, accessor in BACKEND_ACCESSOR_MAP.items():
-            if (self._mode == 'a') or (be in used_bes):
-                if accessor is None:
-                    continue
-                self._fs[be] = accessor(
-                    repo_path=self._path,
-                    schema_shape=self._schema_max_shape,
-                    schema_dtype=np.typeDict[self._schema_dtype_num])
-                self._fs[be].open(mode=self._mode)
+        return used_bes
 
     def __enter__(self):
         self._is_conman = True
@@ -151,6 +238,82 @@ class ArraysetDataReader(object):
         self._is_conman = False
         return
 
+    def __getstate__(self) -> dict:
+        """ensure multiprocess operations can pickle relevant data.
+
+        Backend file handles, the sample cache, and the checkout worker pool
+        are never sent to another process; only the backend codes in use are
+        recorded, and the accessors are reopened by :meth:`__setstate__` on the
+        receiving side. Lazily resolved sample specs cannot be resolved in
+        another process (the commit record databases are only accessible from
+        this one), so every spec is resolved and sent.
+        """
+        state = self.__dict__.copy()
+        state['_fs'] = tuple(self._fs.keys())
+        state['_pool'] = None
+        state['_cache'] = None
+        # context manager methods bound to a weakproxy of this object may be
+        # set on the instance by ``cm_weakref_obj_proxy``.
+        state.pop('__enter__', None)
+        state.pop('__exit__', None)
+        if isinstance(self._sspecs, LazySampleSpecs):
+            state['_sspecs'] = dict(self._sspecs.items())
+            state['_sdigests'] = {name: self._sdigests[name] for name in state['_sspecs']}
+        elif isinstance(self._sspecs, SampleSpecTable):
+            # the digests view references the table; it is recreated on unpickle.
+            state['_sdigests'] = None
+        return state
+
+    def _worker_copy(self) -> 'ArraysetDataReader':
+        """Shallow copy of this reader which is sent to :class:`ReaderWorkerPool` workers.
+
+        Pool workers are only ever sent sample specs to read, never names, so
+        the copy holds no specs at all (the files to open at worker startup are
+        sent separately, see :meth:`_file_uids`). This avoids pickling the spec
+        table into every worker, and forcing every lazy spec to be resolved.
+        """
+        wrk = object.__new__(self.__class__)
+        wrk.__dict__.update(self.__dict__)
+        wrk._sspecs = {}
+        wrk._sdigests = {}
+        return wrk
+
+    def _file_uids(self) -> Dict[str, Set[str]]:
+        """Find the uids of the backend files containing samples of the arrayset.
+
+        For lazily resolved specs, only files of the samples resolved so far are
+        included.
+
+        Returns
+        -------
+        Dict[str, Set[str]]
+            backend format code -> set of file uids
+        """
+        if isinstance(self._sspecs, SampleSpecTable):
+            return self._sspecs.file_uids()
+        specs = self._sspecs.resolved if isinstance(self._sspecs, LazySampleSpecs) else self._sspecs
+        res = defaultdict(set)
+        for spec in specs.values():
+            if hasattr(spec, 'uid'):
+                res[spec.backend].add(spec.uid)
+        return dict(res)
+
+    def __setstate__(self, state: dict) -> None:
+        """ensure multiprocess operations can pickle relevant data.
+        """
+        used_bes = state.pop('_fs')
+        self.__dict__.update(state)
+        if isinstance(self._sspecs, SampleSpecTable):
+            self._sdigests = self._sspecs.digests
+        self._fs = {}
+        for be in used_bes:
+            self._fs[be] = BACKEND_ACCESSOR_MAP[be](
+                repo_path=self._path,
+                schema_shape=self._schema_max_shape,
+                schema_dtype=np.typeDict[self._schema_dtype_num])
+            self._fs[be].open(mode=self._mode)
+        self._configure_backends()
+
     def __getitem__(self, key: Union[str, int]) -> np.ndarray:
         """Retrieve a sample with a given key, convenience method for dict style access.
 
@@ -269,6 +432,9 @@ class ArraysetDataReader(object):
     def contains_remote_references(self) -> bool:
         """Bool indicating if all samples exist locally or if some reference remote sources.
         """
+        if self._contains_partial_remote_data is None:
+            self._contains_partial_remote_data = not all(
+                is_local_backend(spec) for spec in self._sspecs.values())
         return bool(self._contains_partial_remote_data)
 
     @property
@@ -307,6 +473,78 @@ class ArraysetDataReader(object):
         """
         return self._dflt_backend_opts
 
+    @property
+    def zero_copy(self) -> bool:
+        """Bool indicating if reads return read-only views instead of copies.
+
+        Off by default. When enabled (only possible for arraysets in a
+        read-only checkout), backends which support it return arrays which
+        directly view the data files on disk (via the OS page cache) rather
+        than copying each sample into a new array. The returned arrays have
+        their ``WRITEABLE`` flag cleared; call ``.copy()`` on a sample if it
+        needs to be modified.
+
+        This is most useful for large fixed shape arraysets stored in the
+        ``NUMPY_10`` backend, where it halves the memory bandwidth of a read
+        and lets many processes reading the same files share memory. Backends
+        which cannot provide views continue to return copies. Samples
+        retrieved by the :meth:`get_batch` worker pool are always copied when
+        they are sent back to the calling process.
+
+        Raises
+        ------
+        PermissionError
+            If enabled for an arrayset in a write-enabled checkout.
+        TypeError
+            If the value set is not a bool.
+        """
+        return self._zero_copy
+
+    @zero_copy.setter
+    def zero_copy(self, value: bool):
+        if not isinstance(value, bool):
+            raise TypeError(f'zero_copy value: {value} must be bool, not {type(value)}')
+        if value and self.iswriteable:
+            raise PermissionError(
+                f'zero_copy reads are only allowed for arraysets in read-only checkouts')
+        self._zero_copy = value
+        self._configure_backends()
+
+    @property
+    def sample_cache(self) -> Optional[SampleCache]:
+        """In-process cache of decoded sample data used by this arrayset (if any).
+
+        Unset (None) by default. When a :class:`~hangar.cache.SampleCache` is
+        set, :meth:`get` and :meth:`get_batch` serve samples from the cache
+        when possible, and add samples read from the backends to it. The cache
+        is keyed by the data hash digest of sample content, so a single
+        instance can be shared by many arraysets and checkouts. Arrays
+        returned from a cache are read-only.
+
+        Set to None to stop using a cache.
+
+        Raises
+        ------
+        TypeError
+            If the value set is not a :class:`~hangar.cache.SampleCache` or None.
+        """
+        return self._cache
+
+    @sample_cache.setter
+    def sample_cache(self, value: Optional[SampleCache]):
+        if not isinstance(value, (SampleCache, type(None))):
+            raise TypeError(f'sample_cache: {value} must be `SampleCache` or None')
+        self._cache = value
+
+    def _configure_backends(self):
+        """Apply arrayset level read options to the backend accessors supporting them.
+        """
+        for accessor in self._fs.values():
+            if hasattr(accessor, 'zero_copy'):
+                accessor.zero_copy = self._zero_copy
+            if (self._verifier is not None) and hasattr(accessor, 'verifier'):
+                accessor.verifier = self._verifier
+
     def keys(self, local: bool = False) -> Iterator[Union[str, int]]:
         """generator which yields the names of every sample in the arrayset
 
@@ -402,6 +640,45 @@ class ArraysetDataReader(object):
                 if is_local_backend(be):
                     yield (name, self.get(name))
 
+    def shape_buckets(self, bucket_width: int = 1) -> Dict[Tuple[int], List[Union[str, int]]]:
+        """Index of the sample names in the arrayset grouped by the shape of their data.
+
+        Samples whose shapes fall in the same bucket (see
+        :func:`~hangar.utils.shape_bucket`) are grouped together, so that a
+        loader can draw batches of samples with the same (or a similar)
+        shape, and stack them with little or no padding. Only samples whose
+        data is available on the local disk are included.
+
+        When written to the ``PACK_30`` backend with a matching
+        ``bucket_width`` backend option, samples of a bucket are stored back
+        to back and are read together in one operation by :meth:`get_batch`.
+
+        Parameters
+        ----------
+        bucket_width : int, optional
+            width of the range of sizes of each dimension in a bucket, by
+            default 1 (a bucket per shape).
+
+        Returns
+        -------
+        Dict[Tuple[int], List[Union[str, int]]]
+            bucket shape -> names of the samples in the bucket. For
+            ``bucket_width = 1``, this is the shape of every sample in the
+            bucket; otherwise it is the max shape of any sample in it.
+
+        Raises
+        ------
+        ValueError
+            If ``bucket_width`` is not an int > 0.
+        """
+        if not isinstance(bucket_width, int) or (bucket_width <= 0):
+            raise ValueError(f'bucket_width: {bucket_width} must be an int > 0')
+        buckets = defaultdict(list)
+        for name, spec in tuple(self._sspecs.items()):
+            if is_local_backend(spec):
+                buckets[shape_bucket(spec.shape, bucket_width)].append(name)
+        return dict(buckets)
+
     def get(self, name: Union[str, int]) -> np.ndarray:
         """Retrieve a sample in the arrayset with a specific name.
 
@@ -436,7 +713,12 @@ class ArraysetDataReader(object):
         """
         try:
             spec = self._sspecs[name]
-            data = self._fs[spec.backend].read_data(spec)
+            if self._cache is None:
+                return self._fs[spec.backend].read_data(spec)
+            digest = self._sdigests[name]
+            data = self._cache.get(digest)
+            if data is None:
+                data = self._cache.put(digest, self._fs[spec.backend].read_data(spec))
             return data
         except KeyError:
             raise KeyError(f'HANGAR KEY ERROR:: data: {name} not in aset: {self._asetn}')
@@ -452,8 +734,15 @@ class ArraysetDataReader(object):
         be called in parallel via multithread/process application code; This
         method has been seen to drastically decrease retrieval time of sample
         batches (as compared to looping over single sample names sequentially).
-        Internally it implements a multiprocess pool of workers (managed by
-        hangar) to simplify application developer workflows.
+        Internally it uses a multiprocess pool of workers (managed by hangar) to
+        simplify application developer workflows.
+
+        For read-only checkouts, the pool is owned by the checkout object. It
+        is started on the first call, reused by every subsequent call (from any
+        arrayset in the checkout), and shut down when the checkout is closed.
+        Each worker receives the arrayset sample specifications and opens the
+        backend file handles only once, at startup. Changing ``n_cpus`` or
+        ``start_method`` between calls restarts the pool.
 
         Parameters
         ----------
@@ -485,13 +774,216 @@ class ArraysetDataReader(object):
         ------
         KeyError
             if the arrayset does not contain data with the provided name
+
+        Notes
+        -----
+        Write-enabled checkouts do not own a long lived worker pool (the staged
+        data changes between calls), so a pool is started for every call and
+        shut down before it returns, as are the pools of readers which are not
+        owned by a checkout.
         """
         n_jobs = n_cpus if isinstance(n_cpus, int) else int(cpu_count() / 2)
-        with get_context(start_method).Pool(n_jobs) as p:
-            data = p.map(self.get, names)
+        if self._cache is None:
+            return self._fetch_batch(names, n_jobs, start_method)
+
+        names = list(names)
+        try:
+            digests = [self._sdigests[name] for name in names]
+        except KeyError as e:
+            raise KeyError(f'HANGAR KEY ERROR:: data: {e.args[0]} not in aset: {self._asetn}')
+        data = [self._cache.get(digest) for digest in digests]
+        missing = [idx for idx, arr in enumerate(data) if arr is None]
+        if missing:
+            fetched = self._fetch_batch([names[idx] for idx in missing], n_jobs, start_method)
+            for idx, arr in zip(missing, fetched):
+                data[idx] = self._cache.put(digests[idx], arr)
+        return data
+
+    def _fetch_batch(self, names: Iterable[Union[str, int]], n_jobs: int,
+                     start_method: str) -> List[np.ndarray]:
+        """Read a batch of samples from the backends, in the worker pool if possible.
+        """
+        try:
+            specs = [self._sspecs[name] for name in names]
+        except KeyError as e:
+            raise KeyError(f'HANGAR KEY ERROR:: data: {e.args[0]} not in aset: {self._asetn}')
+
+        if n_jobs == 1:
+            data = self._read_specs(specs)
+        elif self._pool is None:
+            with get_context(start_method).Pool(
+                    n_jobs, initializer=_reader_worker_init,
+                    initargs=({self._asetn: self._worker_copy()},
+                              {self._asetn: self._file_uids()})) as pool:
+                data = _map_spec_chunks(pool, self._asetn, specs, n_jobs)
+        else:
+            data = self._pool.map(self._asetn, specs, n_jobs=n_jobs, start_method=start_method)
+        return data
+
+    def _read_specs(self, specs: List[tuple]) -> List[np.ndarray]:
+        """Read the data of a batch of sample specs in this process.
+
+        Sample specs are grouped by backend so that each backend accessor can
+        service it's share of the batch at once (coalescing reads where the
+        storage layout allows) via ``read_data_batch``. Backends which do not
+        implement a batch method fall back to reading samples one at a time.
+        """
+        backendPositions = defaultdict(list)
+        for pos, spec in enumerate(specs):
+            backendPositions[spec.backend].append(pos)
+
+        data = [None] * len(specs)
+        for backend, positions in backendPositions.items():
+            accessor = self._fs[backend]
+            beSpecs = [specs[pos] for pos in positions]
+            if hasattr(accessor, 'read_data_batch'):
+                beData = accessor.read_data_batch(beSpecs)
+            else:
+                beData = [accessor.read_data(spec) for spec in beSpecs]
+            for pos, arr in zip(positions, beData):
+                data[pos] = arr
         return data
 
 
+"""
+Worker pool serving batch reads for read-only checkouts
+--------------------------------------------------------
+"""
+
+# arrayset accessors unpickled in a worker process by :func:`_reader_worker_init`
+_WORKER_ARRAYSETS: Mapping[str, ArraysetDataReader] = {}
+
+
+def _reader_worker_init(arraysets: Mapping[str, ArraysetDataReader],
+                        file_uids: Mapping[str, Dict[str, Set[str]]]) -> None:
+    """Set up the arrayset accessors available to a pool worker process.
+
+    Called exactly once as the initializer of each worker process. The
+    accessors passed in have been pickled by the parent process, which
+    reopens the backend accessors (see :meth:`ArraysetDataReader.__setstate__`);
+    any file which contains samples of the arrayset is opened here so that the
+    cost is not paid on the first read.
+
+    Parameters
+    ----------
+    arraysets : Mapping[str, ArraysetDataReader]
+        mapping of arrayset name -> reader accessor object.
+    file_uids : Mapping[str, Dict[str, Set[str]]]
+        mapping of arrayset name -> backend code -> uids of files to open.
+    """
+    _WORKER_ARRAYSETS.clear()
+    _WORKER_ARRAYSETS.update(arraysets)
+    for asetn, aset in arraysets.items():
+        for be, accessor in aset._fs.items():
+            for uid in file_uids[asetn].get(be, ()):
+                fp = accessor.rFp.get(uid)
+                if isinstance(fp, partial):
+                    accessor.rFp[uid] = fp()
+                    HANDLE_POOL.acquire(accessor, uid)
+
+
+def _reader_worker_read_specs(aset_name: str, specs: List[tuple]) -> List[np.ndarray]:
+    """Read a chunk of sample specs from an arrayset inside a pool worker process.
+    """
+    return _WORKER_ARRAYSETS[aset_name]._read_specs(specs)
+
+
+def _map_spec_chunks(pool, aset_name: str, specs: List[tuple], n_jobs: int) -> List[np.ndarray]:
+    """Split ``specs`` into one contiguous chunk per worker, and read each as a batch.
+    """
+    chunkSize = max(1, math.ceil(len(specs) / n_jobs))
+    chunks = [specs[i:i + chunkSize] for i in range(0, len(specs), chunkSize)]
+    chunkData = pool.map(partial(_reader_worker_read_specs, aset_name), chunks)
+    return [arr for chunk in chunkData for arr in chunk]
+
+
+class ReaderWorkerPool(object):
+    """Long lived process pool serving :meth:`ArraysetDataReader.get_batch`.
+
+    One instance is owned by every :class:`~.checkout.ReaderCheckout`. Creating
+    a process pool, pickling every reader into it, and reopening file handles
+    is far more expensive than reading a typical batch of samples. Instead, the
+    pool is started lazily on the first batch request and then reused until
+    :meth:`close` is called.
+
+    Parameters
+    ----------
+    arraysets : Mapping[str, ArraysetDataReader]
+        arrayset name -> reader accessor object for every arrayset in the
+        checkout. Each reader is given a (weak) reference to this pool.
+    """
+
+    def __init__(self, arraysets: Mapping[str, ArraysetDataReader]):
+        self._arraysets = arraysets
+        self._pool = None
+        self._n_jobs: Optional[int] = None
+        self._start_method: Optional[str] = None
+        for aset in self._arraysets.values():
+            aset._pool = weakref.proxy(self)
+
+    @property
+    def is_running(self) -> bool:
+        """Bool indicating if worker processes are currently alive.
+        """
+        return self._pool is not None
+
+    def _start(self, n_jobs: int, start_method: str):
+        self._pool = get_context(start_method).Pool(
+            n_jobs, initializer=_reader_worker_init,
+            initargs=({k: v._worker_copy() for k, v in self._arraysets.items()},
+                      {k: v._file_uids() for k, v in self._arraysets.items()}))
+        self._n_jobs = n_jobs
+        self._start_method = start_method
+
+    def map(self, aset_name: str, specs: List[tuple], *,
+            n_jobs: int, start_method: str) -> List[np.ndarray]:
+        """Read samples from an arrayset with the worker processes.
+
+        ``specs`` are split into one contiguous chunk per worker, and each
+        worker reads it's chunk as a single batch.
+
+        Parameters
+        ----------
+        aset_name : str
+            name of the arrayset to read from
+        specs : List[tuple]
+            backend data hash specs of the samples to read
+        n_jobs : int, kwarg-only
+            number of worker processes the pool should have. If the running
+            pool has a different size it is restarted.
+        start_method : str, kwarg-only
+            process start method of the pool. If the running pool was started
+            with a different method it is restarted.
+
+        Returns
+        -------
+        List[np.ndarray]
+            sample data in the same order as ``specs``.
+        """
+        if (n_jobs, start_method) != (self._n_jobs, self._start_method):
+            self.close()
+        if self._pool is None:
+            self._start(n_jobs, start_method)
+        return _map_spec_chunks(self._pool, aset_name, specs, n_jobs)
+
+    def close(self):
+        """Shut down all worker processes (if running).
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+        self._pool = None
+        self._n_jobs = None
+        self._start_method = None
+
+
+# attributes of :class:`ArraysetDataWriter` which are not sent to batch read workers
+_WRITER_ONLY_ATTRS = frozenset((
+    '_write_behind', '_wb_waiting', '_wb_names', '_stagehashenv', '_hasher', '_dataenv',
+    '_hashenv', '_TxnRegister', '_hashTxn', '_dataTxn', '_stageHashTxn', '_sspecs_map',
+    '_sdigests_map'))
+
+
 class ArraysetDataWriter(ArraysetDataReader):
     """Class implementing methods to write data to a arrayset.
 
@@ -507,7 +999,10 @@ class ArraysetDataWriter(ArraysetDataReader):
 
     def __init__(self,
                  stagehashenv: lmdb.Environment,
-                 *args, **kwargs):
+                 *args,
+                 hasher: Optional[HashingEngine] = None,
+                 write_behind: Optional[WriteBehindQueue] = None,
+                 **kwargs):
         """Developer documentation for init method.
 
         Extends the functionality of the ArraysetDataReader class. The __init__
@@ -520,15 +1015,28 @@ class ArraysetDataWriter(ArraysetDataReader):
                 db where the newly added staged hash data records are stored
             default_schema_backend : str
                 backend code to act as default where new data samples are added.
+            hasher : Optional[HashingEngine], kwarg-only
+                engine computing sample digests and checksums, shared by all
+                arraysets in the checkout. If None, one is created for this
+                arrayset.
+            write_behind : Optional[WriteBehindQueue], kwarg-only
+                if not None, new sample data is written to the backend by the
+                background thread of this queue (shared by all arraysets in the
+                checkout) rather than by :meth:`add` itself.
             **kwargs:
                 See args of :class:`ArraysetDataReader`
         """
+        # digest -> names, and name -> digest of samples queued for write-behind
+        self._write_behind = write_behind
+        self._wb_waiting: Dict[str, List[Union[str, int]]] = {}
+        self._wb_names: Dict[Union[str, int], str] = {}
 
         super().__init__(*args, **kwargs)
 
         self._fs[self._dflt_backend].backend_opts = self._dflt_backend_opts
 
         self._stagehashenv = stagehashenv
+        self._hasher = hasher if hasher is not None else HashingEngine()
         self._dataenv: lmdb.Environment = kwargs['dataenv']
         self._hashenv: lmdb.Environment = kwargs['hashenv']
 
@@ -538,20 +1046,83 @@ class ArraysetDataWriter(ArraysetDataReader):
 
     def __enter__(self):
         self._is_conman = True
-        self._hashTxn = self._TxnRegister.begin_writer_txn(self._hashenv)
-        self._dataTxn = self._TxnRegister.begin_writer_txn(self._dataenv)
-        self._stageHashTxn = self._TxnRegister.begin_writer_txn(self._stagehashenv)
+        self._hashTxn, self._dataTxn, self._stageHashTxn = self._begin_record_txns()
         for k in self._fs.keys():
             self._fs[k].__enter__()
         return self
 
     def __exit__(self, *exc):
         self._is_conman = False
-        self._hashTxn = self._TxnRegister.commit_writer_txn(self._hashenv)
-        self._dataTxn = self._TxnRegister.commit_writer_txn(self._dataenv)
-        self._stageHashTxn = self._TxnRegister.commit_writer_txn(self._stagehashenv)
-        for k in self._fs.keys():
-            self._fs[k].__exit__(*exc)
+        try:
+            self._flush_write_behind()
+        finally:
+            self._commit_record_txns()
+            self._hashTxn, self._dataTxn, self._stageHashTxn = None, None, None
+            for k in self._fs.keys():
+                self._fs[k].__exit__(*exc)
+
+    @property
+    def _sspecs(self):
+        # samples queued for write-behind must be stored before specs are read
+        self._flush_write_behind()
+        return self._sspecs_map
+
+    @_sspecs.setter
+    def _sspecs(self, value):
+        self._sspecs_map = value
+
+    @property
+    def _sdigests(self):
+        self._flush_write_behind()
+        return self._sdigests_map
+
+    @_sdigests.setter
+    def _sdigests(self, value):
+        self._sdigests_map = value
+
+    def _begin_record_txns(self) -> Tuple[lmdb.Transaction, lmdb.Transaction, lmdb.Transaction]:
+        """Begin (or join) the hash, data, and staged hash record write transactions.
+        """
+        return (self._TxnRegister.begin_writer_txn(self._hashenv),
+                self._TxnRegister.begin_writer_txn(self._dataenv),
+                self._TxnRegister.begin_writer_txn(self._stagehashenv))
+
+    def _commit_record_txns(self):
+        """Commit (or leave) the transactions opened by :meth:`_begin_record_txns`.
+        """
+        self._TxnRegister.commit_writer_txn(self._hashenv)
+        self._TxnRegister.commit_writer_txn(self._dataenv)
+        self._TxnRegister.commit_writer_txn(self._stagehashenv)
+
+    def _worker_copy(self) -> ArraysetDataReader:
+        """Reader copy of this writer which is sent to the workers of a batch read.
+
+        Record database environments, transactions, and the write-behind queue
+        are never sent to another process; the copy only reads sample specs
+        (of data already stored by the backends) it is sent. Samples queued
+        for write-behind are stored, and backends buffering writes are flushed
+        first, so the workers can read every sample written so far.
+        """
+        self._flush_write_behind()
+        for accessor in self._fs.values():
+            if hasattr(accessor, 'flush'):
+                accessor.flush()
+        wrk = object.__new__(ArraysetDataReader)
+        wrk.__dict__.update({k: v for k, v in self.__dict__.items() if k not in _WRITER_ONLY_ATTRS})
+        wrk._sspecs = {}
+        wrk._sdigests = {}
+        return wrk
+
+    def _flush_write_behind(self):
+        """Wait for samples of this arrayset queued for write-behind to be stored.
+
+        Raises
+        ------
+        RuntimeError
+            If a sample queued for write-behind could not be written.
+        """
+        if self._wb_waiting:
+            self._write_behind.flush()
 
     def __setitem__(self, key: Union[str, int], value: np.ndarray) -> Union[str, int]:
         """Store a piece of data in a arrayset. Convenience method to :meth:`add`.
@@ -656,9 +1227,11 @@ class ArraysetDataWriter(ArraysetDataReader):
 
         if self._is_conman:
             raise RuntimeError('Cannot call method inside arrayset context manager.')
+        self._flush_write_behind()
 
         proto = np.zeros(self.shape, dtype=self.dtype)
-        beopts = parse_user_backend_opts(backend_opts=backend_opts, prototype=proto)
+        beopts = parse_user_backend_opts(backend_opts=backend_opts, prototype=proto,
+                                         variable_shape=self.variable_shape)
 
         # ----------- Determine schema format details -------------------------
 
@@ -682,7 +1255,7 @@ class ArraysetDataWriter(ArraysetDataReader):
         hashTxn = TxnRegister().begin_writer_txn(self._hashenv)
         hashSchemaKey = hash_schema_db_key_from_raw_key(schema_hash)
         hashSchemaVal = asetSchemaVal
-        dataTxn.put(asetSchemaKey, asetSchemaVal)
+        stage_digest.put_record(dataTxn, asetSchemaKey, asetSchemaVal)
         hashTxn.put(hashSchemaKey, hashSchemaVal, overwrite=False)
         TxnRegister().commit_writer_txn(self._dataenv)
         TxnRegister().commit_writer_txn(self._hashenv)
@@ -696,6 +1269,7 @@ class ArraysetDataWriter(ArraysetDataReader):
             self._fs[beopts.backend].close()
         self._fs[beopts.backend].open(mode=self._mode)
         self._fs[beopts.backend].backend_opts = beopts.opts
+        self._configure_backends()
         self._dflt_backend = beopts.backend
         self._dflt_backend_opts = beopts.opts
         self._dflt_schema_hash = schema_hash
@@ -739,6 +1313,21 @@ class ArraysetDataWriter(ArraysetDataReader):
         ValueError
             If the datatype of the input data does not match the specified data type of
             the arrayset
+        RuntimeError
+            In write-behind mode, if a previously added sample could not be
+            written.
+
+        Notes
+        -----
+        If the checkout was opened in write-behind mode, a copy of a sample with
+        new content is queued to be written in the background and this method
+        returns without waiting for it. Reading the arrayset (or committing)
+        waits for the queued samples to be stored first.
+
+        Otherwise, the digest and checksum of the sample are computed
+        concurrently, but the backend write happens synchronously once both are
+        known. Use :meth:`add_batch` / :meth:`add_stack` (or write-behind mode)
+        to overlap hashing with the backend writes of other samples.
         """
 
         # ------------------------ argument type checking ---------------------
@@ -759,6 +1348,9 @@ class ArraysetDataWriter(ArraysetDataReader):
         except ValueError as e:
             raise e from None
 
+        if self._write_behind is not None:
+            return self._add_write_behind(data, name)
+
         # --------------------- add data to storage backend -------------------
 
         try:
@@ -766,9 +1358,7 @@ class ArraysetDataWriter(ArraysetDataReader):
             if tmpconman:
                 self.__enter__()
 
-            hasher = hashlib.blake2b(data, digest_size=20)
-            hasher.update(struct.pack(f'<{len(data.shape)}QB', *data.shape, data.dtype.num))
-            full_hash = hasher.hexdigest()
+            full_hash, checksum = self._hasher.hash(data)
             hashKey = hash_data_db_key_from_raw_key(full_hash)
 
             # check if data record already exists with given key
@@ -783,16 +1373,17 @@ class ArraysetDataWriter(ArraysetDataReader):
             # write new data if data hash does not exist
             existingHashVal = self._hashTxn.get(hashKey, default=False)
             if existingHashVal is False:
-                hashVal = self._fs[self._dflt_backend].write_data(data)
+                hashVal = self._fs[self._dflt_backend].write_data(data, checksum=checksum)
                 self._hashTxn.put(hashKey, hashVal)
                 self._stageHashTxn.put(hashKey, hashVal)
                 self._sspecs[name] = backend_decoder(hashVal)
             else:
                 self._sspecs[name] = backend_decoder(existingHashVal)
+            self._sdigests[name] = full_hash
 
             # add the record to the db
             dataRecVal = data_record_db_val_from_raw_val(full_hash)
-            self._dataTxn.put(dataRecKey, dataRecVal)
+            stage_digest.put_record(self._dataTxn, dataRecKey, dataRecVal)
 
         finally:
             if tmpconman:
@@ -800,6 +1391,326 @@ class ArraysetDataWriter(ArraysetDataReader):
 
         return name
 
+    def _add_write_behind(self, data: np.ndarray, name: Union[str, int]) -> Union[str, int]:
+        """Store a (validated) sample, queueing new content for write-behind.
+
+        Records of samples whose content is already stored are written
+        immediately. Otherwise the sample is queued, and it's records are
+        written by :meth:`_store_written` once the backend write completes.
+        """
+        self._write_behind.apply()
+        digest = self._hasher.digests([data])[0]
+        queuedDigest = self._wb_names.get(name)
+        if queuedDigest == digest:
+            return name
+
+        hashTxn, dataTxn, _ = self._begin_record_txns()
+        try:
+            if queuedDigest is None:
+                dataRecKey = data_record_db_key_from_raw_key(self._asetn, name)
+                existingDataRecVal = dataTxn.get(dataRecKey, default=False)
+                if existingDataRecVal:
+                    existingDataRec = data_record_raw_val_from_db_val(existingDataRecVal)
+                    if digest == existingDataRec.data_hash:
+                        return name
+
+            if digest in self._wb_waiting:
+                self._wb_waiting[digest].append(name)
+                self._wb_names[name] = digest
+                return name
+
+            hashKey = hash_data_db_key_from_raw_key(digest)
+            existingHashVal = hashTxn.get(hashKey, default=False)
+            if existingHashVal is not False:
+                self._wb_names.pop(name, None)
+                self._store_sample_record(dataTxn, name, digest, existingHashVal)
+                return name
+        finally:
+            self._commit_record_txns()
+
+        # the caller is free to modify it's array once this method returns
+        data = data.copy()
+        accessor = self._fs[self._dflt_backend]
+        hasher = self._hasher
+
+        def write():
+            checksum = hasher.checksums([data])[0].result()
+            return accessor.write_data(data, checksum=checksum)
+
+        self._wb_waiting[digest] = [name]
+        self._wb_names[name] = digest
+        try:
+            self._write_behind.submit(
+                write, partial(self._store_written, digest), sync=accessor.__exit__)
+        except RuntimeError:
+            del self._wb_waiting[digest]
+            del self._wb_names[name]
+            raise
+        return name
+
+    def _store_written(self, digest: str, hashVal: Optional[bytes]):
+        """Write the records of samples whose content was written behind.
+
+        Parameters
+        ----------
+        digest : str
+            data hash digest of the content written.
+        hashVal : Optional[bytes]
+            db value of the backend location the content was written to, or
+            None if the write failed.
+        """
+        waiting = dict.fromkeys(self._wb_waiting.pop(digest))
+        names = [n for n in waiting if self._wb_names.get(n) == digest]
+        for name in names:
+            del self._wb_names[name]
+        if hashVal is None:
+            return
+
+        hashTxn, dataTxn, stageHashTxn = self._begin_record_txns()
+        try:
+            hashKey = hash_data_db_key_from_raw_key(digest)
+            hashTxn.put(hashKey, hashVal)
+            stageHashTxn.put(hashKey, hashVal)
+            for name in names:
+                self._store_sample_record(dataTxn, name, digest, hashVal)
+        finally:
+            self._commit_record_txns()
+
+    def _store_sample_record(self, dataTxn: lmdb.Transaction, name: Union[str, int],
+                             digest: str, hashVal: bytes):
+        dataRecKey = data_record_db_key_from_raw_key(self._asetn, name)
+        stage_digest.put_record(dataTxn, dataRecKey, data_record_db_val_from_raw_val(digest))
+        self._sspecs_map[name] = backend_decoder(hashVal)
+        self._sdigests_map[name] = digest
+
+    def add_batch(self, data: Sequence[np.ndarray],
+                  names: Optional[Sequence[Union[str, int]]] = None) -> List[Union[str, int]]:
+        """Store many samples in the arrayset with a single set of bulk operations.
+
+        Equivalent to calling :meth:`add` for each ``(name, array)`` pair, but
+        much faster for large numbers of samples:
+
+        *  every sample is validated before any data is written; if one is
+           invalid, nothing is stored.
+        *  samples are hashed concurrently (in threads) when they are large.
+        *  existing sample records and data hashes are looked up with cursors
+           in sorted key order.
+        *  samples whose content is not yet stored are handed to the backend as
+           one batch write.
+        *  all records are written with a single ``putmulti`` per database.
+
+        If a name occurs more than once, the last sample given for it is
+        stored. Samples with identical content are only written once.
+
+        Parameters
+        ----------
+        data : Sequence[:class:`numpy.ndarray`]
+            samples to store in the arrayset.
+        names : Optional[Sequence[Union[str, int]]], optional
+            name of each sample, required for (and only used by) arraysets
+            with named samples. by default None
+
+        Returns
+        -------
+        List[Union[str, int]]
+            sample names of the stored data, in the order given (or generated).
+
+        Raises
+        ------
+        ValueError
+            If any name or sample is invalid for the arrayset; see :meth:`add`.
+        ValueError
+            If the number of names and samples differ.
+        """
+
+        # ------------------------ argument type checking ---------------------
+
+        data = list(data)
+        names = self._batch_names(names, len(data))
+        for name, arr in zip(names, data):
+            isCompat = self._verify_array_compatible(arr)
+            if not isCompat.compatible:
+                raise ValueError(f'sample: {name} {isCompat.reason}')
+
+        self._store_batch(names, data)
+        return names
+
+    def add_stack(self, data: np.ndarray,
+                  names: Optional[Sequence[Union[str, int]]] = None) -> List[Union[str, int]]:
+        """Store every row of a stacked array as a sample of a fixed shape arrayset.
+
+        Equivalent to ``add_batch(list(data), names)``, but the rows are never
+        split into separate arrays: consecutive rows are written to the backend
+        storage with a single call per collection (ie. an hdf5 dataset or numpy
+        memmap file). Collection and file boundaries are rolled over as
+        needed, and all records are written in one transaction.
+
+        Parameters
+        ----------
+        data : :class:`numpy.ndarray`
+            "C" contiguous array of shape ``(N, *aset.shape)`` whose rows are
+            the samples to store.
+        names : Optional[Sequence[Union[str, int]]], optional
+            name of each of the ``N`` samples, required for (and only used by)
+            arraysets with named samples. by default None
+
+        Returns
+        -------
+        List[Union[str, int]]
+            sample names of the stored data, in row order.
+
+        Raises
+        ------
+        ValueError
+            If the arrayset has variable shaped samples.
+        ValueError
+            If ``data`` is not a "C" contiguous array with the arrayset dtype
+            and shape ``(N, *aset.shape)``.
+        ValueError
+            If any name is invalid, or the number of names and rows differ.
+        """
+        if self._schema_variable:
+            raise ValueError(
+                f'add_stack is only supported for fixed shape arraysets, '
+                f'aset: {self._asetn} is variable shape.')
+        if not isinstance(data, np.ndarray):
+            raise ValueError(f'`data` argument type: {type(data)} != `np.ndarray`')
+        if data.shape[1:] != self._schema_max_shape:
+            raise ValueError(
+                f'data shape: {data.shape} != (N, *fixed aset shape: {self._schema_max_shape})')
+        if data.dtype.num != self._schema_dtype_num:
+            raise ValueError(
+                f'dtype: {data.dtype} != aset: {np.typeDict[self._schema_dtype_num]}.')
+        if not data.flags.c_contiguous:
+            raise ValueError(f'`data` must be "C" contiguous array.')
+
+        names = self._batch_names(names, len(data))
+        self._store_batch(names, data)
+        return names
+
+    def _batch_names(self, names: Optional[Sequence[Union[str, int]]],
+                     count: int) -> List[Union[str, int]]:
+        """Validate (or generate, for unnamed arraysets) the names of a batch of samples.
+        """
+        if self._samples_are_named:
+            names = list(names) if names is not None else []
+            if len(names) != count:
+                raise ValueError(f'number of names: {len(names)} != number of samples: {count}')
+            for name in names:
+                if not is_suitable_user_key(name):
+                    raise ValueError(
+                        f'Name provided: `{name}` type: {type(name)} is invalid. Can only '
+                        f'contain alpha-numeric or "." "_" "-" ascii characters (no whitespace) '
+                        f'or int >= 0. Must be <= 64 characters long.')
+        else:
+            names = [generate_sample_name() for _ in range(count)]
+        return names
+
+    def _store_batch(self, names: List[Union[str, int]],
+                     data: Union[Sequence[np.ndarray], np.ndarray]):
+        """Store a batch of validated samples; the last sample given for a name wins.
+
+        If ``data`` is a stacked array, the rows with new content are handed to
+        the backend as a single stacked array.
+        """
+        rows = {name: idx for idx, name in enumerate(names)}
+        if len(rows) == 0:
+            return
+        self._flush_write_behind()
+
+        # --------------------- add data to storage backend -------------------
+
+        digests = dict(zip(rows.keys(), self._hasher.digests([data[idx] for idx in rows.values()])))
+
+        try:
+            tmpconman = not self._is_conman
+            if tmpconman:
+                self.__enter__()
+
+            # skip samples whose record already exists with the same hash
+            dataRecKeys = {data_record_db_key_from_raw_key(self._asetn, n): n for n in rows}
+            with self._dataTxn.cursor() as cur:
+                for dataRecKey in sorted(dataRecKeys):
+                    if cur.set_key(dataRecKey):
+                        name = dataRecKeys[dataRecKey]
+                        if data_record_raw_val_from_db_val(cur.value()).data_hash == digests[name]:
+                            del dataRecKeys[dataRecKey]
+            if len(dataRecKeys) == 0:
+                return
+
+            # look up which data hashes are already stored
+            hashKeys, hashVals = {}, {}
+            for name in dataRecKeys.values():
+                hashKeys.setdefault(hash_data_db_key_from_raw_key(digests[name]), name)
+            with self._hashTxn.cursor() as cur:
+                for hashKey in sorted(hashKeys):
+                    if cur.set_key(hashKey):
+                        hashVals[hashKey] = cur.value()
+
+            # write the content of new data hashes in one backend batch
+            newHashKeys = [k for k in hashKeys if k not in hashVals]
+            if len(newHashKeys) > 0:
+                accessor = self._fs[self._dflt_backend]
+                newRows = [rows[hashKeys[k]] for k in newHashKeys]
+                if not isinstance(data, np.ndarray):
+                    newArrays = [data[idx] for idx in newRows]
+                elif newRows == list(range(len(data))):
+                    newArrays = data
+                else:
+                    newArrays = data[newRows]
+                checksums = self._hasher.checksums(newArrays)
+                if hasattr(accessor, 'write_data_batch'):
+                    newHashVals = accessor.write_data_batch(
+                        newArrays, checksums=[fut.result() for fut in checksums])
+                else:
+                    # later checksums are computed while earlier samples are written
+                    newHashVals = [accessor.write_data(arr, checksum=fut.result())
+                                   for arr, fut in zip(newArrays, checksums)]
+                newHashItems = list(zip(newHashKeys, newHashVals))
+                newHashItems.sort()
+                with self._hashTxn.cursor() as cur:
+                    cur.putmulti(newHashItems)
+                with self._stageHashTxn.cursor() as cur:
+                    cur.putmulti(newHashItems)
+                hashVals.update(newHashItems)
+
+            dataRecItems = []
+            for dataRecKey, name in dataRecKeys.items():
+                hashKey = hash_data_db_key_from_raw_key(digests[name])
+                self._sspecs[name] = backend_decoder(hashVals[hashKey])
+                self._sdigests[name] = digests[name]
+                dataRecItems.append((dataRecKey, data_record_db_val_from_raw_val(digests[name])))
+            dataRecItems.sort()
+            stage_digest.put_records(self._dataTxn, dataRecItems)
+
+        finally:
+            if tmpconman:
+                self.__exit__()
+
+    def update(self, other: Union[Mapping[Union[str, int], np.ndarray],
+                                  Iterable[Tuple[Union[str, int], np.ndarray]]]
+               ) -> List[Union[str, int]]:
+        """Store the samples of a mapping (or iterable of ``(name, array)`` pairs).
+
+        Dict style convenience method to :meth:`add_batch`.
+
+        .. seealso:: :meth:`add_batch`
+
+        Parameters
+        ----------
+        other : Union[Mapping[Union[str, int], np.ndarray], Iterable[Tuple[Union[str, int], np.ndarray]]]
+            samples to store, keyed by name.
+
+        Returns
+        -------
+        List[Union[str, int]]
+            sample names of the stored data.
+        """
+        pairs = list(other.items()) if isinstance(other, Mapping) else list(other)
+        names = [pair[0] for pair in pairs]
+        data = [pair[1] for pair in pairs]
+        return self.add_batch(data, names)
+
     def remove(self, name: Union[str, int]) -> Union[str, int]:
         """Remove a sample with the provided name from the arrayset.
 
@@ -836,19 +1747,21 @@ class ArraysetDataWriter(ArraysetDataReader):
         KeyError
             If a sample with the provided name does not exist in the arrayset.
         """
+        self._flush_write_behind()
         if not self._is_conman:
             self._dataTxn = self._TxnRegister.begin_writer_txn(self._dataenv)
 
         dataKey = data_record_db_key_from_raw_key(self._asetn, name)
         try:
-            isRecordDeleted = self._dataTxn.delete(dataKey)
+            isRecordDeleted = stage_digest.delete_record(self._dataTxn, dataKey)
             if isRecordDeleted is False:
                 raise KeyError(f'No sample {name} in {self._asetn}')
             del self._sspecs[name]
+            del self._sdigests[name]
             if len(self._sspecs) == 0:
                 # if this is the last data piece existing in a arrayset, remove schema
                 asetSchemaKey = arrayset_record_schema_db_key_from_raw_key(self._asetn)
-                self._dataTxn.delete(asetSchemaKey)
+                stage_digest.delete_record(self._dataTxn, asetSchemaKey)
         except KeyError as e:
             raise e
         finally:
@@ -880,7 +1793,9 @@ class Arraysets(object):
                  arraysets: Mapping[str, Union[ArraysetDataReader, ArraysetDataWriter]],
                  hashenv: Optional[lmdb.Environment] = None,
                  dataenv: Optional[lmdb.Environment] = None,
-                 stagehashenv: Optional[lmdb.Environment] = None):
+                 stagehashenv: Optional[lmdb.Environment] = None,
+                 hasher: Optional[HashingEngine] = None,
+                 write_behind: Optional[WriteBehindQueue] = None):
         """Developer documentation for init method.
 
         .. warning::
@@ -906,6 +1821,12 @@ class Arraysets(object):
             cmtrefenv for read-only checkouts.
         stagehashenv : Optional[lmdb.Environment]
             environment handle for newly added staged data hash records.
+        hasher : Optional[HashingEngine]
+            engine computing sample digests and checksums for write-enabled
+            checkouts.
+        write_behind : Optional[WriteBehindQueue]
+            queue writing sample data in the background for write-enabled
+            checkouts opened in write-behind mode.
         """
         self._mode = mode
         self._repo_pth = repo_pth
@@ -917,6 +1838,8 @@ class Arraysets(object):
             self._hashenv = hashenv
             self._dataenv = dataenv
             self._stagehashenv = stagehashenv
+            self._hasher = hasher
+            self._write_behind = write_behind
 
         self.__setup()
 
@@ -1325,7 +2248,7 @@ class Arraysets(object):
                     f'shape: {prototype.shape}. Array rank > 31 dimensions not '
                     f'allowed AND all dimension sizes must be > 0.')
 
-            beopts = parse_user_backend_opts(backend_opts, prototype)
+            beopts = parse_user_backend_opts(backend_opts, prototype, variable_shape=variable_shape)
 
         except (ValueError, LookupError) as e:
             raise e from None
@@ -1354,13 +2277,15 @@ class Arraysets(object):
         hashTxn = TxnRegister().begin_writer_txn(self._hashenv)
         hashSchemaKey = hash_schema_db_key_from_raw_key(schema_hash)
         hashSchemaVal = asetSchemaVal
-        dataTxn.put(asetSchemaKey, asetSchemaVal)
+        stage_digest.put_record(dataTxn, asetSchemaKey, asetSchemaVal)
         hashTxn.put(hashSchemaKey, hashSchemaVal, overwrite=False)
         TxnRegister().commit_writer_txn(self._dataenv)
         TxnRegister().commit_writer_txn(self._hashenv)
 
         self._arraysets[name] = ArraysetDataWriter(
             stagehashenv=self._stagehashenv,
+            hasher=self._hasher,
+            write_behind=self._write_behind,
             repo_pth=self._repo_pth,
             aset_name=name,
             default_schema_hash=schema_hash,
@@ -1400,22 +2325,14 @@ class Arraysets(object):
                 e = KeyError(f'Cannot remove: {aset_name}. Key does not exist.')
                 raise e from None
 
+            self._arraysets[aset_name]._flush_write_behind()
             self._arraysets[aset_name]._close()
             self._arraysets.__delitem__(aset_name)
 
-            with datatxn.cursor() as cursor:
-                cursor.first()
-                asetRangeKey = arrayset_record_count_range_key(aset_name)
-                recordsExist = cursor.set_range(asetRangeKey)
-                while recordsExist:
-                    k = cursor.key()
-                    if k.startswith(asetRangeKey):
-                        recordsExist = cursor.delete()
-                    else:
-                        recordsExist = False
-
+            asetRangeKey = arrayset_record_count_range_key(aset_name)
+            stage_digest.delete_range(datatxn, asetRangeKey)
             asetSchemaKey = arrayset_record_schema_db_key_from_raw_key(aset_name)
-            datatxn.delete(asetSchemaKey)
+            stage_digest.delete_record(datatxn, asetSchemaKey)
         finally:
             TxnRegister().commit_writer_txn(self._dataenv)
 
@@ -1424,7 +2341,8 @@ class Arraysets(object):
 # ------------------------ Class Factory Functions ------------------------------
 
     @classmethod
-    def _from_staging_area(cls, repo_pth, hashenv, stageenv, stagehashenv):
+    def _from_staging_area(cls, repo_pth, hashenv, stageenv, stagehashenv, hasher=None,
+                           write_behind=None):
         """Class method factory to checkout :class:`Arraysets` in write-enabled mode
 
         This is not a user facing operation, and should never be manually
@@ -1442,6 +2360,12 @@ class Arraysets(object):
             environment where staging records (dataenv) are opened in write mode.
         stagehashenv: lmdb.Environment
             environment where the staged hash records are stored in write mode
+        hasher: Optional[HashingEngine]
+            engine computing sample digests and checksums, shared by every
+            arrayset in the checkout.
+        write_behind: Optional[WriteBehindQueue]
+            if not None, queue writing sample data in the background, shared by
+            every arrayset in the checkout.
 
         Returns
         -------
@@ -1457,6 +2381,8 @@ class Arraysets(object):
         for asetName, schemaSpec in stagedSchemaSpecs.items():
             arraysets[asetName] = ArraysetDataWriter(
                 stagehashenv=stagehashenv,
+                hasher=hasher,
+                write_behind=write_behind,
                 repo_pth=repo_pth,
                 aset_name=asetName,
                 default_schema_hash=schemaSpec.schema_hash,
@@ -1470,10 +2396,12 @@ class Arraysets(object):
                 default_schema_backend=schemaSpec.schema_default_backend,
                 default_backend_opts=schemaSpec.schema_default_backend_opts)
 
-        return cls('a', repo_pth, arraysets, hashenv, stageenv, stagehashenv)
+        return cls('a', repo_pth, arraysets, hashenv, stageenv, stagehashenv,
+                   hasher, write_behind)
 
     @classmethod
-    def _from_commit(cls, repo_pth, hashenv, cmtrefenv):
+    def _from_commit(cls, repo_pth, hashenv, cmtrefenv, verifier=None, lazy_specs=False,
+                     spec_index=None):
         """Class method factory to checkout :class:`.arrayset.Arraysets` in read-only mode
 
         This is not a user facing operation, and should never be manually called
@@ -1489,6 +2417,15 @@ class Arraysets(object):
             environment where tensor data hash records are open in read-only mode.
         cmtrefenv : lmdb.Environment
             environment where staging checkout records are opened in read-only mode.
+        verifier : Optional[ChecksumVerifier]
+            checksum verification policy applied to reads from every arrayset.
+            If None, every read is verified.
+        lazy_specs : bool
+            If True, sample specs of every arrayset are resolved on demand
+            instead of when the arraysets are opened.
+        spec_index : Optional[SpecIndex]
+            persisted sample spec index of the commit; spec tables are loaded
+            from (or saved to) it. If None, nothing is persisted.
 
         Returns
         -------
@@ -1512,6 +2449,9 @@ class Arraysets(object):
                 hashenv=hashenv,
                 mode='r',
                 default_schema_backend=schemaSpec.schema_default_backend,
-                default_backend_opts=schemaSpec.schema_default_backend_opts)
+                default_backend_opts=schemaSpec.schema_default_backend_opts,
+                verifier=verifier,
+                lazy_specs=lazy_specs,
+                spec_index=spec_index)
 
         return cls('r', repo_pth, arraysets, None, None, None)
@@ -0,0 +1,164 @@
+"""Process wide limit on the number of data files held open for reading.
+
+Backend accessors open the files they read from lazily, and (previously) kept
+every one of them open until the checkout was closed. Reading from a large
+store could then run into the open file descriptor limit of the process
+(``ulimit -n``), and hold the chunk cache of every HDF5 file in memory.
+
+Every file handle a backend accessor opens for reading is registered in the
+:data:`HANDLE_POOL` (shared by all repositories and checkouts in the process).
+When more than ``max_open`` handles are open, the least recently used is
+closed by it's accessor, which keeps the path of the file around so it can be
+reopened directly the next time a sample is read from it.
+
+The ``chunk_cache_nbytes`` budget is split evenly across the handles which
+can be open at once, and accessors size the chunk cache of each HDF5 file they
+open to (at most) that share.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# maximum number of data files opened for reading at once.
+MAX_OPEN_FILES = 256
+
+# total nbytes of the chunk caches of all open HDF5 files.
+CHUNK_CACHE_BUDGET_NBYTES = 256_000_000
+
+
+class FileHandlePool(object):
+    """Least recently used set of file handles opened for reading.
+
+    Accessors registering handles must implement a ``evict_handle(uid)``
+    method, which closes the handle of file ``uid`` (and prepares to reopen it
+    on the next read). Accessors are only weakly referenced by the pool.
+
+    Parameters
+    ----------
+    max_open : int, optional
+        maximum number of handles open at once. Default is ``MAX_OPEN_FILES``.
+    chunk_cache_nbytes : int, optional, kwarg-only
+        total nbytes of the chunk caches of all open handles. Default is
+        ``CHUNK_CACHE_BUDGET_NBYTES``.
+
+    Raises
+    ------
+    ValueError
+        If ``max_open`` is not a positive integer, or ``chunk_cache_nbytes``
+        is negative.
+    """
+
+    def __init__(self, max_open: int = MAX_OPEN_FILES, *,
+                 chunk_cache_nbytes: int = CHUNK_CACHE_BUDGET_NBYTES):
+        self._max_open = None
+        self._chunk_cache_nbytes = None
+        self._handles: 'OrderedDict[Tuple[int, str], weakref.ref]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.configure(max_open=max_open, chunk_cache_nbytes=chunk_cache_nbytes)
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(max_open={self._max_open}, '
+                f'chunk_cache_nbytes={self._chunk_cache_nbytes})')
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    @property
+    def max_open(self) -> int:
+        """Maximum number of handles open at once. Read-only attribute, see :meth:`configure`.
+        """
+        return self._max_open
+
+    @property
+    def chunk_cache_nbytes(self) -> int:
+        """Chunk cache nbytes of each open handle (an even share of the total budget).
+        """
+        return self._chunk_cache_nbytes // self._max_open
+
+    def configure(self, max_open: Optional[int] = None, *,
+                  chunk_cache_nbytes: Optional[int] = None):
+        """Change the maximum number of open handles and / or the chunk cache budget.
+
+        If the maximum is lowered, the least recently used handles are closed
+        immediately. A new chunk cache budget applies to files opened after
+        the change.
+
+        Parameters
+        ----------
+        max_open : Optional[int], optional
+            maximum number of handles open at once, by default None (unchanged)
+        chunk_cache_nbytes : Optional[int], optional, kwarg-only
+            total nbytes of the chunk caches of all open handles, by default
+            None (unchanged)
+
+        Raises
+        ------
+        ValueError
+            If ``max_open`` is not a positive integer, or ``chunk_cache_nbytes``
+            is negative.
+        """
+        if max_open is not None:
+            if not isinstance(max_open, int) or (max_open <= 0):
+                raise ValueError(f'max_open: {max_open} must be an int > 0')
+        if chunk_cache_nbytes is not None:
+            if not isinstance(chunk_cache_nbytes, int) or (chunk_cache_nbytes < 0):
+                raise ValueError(f'chunk_cache_nbytes: {chunk_cache_nbytes} must be an int >= 0')
+        with self._lock:
+            if max_open is not None:
+                self._max_open = max_open
+            if chunk_cache_nbytes is not None:
+                self._chunk_cache_nbytes = chunk_cache_nbytes
+            self._evict_over_limit()
+
+    def acquire(self, owner: object, uid: str):
+        """Mark the handle of file ``uid`` opened by ``owner`` as most recently used.
+
+        Registers the handle if it was just opened, closing the least recently
+        used handle(s) if too many are open.
+
+        Parameters
+        ----------
+        owner : object
+            accessor which opened the handle.
+        uid : str
+            uid of the file opened.
+        """
+        key = (id(owner), uid)
+        with self._lock:
+            try:
+                self._handles.move_to_end(key)
+            except KeyError:
+                self._handles[key] = weakref.ref(owner, self._forget)
+                self._evict_over_limit(keep=key)
+
+    def release(self, owner: object):
+        """Forget every handle of ``owner``, ie. after the owner closed them.
+
+        Parameters
+        ----------
+        owner : object
+            accessor which opened the handles.
+        """
+        ownerId = id(owner)
+        with self._lock:
+            for key in [k for k in self._handles if k[0] == ownerId]:
+                del self._handles[key]
+
+    def _forget(self, ref: weakref.ref):
+        with self._lock:
+            for key in [k for k, v in self._handles.items() if v is ref]:
+                del self._handles[key]
+
+    def _evict_over_limit(self, keep: Optional[Tuple[int, str]] = None):
+        while len(self._handles) > self._max_open:
+            key, ref = next(iter(self._handles.items()))
+            if key == keep:
+                break
+            del self._handles[key]
+            owner = ref()
+            if owner is not None:
+                owner.evict_handle(key[1])
+
+
+HANDLE_POOL = FileHandlePool()
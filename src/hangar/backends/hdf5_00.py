@@ -14,21 +14,25 @@ Storage Method
 *  Data is written to specific subarray indexes inside an HDF5 "dataset" in a
    single HDF5 File.
 
-*  In each HDF5 File there are ``COLLECTION_COUNT`` "datasets" (named ``["0" :
-   "{COLLECTION_COUNT}"]``). These are referred to as ``"dataset number"``
+*  In each HDF5 File there are ``collection_total`` "datasets" (named ``["0" :
+   "{collection_total}"]``). These are referred to as ``"dataset number"``
 
 *  Each dataset is a zero-initialized array of:
 
    *  ``dtype: {schema_dtype}``; ie ``np.float32`` or ``np.uint8``
 
-   *  ``shape: (COLLECTION_SIZE, *{schema_shape.size})``; ie ``(500, 10)`` or
-      ``(500, 300)``. The first index in the dataset is referred to as a
+   *  ``shape: (collection_max_size, *{schema_shape.size})``; ie ``(500, 10)``
+      or ``(500, 300)``. The first index in the dataset is referred to as a
       ``collection index``. See technical note below for detailed explanation
       on why the flatten operaiton is performed.
 
 *  Compression Filters, Chunking Configuration/Options are applied globally for
    all ``datasets`` in a file at dataset creation time.
 
+*  ``collection_max_size`` and ``collection_total`` are chosen from the nbytes
+   of a schema sample when the file is created (see :func:`_collection_layout`),
+   and are recorded in the attributes of the file.
+
 Record Format
 =============
 
@@ -37,8 +41,8 @@ Fields Recorded for Each Array
 
 *  Format Code
 *  File UID
-*  Dataset Number (``0:COLLECTION_COUNT`` dataset selection)
-*  Collection Index (``0:COLLECTION_SIZE`` dataset subarray selection)
+*  Dataset Number (``0:collection_total`` dataset selection)
+*  Collection Index (``0:collection_max_size`` dataset subarray selection)
 *  Subarray Shape
 
 Separators used
@@ -100,29 +104,49 @@ Technical Notes
    required writes to chunks which do are primarily empty (worst case "C" index
    ordering), increasing read / write speeds significantly.
 
-   To overcome this, we create HDF5 datasets which have ``COLLECTION_SIZE``
+   To overcome this, we create HDF5 datasets which have ``collection_max_size``
    first dimension size, and only ONE second dimension of size
    ``schema_shape.size()`` (ie. product of all dimensions). For example an
    array schema with shape (10, 10, 3) would be stored in a HDF5 dataset of
-   shape (COLLECTION_SIZE, 300). Chunk sizes are chosen to align on the first
+   shape (collection_max_size, 300). Chunk sizes are chosen to align on the first
    dimension with a second dimension of size which fits the total data into L2
    CPU Cache (< 256 KB). On write, we use the ``np.ravel`` function to
    construct a "view" (not copy) of the array as a 1D array, and then on read
    we reshape the array to the recorded size (a copyless "view-only"
    operation). This is part of the reason that we only accept C ordered arrays
    as input to Hangar.
+
+   Each row still reserves space for the max subarray shape. Variable shaped
+   arraysets are therefore stored in the ``PACK_30`` backend by default,
+   which does not pad samples at all.
+
+*  A fixed number of samples per file makes files of tiny samples very small
+   (and numerous), and files of large samples enormous. Instead, each
+   collection holds as many samples as fit in ``TARGET_COLLECTION_NBYTES``
+   (at most ``COLLECTION_SIZE``), and each file holds as many collections as
+   fit in ``TARGET_FILE_NBYTES`` (at most ``COLLECTION_COUNT``, at least two).
+   Since the layout chosen is recorded in the file attributes and every record
+   addresses a sample by dataset number and collection index, files written
+   with any layout are read the same way.
+
+*  Files opened for reading are registered in the process wide
+   :data:`~.handle_pool.HANDLE_POOL`, which closes the least recently used
+   when too many are open (they are reopened on the next read). The chunk
+   cache of each file is sized to it's share of the pool's aggregate chunk
+   cache budget.
 """
 import math
 import os
 import re
 import time
 import logging
-from collections import ChainMap
+from collections import ChainMap, defaultdict
 from os.path import join as pjoin
 from os.path import splitext as psplitext
 from functools import partial
 from typing import (
-    MutableMapping, NamedTuple, Tuple, Optional, Union, Callable, Pattern)
+    MutableMapping, NamedTuple, Tuple, Optional, Union, Callable, Pattern,
+    List, Sequence)
 
 import numpy as np
 import h5py
@@ -141,6 +165,8 @@ from xxhash import xxh64_hexdigest
 from .. import __version__
 from .. import constants as c
 from ..utils import find_next_prime, symlink_rel, random_string, set_blosc_nthreads
+from .handle_pool import HANDLE_POOL
+from .verification import ChecksumVerifier
 
 set_blosc_nthreads()
 
@@ -148,16 +174,51 @@ set_blosc_nthreads()
 # ----------------------------- Configuration ---------------------------------
 
 
-# contents of a single hdf5 file
-COLLECTION_SIZE = 250
-COLLECTION_COUNT = 100
+# contents of a single hdf5 file, see `_collection_layout`
+COLLECTION_SIZE = 10_000  # max samples in each collection dataset
+COLLECTION_COUNT = 100  # max collection datasets in each file
+TARGET_COLLECTION_NBYTES = 8_000_000
+TARGET_FILE_NBYTES = 1_000_000_000
 
 # chunking options for compression schemes
 CHUNK_MAX_NBYTES = 255_000  # < 256 KB to fit in L2 CPU Cache
-CHUNK_MAX_RDCC_NBYTES = 100_000_000
 CHUNK_RDCC_W0 = 0.75
 
 
+def _collection_layout(sample_nbytes: int) -> Tuple[int, int]:
+    """Determine the number of samples in each collection, and collections in each file.
+
+    Collections are sized to hold about ``TARGET_COLLECTION_NBYTES`` of samples
+    (at least one, at most ``COLLECTION_SIZE``), and files to hold about
+    ``TARGET_FILE_NBYTES`` (at least two collections, at most
+    ``COLLECTION_COUNT``). The last collection of a file is never written to.
+
+    Parameters
+    ----------
+    sample_nbytes : int
+        nbytes of a sample with the (max) schema shape and dtype.
+
+    Returns
+    -------
+    Tuple[int, int]
+        number of samples in each collection, and number of collections in
+        each file.
+    """
+    sample_nbytes = max(sample_nbytes, 1)
+    collection_size = max(1, min(COLLECTION_SIZE, TARGET_COLLECTION_NBYTES // sample_nbytes))
+    collection_nbytes = collection_size * sample_nbytes
+    collection_count = max(2, min(COLLECTION_COUNT, TARGET_FILE_NBYTES // collection_nbytes + 1))
+    return (collection_size, collection_count)
+
+
+def _open_reader(file_pth: os.PathLike) -> h5py.File:
+    """Open a file for reading, with a chunk cache sized from the handle pool budget.
+    """
+    rdcc_nbytes_val = max(CHUNK_MAX_NBYTES, HANDLE_POOL.chunk_cache_nbytes)
+    return h5py.File(file_pth, 'r', swmr=True, libver='latest',
+                     rdcc_nbytes=rdcc_nbytes_val, rdcc_w0=CHUNK_RDCC_W0)
+
+
 # -------------------------------- Parser Implementation ----------------------
 
 
@@ -268,6 +329,7 @@ class HDF5_00_FileHandles(object):
         self.hMaxSize: Optional[int] = None
         self.hNextPath: Optional[int] = None
         self.hColsRemain: Optional[int] = None
+        self.verifier = ChecksumVerifier()
 
         self.slcExpr = np.s_
         self.slcExpr.maketuple = False
@@ -343,7 +405,7 @@ class HDF5_00_FileHandles(object):
             process_uids = [psplitext(x)[0] for x in os.listdir(process_dir) if x.endswith('.hdf5')]
             for uid in process_uids:
                 file_pth = pjoin(process_dir, f'{uid}.hdf5')
-                self.rFp[uid] = partial(h5py.File, file_pth, 'r', swmr=True, libver='latest')
+                self.rFp[uid] = partial(_open_reader, file_pth)
 
         if not remote_operation:
             if not os.path.isdir(self.STOREDIR):
@@ -351,7 +413,16 @@ class HDF5_00_FileHandles(object):
             store_uids = [psplitext(x)[0] for x in os.listdir(self.STOREDIR) if x.endswith('.hdf5')]
             for uid in store_uids:
                 file_pth = pjoin(self.STOREDIR, f'{uid}.hdf5')
-                self.rFp[uid] = partial(h5py.File, file_pth, 'r', swmr=True, libver='latest')
+                self.rFp[uid] = partial(_open_reader, file_pth)
+
+    def flush(self):
+        """Flush the samples written to the file open for writing to disk.
+
+        Called before samples written (but not yet committed) are read by
+        other processes.
+        """
+        if (self.mode == 'a') and (self.w_uid in self.wFp):
+            self.wFp[self.w_uid].flush()
 
     def close(self):
         """Close a file handle after writes have been completed
@@ -386,6 +457,23 @@ class HDF5_00_FileHandles(object):
             except AttributeError:
                 pass
             del self.rFp[uid]
+        HANDLE_POOL.release(self)
+
+    def evict_handle(self, uid: str):
+        """Close the handle of a file opened for reading, reopening it on the next read.
+
+        Called by the :data:`~.handle_pool.HANDLE_POOL` when too many files are
+        open.
+
+        Parameters
+        ----------
+        uid : str
+            uid of the file to close.
+        """
+        fh = self.rFp.get(uid)
+        if isinstance(fh, h5py.File):
+            self.rFp[uid] = partial(_open_reader, fh.filename)
+            fh.close()
 
     @staticmethod
     def delete_in_process_data(repo_path: os.PathLike, *, remote_operation=False) -> None:
@@ -573,14 +661,15 @@ class HDF5_00_FileHandles(object):
         # -------------------- Chunk & RDCC Vals ------------------------------
 
         sample_array = np.zeros(self.schema_shape, dtype=self.schema_dtype)
-        chunk_shape, chunk_nbytes = self._chunk_opts(
-            sample_array=sample_array, max_chunk_nbytes=CHUNK_MAX_NBYTES)
+        collection_size, collection_count = _collection_layout(sample_array.nbytes)
+        chunk_shape, chunk_nbytes = self._chunk_opts(sample_array=sample_array,
+                                                     max_chunk_nbytes=CHUNK_MAX_NBYTES)
 
-        rdcc_nbytes_val = sample_array.nbytes * COLLECTION_SIZE
+        rdcc_nbytes_val = sample_array.nbytes * collection_size
+        if rdcc_nbytes_val > HANDLE_POOL.chunk_cache_nbytes:
+            rdcc_nbytes_val = HANDLE_POOL.chunk_cache_nbytes
         if rdcc_nbytes_val < CHUNK_MAX_NBYTES:
             rdcc_nbytes_val = CHUNK_MAX_NBYTES
-        elif rdcc_nbytes_val > CHUNK_MAX_RDCC_NBYTES:
-            rdcc_nbytes_val = CHUNK_MAX_RDCC_NBYTES
 
         rdcc_nslots_guess = math.ceil(rdcc_nbytes_val / chunk_nbytes) * 100
         rdcc_nslots_prime_val = find_next_prime(rdcc_nslots_guess)
@@ -598,8 +687,8 @@ class HDF5_00_FileHandles(object):
         self.w_uid = uid
         self.hNextPath = 0
         self.hIdx = 0
-        self.hColsRemain = COLLECTION_COUNT
-        self.hMaxSize = COLLECTION_SIZE
+        self.hColsRemain = collection_count
+        self.hMaxSize = collection_size
 
         if remote_operation:
             symlink_file_path = pjoin(self.REMOTEDIR, f'{uid}.hdf5')
@@ -610,12 +699,12 @@ class HDF5_00_FileHandles(object):
         # ----------------------- Dataset Creation ----------------------------
 
         optKwargs = self._dataset_opts(**self._dflt_backend_opts)
-        for dset_num in range(COLLECTION_COUNT):
+        for dset_num in range(collection_count):
             self.wFp[uid].create_dataset(
                 f'/{dset_num}',
-                shape=(COLLECTION_SIZE, sample_array.size),
+                shape=(collection_size, sample_array.size),
                 dtype=sample_array.dtype,
-                maxshape=(COLLECTION_SIZE, sample_array.size),
+                maxshape=(collection_size, sample_array.size),
                 chunks=(1, *chunk_shape),
                 **optKwargs)
 
@@ -625,9 +714,9 @@ class HDF5_00_FileHandles(object):
         self.wFp[self.w_uid]['/'].attrs['schema_shape'] = sample_array.shape
         self.wFp[self.w_uid]['/'].attrs['schema_dtype_num'] = sample_array.dtype.num
         self.wFp[self.w_uid]['/'].attrs['next_location'] = (0, 0)
-        self.wFp[self.w_uid]['/'].attrs['collection_max_size'] = COLLECTION_SIZE
-        self.wFp[self.w_uid]['/'].attrs['collection_total'] = COLLECTION_COUNT
-        self.wFp[self.w_uid]['/'].attrs['collections_remaining'] = COLLECTION_COUNT
+        self.wFp[self.w_uid]['/'].attrs['collection_max_size'] = collection_size
+        self.wFp[self.w_uid]['/'].attrs['collection_total'] = collection_count
+        self.wFp[self.w_uid]['/'].attrs['collections_remaining'] = collection_count
         self.wFp[self.w_uid]['/'].attrs['rdcc_nbytes'] = rdcc_nbytes_val
         self.wFp[self.w_uid]['/'].attrs['rdcc_w0'] = CHUNK_RDCC_W0
         self.wFp[self.w_uid]['/'].attrs['rdcc_nslots'] = rdcc_nslots_prime_val
@@ -663,46 +752,113 @@ class HDF5_00_FileHandles(object):
         srcSlc = (self.slcExpr[dsetIdx], self.slcExpr[0:arrSize])
         destSlc = None
 
+        dsetHandle = self._read_dataset_handle(hashVal.uid, dsetCol)
         if self.schema_dtype is not None:
             destArr = np.empty((arrSize,), self.schema_dtype)
-            try:
-                self.Fp[hashVal.uid][dsetCol].read_direct(destArr, srcSlc, destSlc)
-            except TypeError:
-                self.Fp[hashVal.uid] = self.Fp[hashVal.uid]()
-                self.Fp[hashVal.uid][dsetCol].read_direct(destArr, srcSlc, destSlc)
-            except KeyError:
-                process_dir = self.STAGEDIR if self.mode == 'a' else self.STOREDIR
-                file_pth = pjoin(process_dir, f'{hashVal.uid}.hdf5')
-                if os.path.islink(file_pth):
-                    self.rFp[hashVal.uid] = h5py.File(file_pth, 'r', swmr=True, libver='latest')
-                    self.Fp[hashVal.uid][dsetCol].read_direct(destArr, srcSlc, destSlc)
-                else:
-                    raise
+            dsetHandle.read_direct(destArr, srcSlc, destSlc)
         else:
-            try:
-                destArr = self.Fp[hashVal.uid][dsetCol][srcSlc]
-            except TypeError:
-                self.Fp[hashVal.uid] = self.Fp[hashVal.uid]()
-                destArr = self.Fp[hashVal.uid][dsetCol][srcSlc]
-            except KeyError:
-                process_dir = self.STAGEDIR if self.mode == 'a' else self.STOREDIR
-                file_pth = pjoin(process_dir, f'{hashVal.uid}.hdf5')
-                if os.path.islink(file_pth):
-                    self.rFp[hashVal.uid] = h5py.File(file_pth, 'r', swmr=True, libver='latest')
-                    destArr = self.Fp[hashVal.uid][dsetCol][srcSlc]
-                else:
-                    raise
+            destArr = dsetHandle[srcSlc]
 
         out = destArr.reshape(hashVal.shape)
+        out = self._verify_checksum(out, hashVal)
+        return out
+
+    def read_data_batch(self, hashVals: Sequence[HDF5_00_DataHashSpec]) -> List[np.ndarray]:
+        """Read data for many samples, coalescing reads of neighboring rows.
+
+        Specs are grouped by the file ``uid`` and ``dataset`` collection they
+        reside in. Within a group, samples are sorted by ``dataset_idx`` and
+        each run of consecutive rows is read with a single hyperslab selection
+        into a buffer preallocated for the whole group.
+
+        Parameters
+        ----------
+        hashVals : Sequence[HDF5_00_DataHashSpec]
+            record specifications parsed from their serialized store vals in
+            lmdb.
+
+        Returns
+        -------
+        List[np.ndarray]
+            requested data, in the same order as ``hashVals``.
+        """
+        if self.schema_dtype is None:
+            return [self.read_data(hashVal) for hashVal in hashVals]
+
+        groups = defaultdict(list)
+        for pos, hashVal in enumerate(hashVals):
+            groups[(hashVal.uid, hashVal.dataset)].append(pos)
+
+        res = [None] * len(hashVals)
+        for (uid, dset), positions in groups.items():
+            positions.sort(key=lambda pos: int(hashVals[pos].dataset_idx))
+            rows = [int(hashVals[pos].dataset_idx) for pos in positions]
+            rowSize = max(int(np.prod(hashVals[pos].shape)) for pos in positions)
+            destArr = np.empty((len(positions), rowSize), self.schema_dtype)
+            dsetHandle = self._read_dataset_handle(uid, f'/{dset}')
+
+            runStart = 0
+            for runEnd in range(1, len(rows) + 1):
+                if (runEnd < len(rows)) and (rows[runEnd] == rows[runEnd - 1] + 1):
+                    continue
+                srcSlc = (self.slcExpr[rows[runStart]:rows[runEnd - 1] + 1],
+                          self.slcExpr[0:rowSize])
+                destSlc = self.slcExpr[runStart:runEnd]
+                dsetHandle.read_direct(destArr, srcSlc, destSlc)
+                runStart = runEnd
+
+            for bufIdx, pos in enumerate(positions):
+                hashVal = hashVals[pos]
+                arrSize = int(np.prod(hashVal.shape))
+                out = destArr[bufIdx, 0:arrSize].reshape(hashVal.shape)
+                res[pos] = self._verify_checksum(out, hashVal)
+        return res
+
+    def _read_file_handle(self, uid: str) -> h5py.File:
+        """Get a file opened for reading, opening (or reopening) it if needed.
+
+        Handles in ``rFp`` are registered in the :data:`~.handle_pool.HANDLE_POOL`
+        as they are used.
+        """
+        fh = self.rFp.get(uid)
+        if fh is None:
+            if uid in self.wFp:
+                return self.wFp[uid]
+            process_dir = self.STAGEDIR if self.mode == 'a' else self.STOREDIR
+            file_pth = pjoin(process_dir, f'{uid}.hdf5')
+            if not os.path.islink(file_pth):
+                raise KeyError(uid)
+            fh = self.rFp[uid] = _open_reader(file_pth)
+        elif isinstance(fh, partial):
+            fh = self.rFp[uid] = fh()
+        HANDLE_POOL.acquire(self, uid)
+        return fh
+
+    def _read_dataset_handle(self, uid: str, dsetCol: str) -> h5py.Dataset:
+        """Get a dataset in a file opened for reading, opening the file if needed.
+        """
+        return self._read_file_handle(uid)[dsetCol]
+
+    def _verify_checksum(self, out: np.ndarray, hashVal: HDF5_00_DataHashSpec) -> np.ndarray:
+        """Check the read data against the recorded hash, raising on corruption.
+
+        Whether the check is performed at all is determined by the
+        :attr:`verifier` checksum policy.
+        """
+        if not self.verifier.should_verify(hashVal):
+            return out
         if xxh64_hexdigest(out) != hashVal.checksum:
             # try casting to check if dtype does not match for all zeros case
-            out = out.astype(np.typeDict[self.Fp[hashVal.uid]['/'].attrs['schema_dtype_num']])
+            fh = self._read_file_handle(hashVal.uid)
+            out = out.astype(np.typeDict[fh['/'].attrs['schema_dtype_num']])
             if xxh64_hexdigest(out) != hashVal.checksum:
                 raise RuntimeError(
                     f'DATA CORRUPTION Checksum {xxh64_hexdigest(out)} != recorded {hashVal}')
+        self.verifier.record_verified(hashVal)
         return out
 
-    def write_data(self, array: np.ndarray, *, remote_operation: bool = False) -> bytes:
+    def write_data(self, array: np.ndarray, *, remote_operation: bool = False,
+                   checksum: Optional[str] = None) -> bytes:
         """verifies correctness of array data and performs write operation.
 
         Parameters
@@ -714,6 +870,9 @@ class HDF5_00_FileHandles(object):
             hdf5 dataset files will be created in the remote data dir instead
             of the stage directory. (default is False, which is for a regular
             access process)
+        checksum : Optional[str], optional, kwarg only
+            xxh64 checksum of ``array`` if already computed by the caller. If
+            None (default), it is computed here.
 
         Returns
         -------
@@ -721,7 +880,8 @@ class HDF5_00_FileHandles(object):
             string identifying the collection dataset and collection dim-0 index
             which the array can be accessed at.
         """
-        checksum = xxh64_hexdigest(array)
+        if checksum is None:
+            checksum = xxh64_hexdigest(array)
         if self.w_uid in self.wFp:
             self.hIdx += 1
             if self.hIdx >= self.hMaxSize:
@@ -747,3 +907,75 @@ class HDF5_00_FileHandles(object):
                                  dataset_idx=self.hIdx,
                                  shape=array.shape)
         return hashVal
+
+    def write_data_batch(self, arrays: Union[Sequence[np.ndarray], np.ndarray], *,
+                         remote_operation: bool = False,
+                         checksums: Optional[Sequence[str]] = None) -> List[bytes]:
+        """writes many arrays, filling consecutive rows of the collection datasets.
+
+        Each run of arrays with the full schema size which lands in the same
+        collection dataset is written with a single ``write_direct`` call
+        covering the whole row range, instead of one call per array. New
+        collections (and files) are started as the current one fills up.
+
+        Parameters
+        ----------
+        arrays : Union[Sequence[np.ndarray], np.ndarray]
+            tensors to write, or a "C" contiguous stacked array whose rows are
+            the tensors to write.
+        remote_operation : optional, kwarg only, bool
+            If this is a remote process which is adding data, any necessary
+            hdf5 dataset files will be created in the remote data dir instead
+            of the stage directory. (default is False, which is for a regular
+            access process)
+        checksums : Optional[Sequence[str]], optional, kwarg only
+            xxh64 checksum of each array if already computed by the caller. If
+            None (default), they are computed here.
+
+        Returns
+        -------
+        List[bytes]
+            db hash record value specifying location information of each array,
+            in the same order as ``arrays``.
+        """
+        schemaSize = int(np.prod(self.schema_shape))
+        hashVals = []
+        pos = 0
+        while pos < len(arrays):
+            if self.w_uid in self.wFp:
+                start = self.hIdx + 1
+                if start >= self.hMaxSize:
+                    start = self.hIdx = 0
+                    self.hNextPath += 1
+                    self.hColsRemain -= 1
+                    if self.hColsRemain <= 1:
+                        self.__exit__()
+                        self._create_schema(remote_operation=remote_operation)
+            else:
+                self._create_schema(remote_operation=remote_operation)
+                start = 0
+
+            run = arrays[pos:pos + self.hMaxSize - start]
+            stop = start + len(run)
+            dset = self.wFp[self.w_uid][f'/{self.hNextPath}']
+            if isinstance(run, np.ndarray) and (run[0].size == schemaSize):
+                destSlc = (self.slcExpr[start:stop], self.slcExpr[0:schemaSize])
+                dset.write_direct(run.reshape(len(run), schemaSize), None, destSlc)
+            elif all(arr.size == schemaSize for arr in run):
+                destSlc = (self.slcExpr[start:stop], self.slcExpr[0:schemaSize])
+                dset.write_direct(np.stack([np.ravel(arr) for arr in run]), None, destSlc)
+            else:
+                for idx, arr in enumerate(run, start=start):
+                    destSlc = (self.slcExpr[idx], self.slcExpr[0:arr.size])
+                    dset.write_direct(np.ravel(arr), None, destSlc)
+
+            for idx, arr in enumerate(run, start=start):
+                checksum = checksums[len(hashVals)] if checksums else xxh64_hexdigest(arr)
+                hashVals.append(hdf5_00_encode(uid=self.w_uid,
+                                               checksum=checksum,
+                                               dataset=self.hNextPath,
+                                               dataset_idx=idx,
+                                               shape=arr.shape))
+            self.hIdx = stop - 1
+            pos += len(run)
+        return hashVals
@@ -0,0 +1,252 @@
+"""Local LMDB Inline Backend Implementation, Identifier: ``LMDB_40``
+
+Backend Identifiers
+===================
+
+*  Backend: ``4``
+*  Version: ``0``
+*  Format Code: ``40``
+*  Canonical Name: ``LMDB_40``
+
+Storage Method
+==============
+
+*  The bytes of the sample are stored directly in the record value of the data
+   hash in the ``hashenv`` lmdb environment. No data files are written.
+
+*  Only samples of at most ``INLINE_MAX_NBYTES`` can be stored. Above that size,
+   the hash records would grow large enough to slow down every read of the
+   ``hashenv`` (and not just the reads of the samples stored in it).
+
+Record Format
+=============
+
+Fields Recorded for Each Array
+------------------------------
+
+*  Format Code
+*  Dtype (numpy ``dtype.str``)
+*  Data (``base64`` encoded bytes of the C contiguous array)
+*  Subarray Shape
+
+Separators used
+---------------
+
+*  ``SEP_KEY: ":"``
+*  ``SEP_HSH: "$"``
+*  ``SEP_LST: " "``
+*  ``SEP_SLC: "*"``
+
+Examples
+--------
+
+1)  Adding a piece of data:
+
+    *  Array shape (Subarray Shape): (2, 2)
+    *  Dtype: "<i2"
+    *  Data: [[1, 2], [3, 4]]
+
+    ``Record Data => "40:<i2$AQACAAMABAA=*2 2"``
+
+2)  Adding a scalar:
+
+    *  Array shape (Subarray Shape): ()
+    *  Dtype: "<f8"
+    *  Data: 1.0
+
+    ``Record Data => "40:<f8$AAAAAAAA8D8=*"``
+
+Technical Notes
+===============
+
+*  Reading a sample is a single lookup of it's hash record, which happens
+   before the backend is asked for the data; the accessor only decodes the
+   bytes already held in the record specification, without any file I/O.
+
+*  The data is ``base64`` encoded so that the record value remains printable
+   text, like the records of every other backend. lmdb verifies the integrity
+   of the pages it reads, so no checksum is recorded.
+
+*  The accessor holds no files, so there is nothing to open, close, or clean up
+   after a staging area is reset.
+"""
+import base64
+import os
+import re
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .. import constants as c
+
+
+# ----------------------------- Configuration ---------------------------------
+
+
+# max nbytes of a sample which can be stored inline in the hash record.
+INLINE_MAX_NBYTES = 128
+
+
+# -------------------------------- Parser Implementation ----------------------
+
+_FmtCode = '40'
+# match and remove the following characters: '['   ']'   '('   ')'   ','
+_ShapeFmtRE = re.compile('[,\(\)\[\]]')
+# split up a formated parsed string into unique fields
+_SplitDecoderRE = re.compile(fr'[\{c.SEP_KEY}\{c.SEP_HSH}\{c.SEP_SLC}]')
+
+
+LMDB_40_DataHashSpec = NamedTuple('LMDB_40_DataHashSpec',
+                                  [('backend', str), ('dtype', str),
+                                   ('data', str), ('shape', Tuple[int])])
+
+
+def lmdb_40_encode(dtype: str, data: str, shape: tuple) -> bytes:
+    """converts the inline data spec to an appropriate db value
+
+    Parameters
+    ----------
+    dtype : str
+        numpy ``dtype.str`` of the data sample.
+    data : str
+        base64 encoded bytes of the data sample.
+    shape : tuple
+        shape of the data sample.
+
+    Returns
+    -------
+    bytes
+        hash data db value recording all input specifications
+    """
+    out_str = f'{_FmtCode}{c.SEP_KEY}'\
+              f'{dtype}{c.SEP_HSH}{data}{c.SEP_SLC}'\
+              f'{_ShapeFmtRE.sub("", str(shape))}'
+    return out_str.encode()
+
+
+def lmdb_40_decode(db_val: bytes) -> LMDB_40_DataHashSpec:
+    """converts an inline data hash db val into an inline data python spec
+
+    Parameters
+    ----------
+    db_val : bytes
+        data hash db val
+
+    Returns
+    -------
+    LMDB_40_DataHashSpec
+        inline data hash specification containing `backend`, `dtype`, `data`,
+        and `shape` fields.
+    """
+    db_str = db_val.decode()
+    _, dtype, data, shape_vs = _SplitDecoderRE.split(db_str)
+    # if the data is of empty shape -> shape_vs = '' str.split() default value
+    # of none means split according to any whitespace, and discard empty strings
+    # from the result. So long as c.SEP_LST = ' ' this will work
+    shape = tuple(int(x) for x in shape_vs.split())
+    raw_val = LMDB_40_DataHashSpec(backend=_FmtCode,
+                                   dtype=dtype,
+                                   data=data,
+                                   shape=shape)
+    return raw_val
+
+
+# ------------------------- Accessor Object -----------------------------------
+
+
+class LMDB_40_FileHandles(object):
+    """Encode / decode samples stored inline in their hash record.
+    """
+
+    def __init__(self, repo_path: os.PathLike, schema_shape: tuple, schema_dtype: np.dtype):
+        self.repo_path = repo_path
+        self.schema_shape = schema_shape
+        self.schema_dtype = schema_dtype
+        self._dflt_backend_opts: Optional[dict] = None
+        self.mode: Optional[str] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return
+
+    @property
+    def backend_opts(self):
+        return self._dflt_backend_opts
+
+    @backend_opts.setter
+    def backend_opts(self, val):
+        if self.mode == 'a':
+            self._dflt_backend_opts = val
+            return
+        else:
+            raise AttributeError(f"can't set property in read only mode")
+
+    def open(self, mode: str, *, remote_operation: bool = False):
+        self.mode = mode
+        return
+
+    def close(self, *args, **kwargs):
+        return
+
+    @staticmethod
+    def delete_in_process_data(*args, **kwargs) -> None:
+        """no data files are written, so there is nothing to clear.
+        """
+        return
+
+    def read_data(self, hashVal: LMDB_40_DataHashSpec) -> np.ndarray:
+        """Decode the data stored inline in the lmdb_40 record specification
+
+        Parameters
+        ----------
+        hashVal : LMDB_40_DataHashSpec
+            record specification stored in the db
+
+        Returns
+        -------
+        np.ndarray
+            tensor data stored at the provided hashVal specification.
+
+        Raises
+        ------
+        RuntimeError
+            If the nbytes of the data does not match the recorded shape and dtype.
+        """
+        buf = bytearray(base64.b64decode(hashVal.data))
+        dtype = np.dtype(hashVal.dtype)
+        if len(buf) != dtype.itemsize * int(np.prod(hashVal.shape)):
+            raise RuntimeError(
+                f'DATA CORRUPTION nbytes {len(buf)} does not match the shape and dtype of {hashVal}')
+        return np.frombuffer(buf, dtype=dtype).reshape(hashVal.shape)
+
+    def write_data(self, array: np.ndarray, *, remote_operation: bool = False,
+                   checksum: Optional[str] = None) -> bytes:
+        """encode array data into a db hash record value
+
+        Parameters
+        ----------
+        array : np.ndarray
+            tensor to store
+        remote_operation : bool, optional, kwarg only
+            unused, no data files are written. Default is False
+        checksum : Optional[str], optional, kwarg only
+            unused, no checksum is recorded. Default is None
+
+        Returns
+        -------
+        bytes
+            db hash record value holding the array data
+
+        Raises
+        ------
+        ValueError
+            If the array nbytes is greater than ``INLINE_MAX_NBYTES``.
+        """
+        if array.nbytes > INLINE_MAX_NBYTES:
+            raise ValueError(
+                f'array nbytes: {array.nbytes} > {INLINE_MAX_NBYTES}, the max nbytes of '
+                f'data which can be stored inline by backend {_FmtCode}.')
+        data = base64.b64encode(np.ascontiguousarray(array).tobytes()).decode()
+        return lmdb_40_encode(dtype=array.dtype.str, data=data, shape=array.shape)
@@ -17,10 +17,14 @@ Storage Method
 
   *  ``dtype: {schema_dtype}``; ie ``np.float32`` or ``np.uint8``
 
-  *  ``shape: (COLLECTION_SIZE, *{schema_shape})``; ie ``(500, 10)`` or ``(500,
+  *  ``shape: (collection_size, *{schema_shape})``; ie ``(500, 10)`` or ``(500,
      4, 3)``. The first index in the array is referred to as a "collection
      index".
 
+  *  ``collection_size`` is chosen from the nbytes of a schema sample when the
+     file is created (see :func:`_collection_size`), and is recorded in the
+     ``.npy`` header of the file as the length of it's first dimension.
+
 Record Format
 =============
 
@@ -30,7 +34,7 @@ Fields Recorded for Each Array
 *  Format Code
 *  File UID
 *  Alder32 Checksum
-*  Collection Index (0:COLLECTION_SIZE subarray selection)
+*  Collection Index (0:collection_size subarray selection)
 *  Subarray Shape
 
 Separators used
@@ -78,14 +82,28 @@ Technical Notes
    itself to serve as a quick way to verify no disk corruption occurred. This is
    required since numpy has no built in data integrity validation methods when
    reading from disk.
+
+*  A fixed number of samples per file makes files of tiny samples very small
+   (and numerous), and files of large samples enormous. Instead, each file
+   holds as many samples as fit in ``TARGET_FILE_NBYTES`` (at least one, at most
+   ``COLLECTION_SIZE``). Readers only rely on the shape in the ``.npy`` header,
+   so files written with any collection size are read the same way.
+
+*  Every sample of a file occupies the space of the max subarray shape of the
+   schema, so (by default) variable shaped arraysets use the ``PACK_30``
+   backend instead, which stores only the elements of each sample.
+
+*  Files opened for reading are registered in the process wide
+   :data:`~.handle_pool.HANDLE_POOL`, which closes the least recently used
+   when too many are open (they are reopened on the next read).
 """
 import os
 import re
-from collections import ChainMap
+from collections import ChainMap, defaultdict
 from functools import partial
 from os.path import join as pjoin
 from os.path import splitext as psplitext
-from typing import MutableMapping, NamedTuple, Tuple, Optional
+from typing import MutableMapping, NamedTuple, Tuple, Optional, List, Sequence, Union
 from xxhash import xxh64_hexdigest
 
 import numpy as np
@@ -93,13 +111,35 @@ from numpy.lib.format import open_memmap
 
 from .. import constants as c
 from ..utils import random_string, symlink_rel
+from .handle_pool import HANDLE_POOL
+from .verification import ChecksumVerifier
 
 
 # ----------------------------- Configuration ---------------------------------
 
 
-# number of subarray contents of a single numpy memmap file
-COLLECTION_SIZE = 1000
+# contents of a single numpy memmap file, see `_collection_size`
+COLLECTION_SIZE = 10_000  # max samples in each file
+TARGET_FILE_NBYTES = 256_000_000
+
+
+def _collection_size(sample_nbytes: int) -> int:
+    """Determine the number of samples in each file.
+
+    Files are sized to hold about ``TARGET_FILE_NBYTES`` of samples (at least
+    one, at most ``COLLECTION_SIZE``).
+
+    Parameters
+    ----------
+    sample_nbytes : int
+        nbytes of a sample with the (max) schema shape and dtype.
+
+    Returns
+    -------
+    int
+        number of samples in each file.
+    """
+    return max(1, min(COLLECTION_SIZE, TARGET_FILE_NBYTES // max(sample_nbytes, 1)))
 
 
 # -------------------------------- Parser Implementation ----------------------
@@ -191,6 +231,9 @@ class NUMPY_10_FileHandles(object):
         self.mode: str = None
         self.w_uid: str = None
         self.hIdx: int = None
+        self.hMaxSize: int = None
+        self.zero_copy: bool = False
+        self.verifier = ChecksumVerifier()
 
         self.slcExpr = np.s_
         self.slcExpr.maketuple = False
@@ -259,11 +302,29 @@ class NUMPY_10_FileHandles(object):
                 self.wFp[self.w_uid].flush()
                 self.w_uid = None
                 self.hIdx = None
+                self.hMaxSize = None
             for k in list(self.wFp.keys()):
                 del self.wFp[k]
 
         for k in list(self.rFp.keys()):
             del self.rFp[k]
+        HANDLE_POOL.release(self)
+
+    def evict_handle(self, uid: str):
+        """Close the memmap of a file opened for reading, reopening it on the next read.
+
+        Called by the :data:`~.handle_pool.HANDLE_POOL` when too many files are
+        open. The file is only unmapped once every (zero-copy) view of it has
+        been released.
+
+        Parameters
+        ----------
+        uid : str
+            uid of the file to close.
+        """
+        mmap = self.rFp.get(uid)
+        if isinstance(mmap, np.memmap):
+            self.rFp[uid] = partial(open_memmap, mmap.filename, 'r')
 
     @staticmethod
     def delete_in_process_data(repo_path, *, remote_operation=False):
@@ -307,13 +368,16 @@ class NUMPY_10_FileHandles(object):
         """
         uid = random_string()
         file_path = pjoin(self.DATADIR, f'{uid}.npy')
+        sample_nbytes = int(np.prod(self.schema_shape)) * np.dtype(self.schema_dtype).itemsize
+        collection_size = _collection_size(sample_nbytes)
         m = open_memmap(file_path,
                         mode='w+',
                         dtype=self.schema_dtype,
-                        shape=(COLLECTION_SIZE, *self.schema_shape))
+                        shape=(collection_size, *self.schema_shape))
         self.wFp[uid] = m
         self.w_uid = uid
         self.hIdx = 0
+        self.hMaxSize = collection_size
 
         if remote_operation:
             symlink_file_path = pjoin(self.REMOTEDIR, f'{uid}.npy')
@@ -357,30 +421,145 @@ class NUMPY_10_FileHandles(object):
           perform a "copy on write"-like operation which would be propogated to
           all future reads of the subarray from that process, but which would
           not be persisted to disk.
+
+        * If :attr:`zero_copy` is set on a read-only handle, no copy is made.
+          The memmap subarray is returned directly with it's "WRITEABLE" flag
+          cleared so the data can only be read.
         """
         srcSlc = (self.slcExpr[hashVal.collection_idx],
                   *(self.slcExpr[0:x] for x in hashVal.shape))
-        try:
-            res = self.Fp[hashVal.uid][srcSlc]
-        except TypeError:
-            self.Fp[hashVal.uid] = self.Fp[hashVal.uid]()
-            res = self.Fp[hashVal.uid][srcSlc]
-        except KeyError:
-            process_dir = self.STAGEDIR if self.mode == 'a' else self.STOREDIR
-            file_pth = pjoin(process_dir, f'{hashVal.uid}.npy')
-            if os.path.islink(file_pth):
-                self.rFp[hashVal.uid] = open_memmap(file_pth, 'r')
-                res = self.Fp[hashVal.uid][srcSlc]
-            else:
-                raise
+        res = self._read_memmap(hashVal.uid)[srcSlc]
+
+        if self.zero_copy and self.mode == 'r':
+            out = self._readonly_view(res)
+        else:
+            out = np.array(res, dtype=res.dtype, order='C')
+        self._verify_checksum(out, hashVal)
+        return out
 
-        out = np.array(res, dtype=res.dtype, order='C')
-        if xxh64_hexdigest(out) != hashVal.checksum:
+    def _verify_checksum(self, out: np.ndarray, hashVal: NUMPY_10_DataHashSpec):
+        """Check the read data against the recorded hash, raising on corruption.
+
+        Whether the check is performed at all is determined by the
+        :attr:`verifier` checksum policy.
+        """
+        if not self.verifier.should_verify(hashVal):
+            return
+        checksum = xxh64_hexdigest(np.ascontiguousarray(out))
+        if checksum != hashVal.checksum:
             raise RuntimeError(
-                f'DATA CORRUPTION Checksum {xxh64_hexdigest(out)} != recorded {hashVal}')
+                f'DATA CORRUPTION Checksum {checksum} != recorded {hashVal}')
+        self.verifier.record_verified(hashVal)
+
+    @staticmethod
+    def _readonly_view(res: np.memmap) -> np.ndarray:
+        """Plain ndarray view of a memmap subarray which cannot be written to.
+        """
+        out = res.view(np.ndarray)
+        out.flags.writeable = False
         return out
 
-    def write_data(self, array: np.ndarray, *, remote_operation: bool = False) -> bytes:
+    def read_data_batch(self, hashVals: Sequence[NUMPY_10_DataHashSpec],
+                        out: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """Read many samples, copying runs of adjacent subarrays in bulk.
+
+        Specs are grouped by the file ``uid`` they reside in and sorted by
+        ``collection_idx``. Each run of consecutive collection indexes (with
+        equal subarray shapes) is copied out of the memmap with a single slice
+        into the output array, rather than one copy per sample.
+
+        Parameters
+        ----------
+        hashVals : Sequence[NUMPY_10_DataHashSpec]
+            record specifications stored in the db
+        out : Optional[np.ndarray], optional
+            array of shape ``(len(hashVals), *schema_shape)`` and the schema
+            dtype which sample ``i`` is copied into at ``out[i]``. Samples
+            smaller than the schema shape (variable shape arraysets) fill the
+            leading region of their slot; the remainder is left untouched. If
+            None (default), an output array is allocated, unless
+            :attr:`zero_copy` is set on a read-only handle, in which case
+            read-only views of the memmap subarrays are returned without
+            copying.
+
+        Returns
+        -------
+        List[np.ndarray]
+            tensor data at each of the hashVal specifications, in the same
+            order as ``hashVals``. Each element is a view into ``out`` (or
+            into the memmap in zero copy mode).
+
+        Raises
+        ------
+        ValueError
+            If ``out`` does not have the required shape or dtype.
+        RuntimeError
+            If the recorded checksum does not match the received checksum.
+        """
+        if out is None and self.zero_copy and self.mode == 'r':
+            return [self.read_data(hashVal) for hashVal in hashVals]
+
+        outShape = (len(hashVals), *self.schema_shape)
+        if out is None:
+            out = np.empty(outShape, dtype=self.schema_dtype)
+        elif (out.shape != outShape) or (out.dtype != self.schema_dtype):
+            raise ValueError(
+                f'out array shape: {out.shape} dtype: {out.dtype} must be '
+                f'shape: {outShape} dtype: {self.schema_dtype}')
+
+        uidPositions = defaultdict(list)
+        for pos, hashVal in enumerate(hashVals):
+            uidPositions[hashVal.uid].append(pos)
+
+        for uid, positions in uidPositions.items():
+            positions.sort(key=lambda pos: hashVals[pos].collection_idx)
+            mmap = self._read_memmap(uid)
+            runStart = 0
+            for runEnd in range(1, len(positions) + 1):
+                if runEnd < len(positions):
+                    prev, cur = hashVals[positions[runEnd - 1]], hashVals[positions[runEnd]]
+                    if (cur.collection_idx == prev.collection_idx + 1) and (cur.shape == prev.shape):
+                        continue
+                first = hashVals[positions[runStart]]
+                shapeSlc = tuple(self.slcExpr[0:x] for x in first.shape)
+                srcSlc = (self.slcExpr[first.collection_idx:first.collection_idx + runEnd - runStart],
+                          *shapeSlc)
+                destPos = positions[runStart:runEnd]
+                if destPos == list(range(destPos[0], destPos[-1] + 1)):
+                    out[(self.slcExpr[destPos[0]:destPos[-1] + 1], *shapeSlc)] = mmap[srcSlc]
+                else:
+                    out[(destPos, *shapeSlc)] = mmap[srcSlc]
+                runStart = runEnd
+
+        res = []
+        for pos, hashVal in enumerate(hashVals):
+            arr = out[(pos, *(self.slcExpr[0:x] for x in hashVal.shape))]
+            self._verify_checksum(arr, hashVal)
+            res.append(arr)
+        return res
+
+    def _read_memmap(self, uid: str) -> np.memmap:
+        """Get the memmap of a file opened for reading, opening (or reopening) it if needed.
+
+        Memmaps in ``rFp`` are registered in the :data:`~.handle_pool.HANDLE_POOL`
+        as they are used.
+        """
+        mmap = self.rFp.get(uid)
+        if mmap is None:
+            if uid in self.wFp:
+                return self.wFp[uid]
+            process_dir = self.STAGEDIR if self.mode == 'a' else self.STOREDIR
+            file_pth = pjoin(process_dir, f'{uid}.npy')
+            if not os.path.islink(file_pth):
+                raise KeyError(uid)
+            mmap = self.rFp[uid] = open_memmap(file_pth, 'r')
+        elif isinstance(mmap, partial):
+            mmap = self.rFp[uid] = mmap()
+        HANDLE_POOL.acquire(self, uid)
+        return mmap
+
+    def write_data(self, array: np.ndarray, *, remote_operation: bool = False,
+                   checksum: Optional[str] = None) -> bytes:
         """writes array data to disk in the numpy_00 fmtBackend
 
         Parameters
@@ -390,16 +569,20 @@ class NUMPY_10_FileHandles(object):
         remote_operation : bool, optional, kwarg only
             True if writing in a remote operation, otherwise False. Default is
             False
+        checksum : Optional[str], optional, kwarg only
+            xxh64 checksum of ``array`` if already computed by the caller. If
+            None (default), it is computed here.
 
         Returns
         -------
         bytes
             db hash record value specifying location information
         """
-        checksum = xxh64_hexdigest(array)
+        if checksum is None:
+            checksum = xxh64_hexdigest(array)
         if self.w_uid in self.wFp:
             self.hIdx += 1
-            if self.hIdx >= COLLECTION_SIZE:
+            if self.hIdx >= self.hMaxSize:
                 self.wFp[self.w_uid].flush()
                 self._create_schema(remote_operation=remote_operation)
         else:
@@ -412,3 +595,65 @@ class NUMPY_10_FileHandles(object):
                                   collection_idx=self.hIdx,
                                   shape=array.shape)
         return hashVal
+
+    def write_data_batch(self, arrays: Union[Sequence[np.ndarray], np.ndarray], *,
+                         remote_operation: bool = False,
+                         checksums: Optional[Sequence[str]] = None) -> List[bytes]:
+        """writes many arrays to disk, filling consecutive collection indices.
+
+        Each run of arrays with the full schema shape which lands in the same
+        collection file is written with a single slice assignment to the
+        memmap, instead of one assignment per array.
+
+        Parameters
+        ----------
+        arrays : Union[Sequence[np.ndarray], np.ndarray]
+            tensors to write to disk, or a stacked array whose rows are the
+            tensors to write.
+        remote_operation : bool, optional, kwarg only
+            True if writing in a remote operation, otherwise False. Default is
+            False
+        checksums : Optional[Sequence[str]], optional, kwarg only
+            xxh64 checksum of each array if already computed by the caller. If
+            None (default), they are computed here.
+
+        Returns
+        -------
+        List[bytes]
+            db hash record value specifying location information of each array,
+            in the same order as ``arrays``.
+        """
+        hashVals = []
+        pos = 0
+        while pos < len(arrays):
+            if self.w_uid in self.wFp:
+                if self.hIdx + 1 >= self.hMaxSize:
+                    self.wFp[self.w_uid].flush()
+                    self._create_schema(remote_operation=remote_operation)
+                    start = 0
+                else:
+                    start = self.hIdx + 1
+            else:
+                self._create_schema(remote_operation=remote_operation)
+                start = 0
+
+            run = arrays[pos:pos + self.hMaxSize - start]
+            stop = start + len(run)
+            if isinstance(run, np.ndarray) and (run.shape[1:] == self.schema_shape):
+                self.wFp[self.w_uid][start:stop] = run
+            elif all(arr.shape == self.schema_shape for arr in run):
+                np.stack(run, out=self.wFp[self.w_uid][start:stop])
+            else:
+                for idx, arr in enumerate(run, start=start):
+                    destSlc = (self.slcExpr[idx], *(self.slcExpr[0:x] for x in arr.shape))
+                    self.wFp[self.w_uid][destSlc] = arr
+
+            for idx, arr in enumerate(run, start=start):
+                checksum = checksums[len(hashVals)] if checksums else xxh64_hexdigest(arr)
+                hashVals.append(numpy_10_encode(uid=self.w_uid,
+                                                checksum=checksum,
+                                                collection_idx=idx,
+                                                shape=arr.shape))
+            self.hIdx = stop - 1
+            pos += len(run)
+        return hashVals
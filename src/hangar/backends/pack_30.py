@@ -0,0 +1,683 @@
+"""Local Blosc Pack File Backend Implementation, Identifier: ``PACK_30``
+
+Backend Identifiers
+===================
+
+*  Backend: ``3``
+*  Version: ``0``
+*  Format Code: ``30``
+*  Canonical Name: ``PACK_30``
+
+Storage Method
+==============
+
+*  Each sample is compressed with ``blosc`` into a single blob, which is
+   appended to the end of a "pack file". Only the bytes of the sample itself
+   are compressed and stored; samples of a variable shape arrayset are never
+   padded to the max shape of the schema.
+
+*  Each pack file starts with a ``PACK_HEADER_NBYTES`` header recording the
+   schema dtype, followed by the blobs of every sample written to it. A new
+   pack file is started once the current one holds ``PACK_MAX_NBYTES``.
+
+*  Compression options (``complib``, ``complevel``, ``shuffle``) are applied to
+   each sample as it is written. Blobs carry their own ``blosc`` header, so
+   they are decompressed without knowing the options which were used.
+
+Record Format
+=============
+
+Fields Recorded for Each Array
+------------------------------
+
+*  Format Code
+*  File UID
+*  xxhash64_hexdigest
+*  Offset (of the blob from the start of the pack file)
+*  Length (nbytes of the compressed blob)
+*  Subarray Shape
+
+Separators used
+---------------
+
+*  ``SEP_KEY: ":"``
+*  ``SEP_HSH: "$"``
+*  ``SEP_LST: " "``
+*  ``SEP_SLC: "*"``
+
+Examples
+--------
+
+1)  Adding the first piece of data to a file:
+
+    *  Array shape (Subarray Shape): (10)
+    *  File UID: "rlUK3C"
+    *  xxhash64_hexdigest: 8067007c0f05c359
+    *  Offset: 32
+    *  Length: 47
+
+    ``Record Data => "30:rlUK3C$8067007c0f05c359$32$47*10"``
+
+2)  Adding a piece of data to the middle of a file:
+
+    *  Array shape (Subarray Shape): (20, 2, 3)
+    *  File UID: "Mk23nl"
+    *  xxhash64_hexdigest: 1fe5a3e4a7b4c1e7
+    *  Offset: 1024576
+    *  Length: 493
+
+    ``Record Data => "30:Mk23nl$1fe5a3e4a7b4c1e7$1024576$493*20 2 3"``
+
+Technical Notes
+===============
+
+*  Pack files are only ever appended to. Every write is a single sequential
+   ``os.write`` to a descriptor opened with ``O_APPEND``, and every read is a
+   positional ``os.pread`` of exactly the bytes of the blob(s) requested, so
+   readers never observe a partially written blob they were given the record
+   of, and no state is shared between file handles of the same file.
+
+*  With the ``bucket_width`` option set (to an ``int > 0``), samples are
+   appended to a separate pack file for each shape bucket (see
+   :func:`~hangar.utils.shape_bucket`), so that samples of the same (or a
+   similar) shape are stored back to back, and a batch of them is read with
+   a single ``pread``. By default (``0``), all samples share one pack file.
+   At most ``MAX_OPEN_WRITE_FILES`` pack files are held open for appending;
+   the least recently written to is closed when another is needed, and is
+   reopened (with ``O_APPEND``) the next time a sample of it's bucket is
+   written.
+
+*  When many samples are read at once, the blobs of each pack file are sorted
+   by offset and each run of adjacent blobs is fetched with one ``pread``.
+
+*  On read, the uncompressed nbytes recorded in the ``blosc`` header of the
+   blob is checked against the size of the recorded shape before
+   decompressing into the output array.
+
+*  Files opened for reading are registered in the process wide
+   :data:`~.handle_pool.HANDLE_POOL`, which closes the least recently used
+   when too many are open (they are reopened on the next read).
+"""
+import os
+import re
+import struct
+from collections import ChainMap, OrderedDict, defaultdict
+from functools import partial
+from os.path import join as pjoin
+from os.path import splitext as psplitext
+from typing import MutableMapping, NamedTuple, Tuple, Optional, Union, Callable, List, Sequence
+
+import blosc
+import numpy as np
+from xxhash import xxh64_hexdigest
+
+from .. import constants as c
+from ..utils import random_string, symlink_rel, shape_bucket
+from .handle_pool import HANDLE_POOL
+from .verification import ChecksumVerifier
+
+
+# ----------------------------- Configuration ---------------------------------
+
+
+# nbytes of the compressed samples in a single pack file before a new one is started.
+PACK_MAX_NBYTES = 1_000_000_000
+
+# pack file header: magic bytes followed by the (padded) dtype str of the schema.
+PACK_HEADER_MAGIC = b'HNGRPK30'
+PACK_HEADER_NBYTES = 32
+
+# maximum number of pack files held open for appending at once (per accessor).
+MAX_OPEN_WRITE_FILES = 32
+
+_BLOSC_HEADER = struct.Struct('<4xI4xI')
+
+_BLOSC_SHUFFLE = {
+    None: blosc.NOSHUFFLE,
+    'none': blosc.NOSHUFFLE,
+    'byte': blosc.SHUFFLE,
+    'bit': blosc.BITSHUFFLE}
+
+
+# -------------------------------- Parser Implementation ----------------------
+
+_FmtCode = '30'
+# match and remove the following characters: '['   ']'   '('   ')'   ','
+_ShapeFmtRE = re.compile('[,\(\)\[\]]')
+# split up a formated parsed string into unique fields
+_SplitDecoderRE = re.compile(fr'[\{c.SEP_KEY}\{c.SEP_HSH}\{c.SEP_SLC}]')
+
+
+PACK_30_DataHashSpec = NamedTuple('PACK_30_DataHashSpec',
+                                  [('backend', str), ('uid', str),
+                                   ('checksum', str), ('offset', int),
+                                   ('length', int), ('shape', Tuple[int])])
+
+
+def pack_30_encode(uid: str, checksum: str, offset: int, length: int, shape: tuple) -> bytes:
+    """converts the pack data spec to an appropriate db value
+
+    Parameters
+    ----------
+    uid : str
+        file name (schema uid) of the pack file to find this data piece in.
+    checksum : str
+        xxhash64_hexdigest checksum of the data as computed on that local machine.
+    offset : int
+        byte offset of the compressed blob from the start of the pack file.
+    length : int
+        nbytes of the compressed blob.
+    shape : tuple
+        shape of the data sample.
+
+    Returns
+    -------
+    bytes
+        hash data db value recording all input specifications
+    """
+    out_str = f'{_FmtCode}{c.SEP_KEY}'\
+              f'{uid}{c.SEP_HSH}{checksum}{c.SEP_HSH}'\
+              f'{offset}{c.SEP_HSH}{length}{c.SEP_SLC}'\
+              f'{_ShapeFmtRE.sub("", str(shape))}'
+    return out_str.encode()
+
+
+def pack_30_decode(db_val: bytes) -> PACK_30_DataHashSpec:
+    """converts a pack data hash db val into a pack data python spec
+
+    Parameters
+    ----------
+    db_val : bytes
+        data hash db val
+
+    Returns
+    -------
+    PACK_30_DataHashSpec
+        pack data hash specification containing `backend`, `uid`, `checksum`,
+        `offset`, `length`, and `shape` fields.
+    """
+    db_str = db_val.decode()
+    _, uid, checksum, offset, length, shape_vs = _SplitDecoderRE.split(db_str)
+    # if the data is of empty shape -> shape_vs = '' str.split() default value
+    # of none means split according to any whitespace, and discard empty strings
+    # from the result. So long as c.SEP_LST = ' ' this will work
+    shape = tuple(int(x) for x in shape_vs.split())
+    raw_val = PACK_30_DataHashSpec(backend=_FmtCode,
+                                   uid=uid,
+                                   checksum=checksum,
+                                   offset=int(offset),
+                                   length=int(length),
+                                   shape=shape)
+    return raw_val
+
+
+# ------------------------- Accessor Object -----------------------------------
+
+
+def _open_reader(file_pth: os.PathLike) -> int:
+    """Open a pack file for reading, returning the file descriptor.
+    """
+    return os.open(file_pth, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+
+
+def _open_writer(file_pth: os.PathLike) -> int:
+    """Reopen a pack file for appending, returning the file descriptor.
+    """
+    return os.open(file_pth, os.O_RDWR | os.O_APPEND | getattr(os, 'O_BINARY', 0))
+
+
+def _pread(fd: int, length: int, offset: int) -> bytes:
+    """Read ``length`` bytes at ``offset`` of a file, raising if fewer are available.
+    """
+    if hasattr(os, 'pread'):
+        buf = os.pread(fd, length, offset)
+    else:  # pragma: no cover
+        os.lseek(fd, offset, os.SEEK_SET)
+        buf = os.read(fd, length)
+    if len(buf) != length:
+        raise RuntimeError(
+            f'DATA CORRUPTION read {len(buf)} bytes at offset {offset}, expected {length}')
+    return buf
+
+
+PACK_30_MapTypes = MutableMapping[str, Union[int, Callable[[], int]]]
+
+
+class PACK_30_FileHandles(object):
+    """Manage the descriptors of pack files being appended to / read from.
+    """
+
+    def __init__(self, repo_path: os.PathLike, schema_shape: tuple, schema_dtype: np.dtype):
+        self.repo_path = repo_path
+        self.schema_shape = schema_shape
+        self.schema_dtype = schema_dtype
+        self._dflt_backend_opts: Optional[dict] = None
+
+        self.rFp: PACK_30_MapTypes = {}
+        self.wFp: PACK_30_MapTypes = {}
+        self.Fp = ChainMap(self.rFp, self.wFp)
+        # uid -> dtype recorded in the header of pack files read without a schema dtype
+        self.fDtypes: MutableMapping[str, np.dtype] = {}
+
+        self.mode: Optional[str] = None
+        # shape bucket (None when not bucketing) -> uid of the pack file appended to
+        self.wBuckets: MutableMapping[Optional[Tuple[int]], str] = {}
+        # uid -> nbytes of each pack file appended to
+        self.wOffsets: MutableMapping[str, int] = {}
+        # uids of the pack files with an open descriptor in ``wFp``, least recently used first
+        self.wOpen: 'OrderedDict[str, None]' = OrderedDict()
+        self.verifier = ChecksumVerifier()
+
+        self.STAGEDIR = pjoin(self.repo_path, c.DIR_DATA_STAGE, _FmtCode)
+        self.REMOTEDIR = pjoin(self.repo_path, c.DIR_DATA_REMOTE, _FmtCode)
+        self.DATADIR = pjoin(self.repo_path, c.DIR_DATA, _FmtCode)
+        self.STOREDIR = pjoin(self.repo_path, c.DIR_DATA_STORE, _FmtCode)
+        if not os.path.isdir(self.DATADIR):
+            os.makedirs(self.DATADIR)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return
+
+    def __getstate__(self) -> dict:
+        """ensure multiprocess operations can pickle relevant data.
+        """
+        self.close()
+        state = self.__dict__.copy()
+        del state['rFp']
+        del state['wFp']
+        del state['Fp']
+        return state
+
+    def __setstate__(self, state: dict) -> None:  # pragma: no cover
+        """ensure multiprocess operations can pickle relevant data.
+        """
+        self.__dict__.update(state)
+        self.rFp = {}
+        self.wFp = {}
+        self.Fp = ChainMap(self.rFp, self.wFp)
+        self.open(mode=self.mode)
+
+    @property
+    def backend_opts(self):
+        return self._dflt_backend_opts
+
+    @backend_opts.setter
+    def backend_opts(self, val):
+        if self.mode == 'a':
+            self._dflt_backend_opts = val
+            return
+        else:
+            raise AttributeError(f"can't set property in read only mode")
+
+    def open(self, mode: str, *, remote_operation: bool = False):
+        """open pack file handle coded directories
+
+        Parameters
+        ----------
+        mode : str
+            one of `a` for `write-enabled` mode or `r` for read-only
+        remote_operation : bool, optional, kwarg only
+            True if remote operations call this method. Changes the symlink
+            directories used while writing., by default False
+        """
+        self.mode = mode
+        if self.mode == 'a':
+            process_dir = self.REMOTEDIR if remote_operation else self.STAGEDIR
+            if not os.path.isdir(process_dir):
+                os.makedirs(process_dir)
+
+            process_uids = [psplitext(x)[0] for x in os.listdir(process_dir) if x.endswith('.pack')]
+            for uid in process_uids:
+                file_pth = pjoin(process_dir, f'{uid}.pack')
+                self.rFp[uid] = partial(_open_reader, file_pth)
+
+        if not remote_operation:
+            if not os.path.isdir(self.STOREDIR):
+                return
+            store_uids = [psplitext(x)[0] for x in os.listdir(self.STOREDIR) if x.endswith('.pack')]
+            for uid in store_uids:
+                file_pth = pjoin(self.STOREDIR, f'{uid}.pack')
+                self.rFp[uid] = partial(_open_reader, file_pth)
+
+    def close(self, *args, **kwargs):
+        """Close any open file handles.
+        """
+        if self.mode == 'a':
+            self.wBuckets.clear()
+            self.wOffsets.clear()
+            self.wOpen.clear()
+            for uid in list(self.wFp.keys()):
+                if isinstance(self.wFp[uid], int):
+                    os.close(self.wFp[uid])
+                del self.wFp[uid]
+
+        for uid in list(self.rFp.keys()):
+            if isinstance(self.rFp[uid], int):
+                os.close(self.rFp[uid])
+            del self.rFp[uid]
+        HANDLE_POOL.release(self)
+
+    def evict_handle(self, uid: str):
+        """Close the descriptor of a file opened for reading, reopening it on the next read.
+
+        Called by the :data:`~.handle_pool.HANDLE_POOL` when too many files are
+        open.
+
+        Parameters
+        ----------
+        uid : str
+            uid of the file to close.
+        """
+        fd = self.rFp.get(uid)
+        if isinstance(fd, int):
+            self.rFp[uid] = partial(_open_reader, self._file_path(uid))
+            os.close(fd)
+
+    def _file_path(self, uid: str) -> os.PathLike:
+        return pjoin(self.DATADIR, f'{uid}.pack')
+
+    @staticmethod
+    def delete_in_process_data(repo_path: os.PathLike, *, remote_operation=False) -> None:
+        """Removes some set of files entirely from the stage/remote directory.
+
+        DANGER ZONE. This should essentially only be used to perform hard resets
+        of the repository state.
+
+        Parameters
+        ----------
+        repo_path : str
+            path to the repository on disk
+        remote_operation : optional, kwarg only, bool
+            If true, modify contents of the remote_dir, if false (default) modify
+            contents of the staging directory.
+        """
+        data_dir = pjoin(repo_path, c.DIR_DATA, _FmtCode)
+        PDIR = c.DIR_DATA_STAGE if not remote_operation else c.DIR_DATA_REMOTE
+        process_dir = pjoin(repo_path, PDIR, _FmtCode)
+        if not os.path.isdir(process_dir):
+            return
+
+        process_uids = (psplitext(x)[0] for x in os.listdir(process_dir) if x.endswith('.pack'))
+        for process_uid in process_uids:
+            remove_link_pth = pjoin(process_dir, f'{process_uid}.pack')
+            remove_data_pth = pjoin(data_dir, f'{process_uid}.pack')
+            os.remove(remove_link_pth)
+            os.remove(remove_data_pth)
+        os.rmdir(process_dir)
+
+    def _create_schema(self, bucket: Optional[Tuple[int]] = None, *,
+                       remote_operation: bool = False) -> str:
+        """creates a new pack file (recording the schema dtype) to append to.
+
+        Parameters
+        ----------
+        bucket : Optional[Tuple[int]]
+            shape bucket which samples appended to the file belong to, by
+            default None (not bucketing).
+        remote_operation : optional, kwarg only, bool
+            if this schema is being created from a remote fetch operation, then do not
+            place the file symlink in the staging directory. Instead symlink it
+            to a special remote staging directory. (default is False, which places the
+            symlink in the stage data directory.)
+
+        Returns
+        -------
+        str
+            uid of the pack file created.
+        """
+        uid = random_string()
+        file_path = self._file_path(uid)
+        fd = os.open(file_path, os.O_RDWR | os.O_CREAT | os.O_EXCL | os.O_APPEND
+                     | getattr(os, 'O_BINARY', 0), 0o644)
+        header = PACK_HEADER_MAGIC + np.dtype(self.schema_dtype).str.encode()
+        self._append(fd, header.ljust(PACK_HEADER_NBYTES))
+        self.wFp[uid] = fd
+        self._write_fd(uid)
+        self.wBuckets[bucket] = uid
+        self.wOffsets[uid] = PACK_HEADER_NBYTES
+
+        if remote_operation:
+            symlink_file_path = pjoin(self.REMOTEDIR, f'{uid}.pack')
+        else:
+            symlink_file_path = pjoin(self.STAGEDIR, f'{uid}.pack')
+        symlink_rel(file_path, symlink_file_path)
+        return uid
+
+    def _bucket(self, shape: Tuple[int]) -> Optional[Tuple[int]]:
+        """shape bucket of a sample, or None if the ``bucket_width`` option is not set.
+        """
+        width = (self._dflt_backend_opts or {}).get('bucket_width', 0)
+        return shape_bucket(shape, width) if width else None
+
+    def _write_fd(self, uid: str) -> int:
+        """Get the descriptor of a pack file to append to, reopening it if needed.
+
+        When more than ``MAX_OPEN_WRITE_FILES`` are open, the descriptor of the
+        least recently used is closed, to be reopened the next time it is used.
+        """
+        fd = self.wFp[uid]
+        if isinstance(fd, partial):
+            fd = self.wFp[uid] = fd()
+        self.wOpen[uid] = None
+        self.wOpen.move_to_end(uid)
+        while len(self.wOpen) > MAX_OPEN_WRITE_FILES:
+            lruUid = next(iter(self.wOpen))
+            del self.wOpen[lruUid]
+            os.close(self.wFp[lruUid])
+            self.wFp[lruUid] = partial(_open_writer, self._file_path(lruUid))
+        return fd
+
+    @staticmethod
+    def _append(fd: int, buf: bytes):
+        view = memoryview(buf)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def _read_fd(self, uid: str) -> int:
+        """Get the descriptor of a pack file to read from, opening (or reopening) it if needed.
+
+        Descriptors in ``rFp`` are registered in the :data:`~.handle_pool.HANDLE_POOL`
+        as they are used.
+        """
+        fd = self.rFp.get(uid)
+        if fd is None:
+            if uid in self.wFp:
+                return self._write_fd(uid)
+            process_dir = self.STAGEDIR if self.mode == 'a' else self.STOREDIR
+            file_pth = pjoin(process_dir, f'{uid}.pack')
+            if not os.path.islink(file_pth):
+                raise KeyError(uid)
+            fd = self.rFp[uid] = _open_reader(file_pth)
+        elif isinstance(fd, partial):
+            fd = self.rFp[uid] = fd()
+        HANDLE_POOL.acquire(self, uid)
+        return fd
+
+    def _read_dtype(self, uid: str) -> np.dtype:
+        """dtype of the samples in a pack file; the schema dtype if known, else the file header.
+        """
+        if self.schema_dtype is not None:
+            return np.dtype(self.schema_dtype)
+        try:
+            return self.fDtypes[uid]
+        except KeyError:
+            header = _pread(self._read_fd(uid), PACK_HEADER_NBYTES, 0)
+            if not header.startswith(PACK_HEADER_MAGIC):
+                raise RuntimeError(f'DATA CORRUPTION pack file: {uid} header is invalid')
+            dtype = self.fDtypes[uid] = np.dtype(header[len(PACK_HEADER_MAGIC):].strip().decode())
+            return dtype
+
+    def _decompress(self, blob: Union[bytes, memoryview], hashVal: PACK_30_DataHashSpec) -> np.ndarray:
+        """Decompress the blob of a sample into a new array, verifying it's checksum.
+        """
+        out = np.empty(hashVal.shape, dtype=self._read_dtype(hashVal.uid))
+        # blosc header: uncompressed nbytes at [4:8], compressed nbytes at [12:16]
+        if len(blob) >= _BLOSC_HEADER.size:
+            nbytes, cbytes = _BLOSC_HEADER.unpack_from(blob)
+        else:
+            nbytes, cbytes = None, None
+        if (nbytes != out.nbytes) or (cbytes != len(blob)):
+            raise RuntimeError(
+                f'DATA CORRUPTION blob header does not match recorded {hashVal}')
+        blosc.decompress_ptr(blob, out.__array_interface__['data'][0])
+        if self.verifier.should_verify(hashVal):
+            checksum = xxh64_hexdigest(out)
+            if checksum != hashVal.checksum:
+                raise RuntimeError(
+                    f'DATA CORRUPTION Checksum {checksum} != recorded {hashVal}')
+            self.verifier.record_verified(hashVal)
+        return out
+
+    def read_data(self, hashVal: PACK_30_DataHashSpec) -> np.ndarray:
+        """Read data from disk written in the pack_30 fmtBackend
+
+        Parameters
+        ----------
+        hashVal : PACK_30_DataHashSpec
+            record specification stored in the db
+
+        Returns
+        -------
+        np.ndarray
+            tensor data stored at the provided hashVal specification.
+
+        Raises
+        ------
+        RuntimeError
+            If the recorded checksum does not match the received checksum.
+        """
+        blob = _pread(self._read_fd(hashVal.uid), hashVal.length, hashVal.offset)
+        return self._decompress(blob, hashVal)
+
+    def read_data_batch(self, hashVals: Sequence[PACK_30_DataHashSpec]) -> List[np.ndarray]:
+        """Read many samples, fetching runs of adjacent blobs with a single read.
+
+        Specs are grouped by the file ``uid`` they reside in and sorted by
+        ``offset``. Each run of blobs stored back to back is read with one
+        ``pread``, and the blobs are then decompressed from views into it.
+
+        Parameters
+        ----------
+        hashVals : Sequence[PACK_30_DataHashSpec]
+            record specifications stored in the db
+
+        Returns
+        -------
+        List[np.ndarray]
+            tensor data at each of the hashVal specifications, in the same
+            order as ``hashVals``.
+
+        Raises
+        ------
+        RuntimeError
+            If the recorded checksum does not match the received checksum.
+        """
+        uidPositions = defaultdict(list)
+        for pos, hashVal in enumerate(hashVals):
+            uidPositions[hashVal.uid].append(pos)
+
+        res = [None] * len(hashVals)
+        for uid, positions in uidPositions.items():
+            positions.sort(key=lambda pos: hashVals[pos].offset)
+            fd = self._read_fd(uid)
+            runStart = 0
+            for runEnd in range(1, len(positions) + 1):
+                if runEnd < len(positions):
+                    prev, cur = hashVals[positions[runEnd - 1]], hashVals[positions[runEnd]]
+                    if cur.offset <= prev.offset + prev.length:
+                        continue
+                first = hashVals[positions[runStart]]
+                stop = max(hashVals[pos].offset + hashVals[pos].length
+                           for pos in positions[runStart:runEnd])
+                buf = memoryview(_pread(fd, stop - first.offset, first.offset))
+                for pos in positions[runStart:runEnd]:
+                    hashVal = hashVals[pos]
+                    start = hashVal.offset - first.offset
+                    res[pos] = self._decompress(buf[start:start + hashVal.length], hashVal)
+                runStart = runEnd
+        return res
+
+    def _compress(self, array: np.ndarray) -> bytes:
+        """Compress a sample into a blob with the configured blosc options.
+        """
+        opts = self._dflt_backend_opts or {}
+        array = np.ascontiguousarray(array)
+        return blosc.compress_ptr(array.__array_interface__['data'][0],
+                                  array.size,
+                                  typesize=array.itemsize,
+                                  clevel=opts.get('complevel', 3),
+                                  shuffle=_BLOSC_SHUFFLE[opts.get('shuffle', 'byte')],
+                                  cname=opts.get('complib', 'zstd'))
+
+    def write_data(self, array: np.ndarray, *, remote_operation: bool = False,
+                   checksum: Optional[str] = None) -> bytes:
+        """compresses and appends array data to the end of the current pack file
+
+        Parameters
+        ----------
+        array : np.ndarray
+            tensor to write to disk
+        remote_operation : bool, optional, kwarg only
+            True if writing in a remote operation, otherwise False. Default is
+            False
+        checksum : Optional[str], optional, kwarg only
+            xxh64 checksum of ``array`` if already computed by the caller. If
+            None (default), it is computed here.
+
+        Returns
+        -------
+        bytes
+            db hash record value specifying location information
+        """
+        return self.write_data_batch([array], remote_operation=remote_operation,
+                                     checksums=[checksum] if checksum else None)[0]
+
+    def write_data_batch(self, arrays: Union[Sequence[np.ndarray], np.ndarray], *,
+                         remote_operation: bool = False,
+                         checksums: Optional[Sequence[str]] = None) -> List[bytes]:
+        """compresses many arrays and appends their blobs to the pack file at once.
+
+        The blobs of every array which fits in the current pack file (of it's
+        shape bucket) are joined and appended with a single write.
+
+        Parameters
+        ----------
+        arrays : Union[Sequence[np.ndarray], np.ndarray]
+            tensors to write to disk, or a stacked array whose rows are the
+            tensors to write.
+        remote_operation : bool, optional, kwarg only
+            True if writing in a remote operation, otherwise False. Default is
+            False
+        checksums : Optional[Sequence[str]], optional, kwarg only
+            xxh64 checksum of each array if already computed by the caller. If
+            None (default), they are computed here.
+
+        Returns
+        -------
+        List[bytes]
+            db hash record value specifying location information of each array,
+            in the same order as ``arrays``.
+        """
+        hashVals, uidBlobs = [], defaultdict(list)
+        for idx, array in enumerate(arrays):
+            bucket = self._bucket(array.shape)
+            uid = self.wBuckets.get(bucket)
+            if (uid is None) or (self.wOffsets[uid] >= PACK_MAX_NBYTES):
+                if uid in uidBlobs:
+                    self._append(self._write_fd(uid), b''.join(uidBlobs.pop(uid)))
+                uid = self._create_schema(bucket, remote_operation=remote_operation)
+            blob = self._compress(array)
+            checksum = checksums[idx] if checksums else xxh64_hexdigest(array)
+            hashVals.append(pack_30_encode(uid=uid,
+                                           checksum=checksum,
+                                           offset=self.wOffsets[uid],
+                                           length=len(blob),
+                                           shape=array.shape))
+            uidBlobs[uid].append(blob)
+            self.wOffsets[uid] += len(blob)
+        for uid, blobs in uidBlobs.items():
+            self._append(self._write_fd(uid), b''.join(blobs))
+        return hashVals
@@ -89,6 +89,8 @@ import numpy as np
 
 from .hdf5_00 import HDF5_00_FileHandles, hdf5_00_decode, HDF5_00_DataHashSpec
 from .numpy_10 import NUMPY_10_FileHandles, numpy_10_decode, NUMPY_10_DataHashSpec
+from .pack_30 import PACK_30_FileHandles, pack_30_decode, PACK_30_DataHashSpec
+from .lmdb_40 import LMDB_40_FileHandles, lmdb_40_decode, LMDB_40_DataHashSpec, INLINE_MAX_NBYTES
 from .remote_50 import REMOTE_50_Handler, remote_50_decode, REMOTE_50_DataHashSpec
 
 
@@ -98,6 +100,8 @@ from .remote_50 import REMOTE_50_Handler, remote_50_decode, REMOTE_50_DataHashSp
 _DataHashSpecs = Union[
     HDF5_00_DataHashSpec,
     NUMPY_10_DataHashSpec,
+    PACK_30_DataHashSpec,
+    LMDB_40_DataHashSpec,
     REMOTE_50_DataHashSpec]
 
 _ParserMap = Mapping[bytes, Callable[[bytes], _DataHashSpecs]]
@@ -107,6 +111,8 @@ BACKEND_DECODER_MAP: _ParserMap = {
     b'00': hdf5_00_decode,
     b'10': numpy_10_decode,
     b'20': None,               # tiledb_20 - Reserved
+    b'30': pack_30_decode,
+    b'40': lmdb_40_decode,
     # REMOTES -> [50:100]
     b'50': remote_50_decode,
     b'60': None,               # url_60 - Reserved
@@ -116,7 +122,8 @@ BACKEND_DECODER_MAP: _ParserMap = {
 # ------------------------ Accessor Types and Mapping -------------------------
 
 
-_BeAccessors = Union[HDF5_00_FileHandles, NUMPY_10_FileHandles, REMOTE_50_Handler]
+_BeAccessors = Union[HDF5_00_FileHandles, NUMPY_10_FileHandles,
+                     PACK_30_FileHandles, LMDB_40_FileHandles, REMOTE_50_Handler]
 _AccessorMap = Dict[str, _BeAccessors]
 
 BACKEND_ACCESSOR_MAP: _AccessorMap = {
@@ -124,6 +131,8 @@ BACKEND_ACCESSOR_MAP: _AccessorMap = {
     '00': HDF5_00_FileHandles,
     '10': NUMPY_10_FileHandles,
     '20': None,               # tiledb_20 - Reserved
+    '30': PACK_30_FileHandles,
+    '40': LMDB_40_FileHandles,
     # REMOTES -> [50:100]
     '50': REMOTE_50_Handler,
     '60': None,               # url_60 - Reserved
@@ -159,13 +168,16 @@ def backend_decoder(db_val: bytes) -> _DataHashSpecs:
 BackendOpts = NamedTuple('BackendOpts', [('backend', str), ('opts', dict)])
 
 
-def backend_from_heuristics(array: np.ndarray) -> str:
+def backend_from_heuristics(array: np.ndarray, *, variable_shape: bool = False) -> str:
     """Given a prototype array, attempt to select the appropriate backend.
 
     Parameters
     ----------
     array : np.ndarray
         prototype array to determine the appropriate backend for.
+    variable_shape : bool, optional, kwarg-only
+        If True, the prototype is the max shape of samples which can be any
+        smaller shape. Default is False.
 
     Returns
     -------
@@ -177,9 +189,17 @@ def backend_from_heuristics(array: np.ndarray) -> str:
     Configuration of this entire module as the available backends fill out.
     """
 
+    # tiny arrays are stored inline in their hash record, saving the file I/O
+    # (and space overhead) of writing them to any data file.
+    if array.nbytes <= INLINE_MAX_NBYTES:
+        backend = '40'
+    # the hdf5 and numpy backends allocate space for the max shape of every
+    # sample; pack files only store the elements of each sample (no padding).
+    elif variable_shape:
+        backend = '30'
     # uncompressed numpy memmap data is most appropriate for data whose shape is
     # likely small tabular row data (CSV or such...)
-    if (array.ndim == 1) and (array.size < 400):
+    elif (array.ndim == 1) and (array.size < 400):
         backend = '10'
     # hdf5 is the default backend for larger array sizes.
     else:
@@ -239,6 +259,15 @@ def backend_opts_from_heuristics(backend: str, array: np.ndarray) -> dict:
         }
         hdf5BloscAvail = h5py.h5z.filter_avail(32001)
         opts = opts['default'] if hdf5BloscAvail else opts['backup']
+    elif backend == '30':
+        opts = {
+            'complib': 'zstd',
+            'complevel': 3,
+            'shuffle': 'byte',
+            'bucket_width': 0,
+        }
+    elif backend == '40':
+        opts = {}
     elif backend == '50':
         opts = {}
     else:
@@ -248,7 +277,8 @@ def backend_opts_from_heuristics(backend: str, array: np.ndarray) -> dict:
 
 
 def parse_user_backend_opts(backend_opts: Optional[Union[str, dict]],
-                            prototype: np.ndarray) -> BackendOpts:
+                            prototype: np.ndarray, *,
+                            variable_shape: bool = False) -> BackendOpts:
     """Decide the backend and opts to apply given a users selection (or default `None` value)
 
     Parameters
@@ -262,6 +292,9 @@ def parse_user_backend_opts(backend_opts: Optional[Union[str, dict]],
     prototype : np.ndarray
         Sample of the data array which will be save (same dtype and shape) to
         base the storage backend and opts on.
+    variable_shape : bool, optional, kwarg-only
+        If True, the ``prototype`` is the max shape of samples which can be
+        any smaller shape. Default is False.
 
     Returns
     -------
@@ -291,7 +324,7 @@ def parse_user_backend_opts(backend_opts: Optional[Union[str, dict]],
         backend = backend_opts['backend']
         opts = {k: v for k, v in backend_opts.items() if k != 'backend'}
     elif backend_opts is None:
-        backend = backend_from_heuristics(prototype)
+        backend = backend_from_heuristics(prototype, variable_shape=variable_shape)
         opts = backend_opts_from_heuristics(backend, prototype)
     else:
         raise ValueError(f'Backend opts value: {backend_opts} is invalid')
@@ -0,0 +1,128 @@
+"""Checksum verification policies applied by backends when reading data.
+
+Every local backend records a ``xxh64`` checksum of each sample when it is
+written, and (by default) recomputes it on every read to detect disk
+corruption. For read-mostly data in immutable commits, hashing every sample on
+every read can be a significant share of the CPU time spent per epoch. A
+:class:`ChecksumVerifier` instance is shared by the backend accessors of a
+checkout in order to decide which reads are verified:
+
+*  ``always``: every read is verified (default).
+
+*  ``once``: a sample is verified the first time it is read by the checkout;
+   later reads of the same sample are not.
+
+*  ``sampled``: a random fraction of reads are verified.
+
+*  ``never``: no reads are verified.
+"""
+import random
+from typing import NamedTuple, Set
+
+CHECKSUM_POLICIES = ('always', 'once', 'sampled', 'never')
+
+ChecksumCounts = NamedTuple('ChecksumCounts', [('verified', int), ('skipped', int)])
+
+
+class ChecksumVerifier(object):
+    """Decides if the checksum of a sample read should be verified.
+
+    Parameters
+    ----------
+    policy : str, optional
+        one of ``always``, ``once``, ``sampled``, or ``never``. Default is
+        ``always``.
+    fraction : float, optional, kwarg-only
+        fraction of reads (in the range [0, 1]) which are verified under the
+        ``sampled`` policy. Ignored for other policies. Default is 0.1.
+
+    Raises
+    ------
+    ValueError
+        If the policy name is not valid or the fraction is out of range.
+    """
+
+    def __init__(self, policy: str = 'always', *, fraction: float = 0.1):
+        if policy not in CHECKSUM_POLICIES:
+            raise ValueError(
+                f'checksum policy: {policy} invalid. Must be one of {CHECKSUM_POLICIES}')
+        if not (0 <= fraction <= 1):
+            raise ValueError(f'checksum verify fraction: {fraction} not in range [0, 1]')
+        self._policy = policy
+        self._fraction = fraction
+        self._rng = random.Random()
+        # hashes of the (immutable) data hash specs verified under ``once``.
+        self._verified_specs: Set[int] = set()
+        self._num_verified = 0
+        self._num_skipped = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(policy={self._policy}, fraction={self._fraction})'
+
+    @property
+    def policy(self) -> str:
+        """Name of the verification policy in use. Read-only attribute.
+        """
+        return self._policy
+
+    @property
+    def fraction(self) -> float:
+        """Fraction of reads verified under the ``sampled`` policy. Read-only attribute.
+        """
+        return self._fraction
+
+    @property
+    def counts(self) -> ChecksumCounts:
+        """Number of reads which were verified and which skipped verification.
+
+        Returns
+        -------
+        ChecksumCounts
+            NamedTuple with fields ``verified`` and ``skipped``
+        """
+        return ChecksumCounts(self._num_verified, self._num_skipped)
+
+    def reset_counts(self):
+        """Set the verified and skipped counters back to zero.
+        """
+        self._num_verified = 0
+        self._num_skipped = 0
+
+    def should_verify(self, hashVal: NamedTuple) -> bool:
+        """Determine if the checksum of the data read for a spec should be checked.
+
+        Parameters
+        ----------
+        hashVal : NamedTuple
+            backend specific data hash specification of the sample being read.
+
+        Returns
+        -------
+        bool
+            True if the read should be verified. The caller must then call
+            :meth:`record_verified` once the checksum has been found to match.
+        """
+        if self._policy == 'always':
+            verify = True
+        elif self._policy == 'once':
+            verify = hash(hashVal) not in self._verified_specs
+        elif self._policy == 'sampled':
+            verify = self._rng.random() < self._fraction
+        else:
+            verify = False
+
+        if not verify:
+            self._num_skipped += 1
+        return verify
+
+    def record_verified(self, hashVal: NamedTuple):
+        """Record that the checksum of the data read for a spec matched.
+
+        Parameters
+        ----------
+        hashVal : NamedTuple
+            backend specific data hash specification of the sample read.
+        """
+        self._num_verified += 1
+        if self._policy == 'once':
+            self._verified_specs.add(hash(hashVal))
@@ -0,0 +1,166 @@
+"""In-process cache of decoded sample data shared between arraysets.
+
+Repeatedly iterating over the same samples (ie. over many training epochs)
+requires every sample be re-read, decompressed and checksum verified from the
+backend storage on each pass. A :class:`SampleCache` keeps the decoded arrays
+in memory, bounded by a total byte budget with least recently used eviction.
+
+Entries are keyed by the data hash digest of the sample content rather than
+by arrayset or sample name. Samples with identical content (under different
+names, in different arraysets, or in checkouts of different commits) share a
+single cache entry, and an entry can never become stale since the content
+stored under a digest can never change.
+"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+CacheStats = NamedTuple('CacheStats', [('hits', int), ('misses', int),
+                                       ('evictions', int), ('count', int),
+                                       ('nbytes', int), ('max_nbytes', int)])
+
+
+class SampleCache(object):
+    """Byte budgeted LRU cache of decoded sample arrays.
+
+    Attach an instance to any number of arraysets (from any checkouts) via
+    :attr:`~.arrayset.ArraysetDataReader.sample_cache`:
+
+        >>> cache = SampleCache(max_nbytes=2 * 1024 ** 3)
+        >>> co = repo.checkout()
+        >>> aset = co.arraysets['images']
+        >>> aset.sample_cache = cache
+        >>> for epoch in range(10):
+        ...     for key in aset.keys():
+        ...         arr = aset[key]  # only read from disk on the first epoch
+        >>> cache.stats
+        CacheStats(hits=..., misses=..., evictions=0, count=..., nbytes=..., max_nbytes=2147483648)
+
+    Arrays are stored (and returned) with their ``WRITEABLE`` flag cleared so
+    that modifications cannot alter the data seen by later reads; call
+    ``.copy()`` on a sample if it needs to be modified.
+
+    Parameters
+    ----------
+    max_nbytes : int
+        maximum total size (in bytes) of the arrays held in the cache. Arrays
+        larger than this are never cached.
+
+    Raises
+    ------
+    ValueError
+        If ``max_nbytes`` is not a positive integer.
+    """
+
+    def __init__(self, max_nbytes: int):
+        if not isinstance(max_nbytes, int) or (max_nbytes <= 0):
+            raise ValueError(f'max_nbytes: {max_nbytes} must be an int > 0')
+        self._max_nbytes = max_nbytes
+        self._nbytes = 0
+        self._data: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(max_nbytes={self._max_nbytes})'
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._data
+
+    @property
+    def max_nbytes(self) -> int:
+        """Maximum total size of the cached arrays. Read-only attribute.
+        """
+        return self._max_nbytes
+
+    @property
+    def stats(self) -> CacheStats:
+        """Usage statistics of the cache.
+
+        Returns
+        -------
+        CacheStats
+            NamedTuple with fields ``hits``, ``misses``, ``evictions``,
+            ``count`` (number of cached arrays), ``nbytes`` (total size of
+            cached arrays), and ``max_nbytes``.
+        """
+        return CacheStats(self._hits, self._misses, self._evictions,
+                          len(self._data), self._nbytes, self._max_nbytes)
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        """Retrieve the array cached for a data hash digest.
+
+        Parameters
+        ----------
+        digest : str
+            data hash digest of the sample content.
+
+        Returns
+        -------
+        Optional[np.ndarray]
+            read-only cached array if present, otherwise None.
+        """
+        with self._lock:
+            try:
+                arr = self._data[digest]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._data.move_to_end(digest)
+            self._hits += 1
+            return arr
+
+    def put(self, digest: str, arr: np.ndarray) -> np.ndarray:
+        """Add an array to the cache, evicting least recently used entries to fit.
+
+        Parameters
+        ----------
+        digest : str
+            data hash digest of the sample content.
+        arr : np.ndarray
+            decoded sample data. If the array does not own it's memory (ie. it
+            is a view into a larger buffer or a memory mapped file), a copy
+            is cached so the byte budget reflects the memory actually held.
+
+        Returns
+        -------
+        np.ndarray
+            the read-only array as held in the cache. An array too large to be
+            cached is not copied, but is still marked read-only, so callers
+            always receive read-only arrays.
+        """
+        if arr.nbytes > self._max_nbytes:
+            arr.flags.writeable = False
+            return arr
+        if not arr.flags.owndata:
+            arr = arr.copy()
+        arr.flags.writeable = False
+
+        with self._lock:
+            if digest in self._data:
+                self._data.move_to_end(digest)
+                return self._data[digest]
+            while self._nbytes + arr.nbytes > self._max_nbytes:
+                _, evicted = self._data.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+                self._evictions += 1
+            self._data[digest] = arr
+            self._nbytes += arr.nbytes
+        return arr
+
+    def clear(self):
+        """Remove all arrays from the cache and reset the statistics counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
@@ -9,12 +9,16 @@ from uuid import uuid4
 import lmdb
 import warnings
 
-from .arrayset import Arraysets
+from .arrayset import Arraysets, ReaderWorkerPool
+from .backends.verification import ChecksumVerifier
 from .diff import ReaderUserDiff, WriterUserDiff
+from .hashing import HashingEngine, HashingStats
 from .merger import select_merge_algorithm
 from .metadata import MetadataReader, MetadataWriter
 from .records import commiting, hashs, heads
+from .records.spec_index import SpecIndex
 from .utils import cm_weakref_obj_proxy
+from .write_behind import WriteBehindQueue
 
 
 class ReaderCheckout(object):
@@ -65,7 +69,9 @@ class ReaderCheckout(object):
                  base_path: os.PathLike, labelenv: lmdb.Environment,
                  dataenv: lmdb.Environment, hashenv: lmdb.Environment,
                  branchenv: lmdb.Environment, refenv: lmdb.Environment,
-                 commit: str):
+                 commit: str, *, checksum_policy: str = 'always',
+                 checksum_fraction: float = 0.1, lazy_specs: bool = False,
+                 in_memory: bool = False):
         """Developer documentation of init method.
 
         Parameters
@@ -84,7 +90,19 @@ class ReaderCheckout(object):
             db where the commit references are stored.
         commit : str
             specific commit hash to checkout
+        checksum_policy : str, kwarg-only
+            one of ``always``, ``once``, ``sampled``, or ``never``; determines
+            which data reads have their checksum verified.
+        checksum_fraction : float, kwarg-only
+            fraction of reads verified with the ``sampled`` checksum policy.
+        lazy_specs : bool, kwarg-only
+            if True, arrayset sample specs are resolved on demand rather than
+            when the checkout is opened.
+        in_memory : bool, kwarg-only
+            if True, nothing is written to disk by the checkout; the sample
+            spec index of the commit is neither read from nor saved to disk.
         """
+        self._verifier = ChecksumVerifier(checksum_policy, fraction=checksum_fraction)
         self._commit_hash = commit
         self._repo_path = base_path
         self._labelenv = labelenv
@@ -102,7 +120,11 @@ class ReaderCheckout(object):
         self._arraysets = Arraysets._from_commit(
             repo_pth=self._repo_path,
             hashenv=self._hashenv,
-            cmtrefenv=self._dataenv)
+            cmtrefenv=self._dataenv,
+            verifier=self._verifier,
+            lazy_specs=lazy_specs,
+            spec_index=None if in_memory else SpecIndex(self._repo_path, self._commit_hash))
+        self._pool = ReaderWorkerPool(self._arraysets._arraysets)
         self._differ = ReaderUserDiff(
             commit_hash=self._commit_hash,
             branchenv=self._branchenv,
@@ -580,6 +602,44 @@ class ReaderCheckout(object):
         self.__verify_checkout_alive()
         return self._commit_hash
 
+    @property
+    def checksum_policy(self) -> str:
+        """Checksum verification policy applied when reading data.
+
+        One of:
+
+        *  ``always``: every read is verified against the recorded checksum.
+        *  ``once``: each sample is verified the first time it is read.
+        *  ``sampled``: a random fraction of reads are verified.
+        *  ``never``: no reads are verified.
+
+        Set via the ``checksum_policy`` argument of
+        :meth:`~hangar.repository.Repository.checkout`.
+
+        Returns
+        -------
+        str
+            name of the policy
+        """
+        self.__verify_checkout_alive()
+        return self._verifier.policy
+
+    @property
+    def checksum_counts(self):
+        """Number of data reads which were verified and skipped by this checkout.
+
+        Only reads performed in this process are counted; reads performed by
+        the :meth:`~.arrayset.ArraysetDataReader.get_batch` worker pool are
+        not included.
+
+        Returns
+        -------
+        ChecksumCounts
+            NamedTuple with integer fields ``verified`` and ``skipped``
+        """
+        self.__verify_checkout_alive()
+        return self._verifier.counts
+
     def close(self) -> None:
         """Gracefully close the reader checkout object.
 
@@ -589,6 +649,8 @@ class ReaderCheckout(object):
         multiple simultaneous read checkouts.
         """
         self.__verify_checkout_alive()
+        with suppress(AttributeError):
+            self._pool.close()
         with suppress(AttributeError):
             self._arraysets._close()
 
@@ -613,6 +675,10 @@ class ReaderCheckout(object):
             del self._metadata
         with suppress(AttributeError):
             del self._differ
+        with suppress(AttributeError):
+            del self._pool
+        with suppress(AttributeError):
+            del self._verifier
 
         del self._commit_hash
         del self._repo_path
@@ -665,6 +731,15 @@ class WriterCheckout(object):
     occur, the :py:meth:`~.Repository.force_release_writer_lock` method must be
     called manually when a new python process wishes to open the writer
     checkout.
+
+    If opened in write-behind mode (``repo.checkout(write=True,
+    write_behind=64)``), samples added to arraysets are validated, copied, and
+    queued, and a background thread writes them to the storage backends while
+    the application prepares the next sample. Once ``write_behind`` samples
+    are waiting, adding another blocks until the backends catch up. An error
+    writing a queued sample is raised by the next ``add``, :meth:`flush`,
+    :meth:`commit`, or :meth:`close`. Queued samples are always stored before
+    a commit is made or the checkout is closed.
     """
 
     def __init__(self,
@@ -676,7 +751,8 @@ class WriterCheckout(object):
                  stageenv: lmdb.Environment,
                  branchenv: lmdb.Environment,
                  stagehashenv: lmdb.Environment,
-                 mode: str = 'a'):
+                 mode: str = 'a',
+                 write_behind: int = 0):
         """Developer documentation of init method.
 
         Parameters
@@ -700,6 +776,10 @@ class WriterCheckout(object):
             db where the staged hash record data is stored.
         mode : str, optional
             open in write or read only mode, default is 'a' which is write-enabled.
+        write_behind : int, optional
+            if > 0, the maximum number of samples which are queued to be
+            written in the background. default is 0, which writes samples
+            before ``add`` returns.
         """
         self._is_conman = False
         self._repo_path = repo_pth
@@ -712,6 +792,8 @@ class WriterCheckout(object):
         self._stageenv = stageenv
         self._branchenv = branchenv
         self._stagehashenv = stagehashenv
+        self._hasher = HashingEngine()
+        self._write_behind = WriteBehindQueue(write_behind) if write_behind > 0 else None
 
         self._arraysets: Arraysets = None
         self._differ: WriterUserDiff = None
@@ -839,7 +921,9 @@ class WriterCheckout(object):
             repo_pth=self._repo_path,
             hashenv=self._hashenv,
             stageenv=self._stageenv,
-            stagehashenv=self._stagehashenv)
+            stagehashenv=self._stagehashenv,
+            hasher=self._hasher,
+            write_behind=self._write_behind)
         self._differ = WriterUserDiff(
             stageenv=self._stageenv,
             refenv=self._refenv,
@@ -1400,6 +1484,44 @@ class WriterCheckout(object):
         self.__acquire_writer_lock()
         return self._branch_name
 
+    @property
+    def hashing_stats(self) -> HashingStats:
+        """Number of samples hashed by this checkout and the time spent doing so.
+
+        Digests and checksums of large samples are computed in a pool of worker
+        threads; ``seconds`` is the time spent hashing summed over all threads.
+
+        Returns
+        -------
+        HashingStats
+            NamedTuple with fields ``samples``, ``seconds``, and
+            ``seconds_per_sample``
+        """
+        self.__acquire_writer_lock()
+        return self._hasher.stats
+
+    @property
+    def write_behind(self) -> bool:
+        """Bool indicating if samples are written in the background. Read-only.
+        """
+        self.__acquire_writer_lock()
+        return self._write_behind is not None
+
+    def flush(self) -> None:
+        """Wait until every sample queued in write-behind mode has been stored.
+
+        No-op unless the checkout was opened in write-behind mode.
+
+        Raises
+        ------
+        RuntimeError
+            If a queued sample could not be written. Samples queued after it
+            are discarded.
+        """
+        self.__acquire_writer_lock()
+        if self._write_behind is not None:
+            self._write_behind.flush()
+
     @property
     def commit_hash(self) -> str:
         """Commit hash which the staging area of `branch_name` is based on.
@@ -1433,7 +1555,7 @@ class WriterCheckout(object):
             commit hash of the new commit for the `master` branch this checkout
             was started from.
         """
-        self.__acquire_writer_lock()
+        self.flush()
         commit_hash = select_merge_algorithm(
             message=message,
             branchenv=self._branchenv,
@@ -1458,7 +1580,9 @@ class WriterCheckout(object):
             repo_pth=self._repo_path,
             hashenv=self._hashenv,
             stageenv=self._stageenv,
-            stagehashenv=self._stagehashenv)
+            stagehashenv=self._stagehashenv,
+            hasher=self._hasher,
+            write_behind=self._write_behind)
         self._differ = WriterUserDiff(
             stageenv=self._stageenv,
             refenv=self._refenv,
@@ -1486,8 +1610,11 @@ class WriterCheckout(object):
         ------
         RuntimeError
             If no changes have been made in the staging area, no commit occurs.
+        RuntimeError
+            In write-behind mode, if a queued sample could not be written, no
+            commit occurs.
         """
-        self.__acquire_writer_lock()
+        self.flush()
 
         open_asets = []
         for arrayset in self._arraysets.values():
@@ -1550,6 +1677,9 @@ class WriterCheckout(object):
         """
         self.__acquire_writer_lock()
         print(f'Hard reset requested with writer_lock: {self._writer_lock}')
+        if self._write_behind is not None:
+            with suppress(RuntimeError):
+                self._write_behind.flush()  # samples are discarded by the reset anyway
 
         if self._differ.status() == 'CLEAN':
             e = RuntimeError(f'No changes made in staging area. No reset necessary.')
@@ -1575,7 +1705,9 @@ class WriterCheckout(object):
             repo_pth=self._repo_path,
             hashenv=self._hashenv,
             stageenv=self._stageenv,
-            stagehashenv=self._stagehashenv)
+            stagehashenv=self._stagehashenv,
+            hasher=self._hasher,
+            write_behind=self._write_behind)
         self._differ = WriterUserDiff(
             stageenv=self._stageenv,
             refenv=self._refenv,
@@ -1589,9 +1721,22 @@ class WriterCheckout(object):
         Failure to call this method after the writer checkout has been used will
         result in a lock being placed on the repository which will not allow any
         writes until it has been manually cleared.
+
+        Raises
+        ------
+        RuntimeError
+            In write-behind mode, if a queued sample could not be written. The
+            checkout is closed regardless.
         """
         self.__acquire_writer_lock()
 
+        writeBehindErr = None
+        if self._write_behind is not None:
+            try:
+                self._write_behind.close()
+            except RuntimeError as e:
+                writeBehindErr = e
+
         if hasattr(self, '_arraysets') and (getattr(self, '_arraysets') is not None):
             self._arraysets._close()
 
@@ -1619,6 +1764,7 @@ class WriterCheckout(object):
             del self._differ
 
         heads.release_writer_lock(self._branchenv, self._writer_lock)
+        self._hasher.close()
 
         del self._refenv
         del self._hashenv
@@ -1626,9 +1772,13 @@ class WriterCheckout(object):
         del self._stageenv
         del self._branchenv
         del self._stagehashenv
+        del self._hasher
+        del self._write_behind
         del self._repo_path
         del self._writer_lock
         del self._branch_name
         del self._is_conman
         atexit.unregister(self.close)
+        if writeBehindErr is not None:
+            raise writeBehindErr
         return
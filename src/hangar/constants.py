@@ -9,6 +9,13 @@ SEP_HSH = '$'
 CMT_KV_JOIN_KEY = SEP_LST.encode()
 CMT_DIGEST_JOIN_KEY = ''
 CMT_REC_JOIN_KEY = SEP_HSH.encode()
+# commit refs stored as a series of independently compressed chunks of records
+# begin with this prefix (a single compressed buffer never starts with NUL).
+CMT_REF_CHUNKED_PREFIX = b'\x00cref1'
+CMT_REF_CHUNK_NBYTES = 16_000_000
+# commit ref storage format of repositories which store refs compressed in
+# chunks and commits as deltas against their parent (see ``K_CMT_REF_FORMAT``).
+CMT_REF_FORMAT = 1
 
 K_INT = f'#'
 K_BRANCH = f'branch{SEP_KEY}'
@@ -18,8 +25,10 @@ K_STGARR = f'a{SEP_KEY}'
 K_STGMETA = f'l{SEP_KEY}'
 K_SCHEMA = f's{SEP_KEY}'
 K_HASH = f'h{SEP_KEY}'
+K_STGDIGEST = f'~{SEP_KEY}'
 K_WLOCK = f'writerlock{SEP_KEY}'
 K_VERSION = 'software_version'
+K_CMT_REF_FORMAT = 'commit_ref_format'
 
 WLOCK_SENTINAL = 'LOCK_AVAILABLE'
 
@@ -31,6 +40,8 @@ DIR_DATA = 'data'
 DIR_DATA_STORE = 'store_data'
 DIR_DATA_STAGE = 'stage_data'
 DIR_DATA_REMOTE = 'remote_data'
+DIR_SPEC_INDEX = 'spec_index'
+DIR_COMMIT_CACHE = 'commit_cache'
 
 # configuration file names:
 
@@ -55,6 +66,14 @@ LMDB_STAGE_REF_NAME = 'stage_ref.lmdb'
 LMDB_STAGE_HASH_NAME = 'stage_hash.lmdb'
 
 
+# persisted sample spec index of read-only checkouts
+
+SPEC_INDEX_MAX_NBYTES = 1_000_000_000
+
+# persisted unpacked commit records of read-only checkouts
+
+COMMIT_CACHE_MAX_NBYTES = 2_000_000_000
+
 # readme file
 
 README_FILE_NAME = 'README.txt'
@@ -1,7 +1,5 @@
 import os
-import platform
 import shutil
-import tempfile
 import warnings
 from collections import Counter
 from os.path import join as pjoin
@@ -167,6 +165,7 @@ if they aren't right now, we get circular imports...
 """
 
 from .records import commiting, heads, parsing, vcompat  # noqa: E402
+from .records.commit_cache import CommitCache  # noqa: E402
 from .utils import readme_contents  # noqa: E402
 
 
@@ -288,11 +287,12 @@ class Environments(object):
 
         self._open_environments()
         vcompat.set_repository_software_version(branchenv=self.branchenv, ver_str=__version__)
+        vcompat.set_repository_commit_ref_format(self.branchenv, c.CMT_REF_FORMAT)
         heads.create_branch(self.branchenv, 'master', '')
         heads.set_staging_branch_head(self.branchenv, 'master')
         return self.repo_path
 
-    def checkout_commit(self, branch_name: str = '', commit: str = '') -> str:
+    def checkout_commit(self, branch_name: str = '', commit: str = '', *, in_memory: bool = False) -> str:
         """Set up db environment with unpacked commit ref records.
 
         Parameters
@@ -303,6 +303,10 @@ class Environments(object):
             name of the branch to read, defaults to ''
         commit : str, optional
             name of the commit to read, defaults to ''
+        in_memory : bool, optional
+            If True, and the commit is not already checked out, the records are
+            read from the decompressed commit refs held in memory rather than
+            an unpacked environment on disk, defaults to False
 
         Returns
         -------
@@ -322,24 +326,15 @@ class Environments(object):
                   f'\n * Checking out writing HEAD BRANCH: {head_branch}'
         print(txt)
 
-        # On UNIX-like system, an open process still retains ability to
-        # interact with disk space allocated to a file when it is removed from
-        # disk. Windows does not, and will not allow file to be removed if a
-        # process is interacting with it. While the CM form is cleaner, this
-        # hack allows similar usage on Windows platforms.
-
-        if platform.system() != 'Windows':
-            with tempfile.TemporaryDirectory() as tempD:
-                tmpDF = os.path.join(tempD, f'{commit_hash}.lmdb')
-                tmpDB = lmdb.open(path=tmpDF, **c.LMDB_SETTINGS)
-                commiting.unpack_commit_ref(self.refenv, tmpDB, commit_hash)
-                self.cmtenv[commit_hash] = tmpDB
-        else:
-            tempD = tempfile.mkdtemp()
-            tmpDF = os.path.join(tempD, f'{commit_hash}.lmdb')
-            tmpDB = lmdb.open(path=tmpDF, **c.LMDB_SETTINGS)
-            commiting.unpack_commit_ref(self.refenv, tmpDB, commit_hash)
-            self.cmtenv[commit_hash] = tmpDB
+        # The unpacked records of a commit never change, so the (read only)
+        # environment is shared by every checkout of the commit, and is kept on
+        # disk for checkouts made by later (or concurrent) processes.
+        if commit_hash not in self.cmtenv:
+            if in_memory:
+                self.cmtenv[commit_hash] = commiting.get_commit_ref_view(self.refenv, commit_hash)
+            else:
+                cache = CommitCache(self.repo_path, self.refenv)
+                self.cmtenv[commit_hash] = cache.open(commit_hash)
 
         return commit_hash
 
@@ -372,9 +367,4 @@ class Environments(object):
         self.labelenv.close()
         self.stagehashenv.close()
         for env in self.cmtenv.values():
-            if platform.system() == 'Windows':
-                envpth = env.path()
-                env.close()
-                os.remove(envpth)
-            else:
-                env.close()
\ No newline at end of file
+            env.close()
\ No newline at end of file
@@ -14,12 +14,16 @@ except (ImportError, ModuleNotFoundError):  # pragma: no cover
         'installed correctly to use tensorflow dataloader functions')
 
 
-def yield_data(arraysets, sample_names, shuffle=False):  # pragma: no cover
+def yield_data(arraysets, sample_names, shuffle=False, read_size=64):  # pragma: no cover
+    sample_names = list(sample_names)
     if shuffle:
-        sample_names = list(sample_names)
         random.shuffle(sample_names)
-    for name in sample_names:
-        yield tuple([aset[name] for aset in arraysets])
+    # samples are read from the arraysets in blocks of ``read_size`` so that
+    # backends can coalesce reads, but are still yielded one at a time.
+    for start in range(0, len(sample_names), read_size):
+        names = sample_names[start:start + read_size]
+        asetData = [aset.get_batch(names, n_cpus=1) for aset in arraysets]
+        yield from zip(*asetData)
 
 
 def make_tf_dataset(arraysets,
@@ -148,4 +148,27 @@ class TorchDataset(torchdata.Dataset):
         out = []
         for aset in self.hangar_arraysets:
             out.append(aset.get(key))
-        return self.wrapper._make(out)
\ No newline at end of file
+        return self.wrapper._make(out)
+
+    def __getitems__(self, indices: Sequence[int]) -> list:
+        """Batched version of :meth:`__getitem__`.
+
+        Recent versions of :class:`torch.utils.data.DataLoader` call this
+        (when defined) with all the indices of a batch. Each arrayset is read
+        with a single :meth:`~hangar.arrayset.ArraysetDataReader.get_batch`
+        call in the current process, which lets backends coalesce reads of
+        neighboring samples.
+
+        Parameters
+        ----------
+        indices : Sequence[int]
+            sample index locations making up the batch.
+
+        Returns
+        -------
+        list[namedtuple[:class:`torch.Tensor`]]
+            One wrapped sample per index, in the order of ``indices``.
+        """
+        keys = [self.sample_names[index] for index in indices]
+        asetData = [aset.get_batch(keys, n_cpus=1) for aset in self.hangar_arraysets]
+        return [self.wrapper._make(sample) for sample in zip(*asetData)]
@@ -1,4 +1,4 @@
-from itertools import starmap
+from itertools import starmap, zip_longest
 from typing import Iterable
 from typing import List
 from typing import NamedTuple
@@ -8,6 +8,7 @@ from typing import Union
 
 import lmdb
 
+from . import constants as c
 from .context import TxnRegister
 from .records import commiting
 from .records import heads
@@ -77,6 +78,15 @@ DiffAndConflicts = NamedTuple('DiffAndConflicts', [
 # ------------------------------- Differ Methods ------------------------------
 
 
+def _on_record(cursor: lmdb.Cursor, positioned: bool) -> bool:
+    """True if the cursor is positioned on a record, and not at the end of the db.
+
+    The digest sums which follow all records of the staging area are treated as
+    the end of the db.
+    """
+    return positioned and not cursor.key().startswith(c.K_STGDIGEST.encode())
+
+
 def diff_envs(base_env: lmdb.Environment, head_env: lmdb.Environment) -> DiffOutDB:
     """Main diff algorithm to determine changes between unpacked lmdb environments.
 
@@ -100,8 +110,8 @@ def diff_envs(base_env: lmdb.Environment, head_env: lmdb.Environment) -> DiffOut
         headTxn = TxnRegister().begin_reader_txn(head_env)
         baseCur = baseTxn.cursor()
         headCur = headTxn.cursor()
-        moreBase = baseCur.first()
-        moreHead = headCur.first()
+        moreBase = _on_record(baseCur, baseCur.first())
+        moreHead = _on_record(headCur, headCur.first())
 
         while True:
             if moreBase and moreHead:
@@ -122,23 +132,23 @@ def diff_envs(base_env: lmdb.Environment, head_env: lmdb.Environment) -> DiffOut
             # inserted
             if bKey > hKey:
                 added.append((hKey, hVal))
-                moreHead = headCur.next()
+                moreHead = _on_record(headCur, headCur.next())
                 continue
             # deleted
             elif bKey < hKey:
                 deleted.append((bKey, bVal))
-                moreBase = baseCur.next()
+                moreBase = _on_record(baseCur, baseCur.next())
                 continue
             # no change
             elif (bKey == hKey) and (bVal == hVal):
-                moreBase = baseCur.next()
-                moreHead = headCur.next()
+                moreBase = _on_record(baseCur, baseCur.next())
+                moreHead = _on_record(headCur, headCur.next())
                 continue
             # mutated
             else:  # (bKey == hKey) and (bVal != hVal)
                 mutated.append((hKey, hVal))
-                moreBase = baseCur.next()
-                moreHead = headCur.next()
+                moreBase = _on_record(baseCur, baseCur.next())
+                moreHead = _on_record(headCur, headCur.next())
                 continue
 
     finally:
@@ -736,10 +746,15 @@ class WriterUserDiff(BaseUserDiff):
         """
         head_commit = heads.get_branch_head_commit(self._branchenv, self._branch_name)
         if head_commit == '':
-            base_refs = ()
+            base_refs = iter(())
         else:
-            base_refs = commiting.get_commit_ref(self._refenv, head_commit)
-
-        stage_refs = tuple(RecordQuery(self._stageenv)._traverse_all_records())
-        status = 'DIRTY' if (base_refs != stage_refs) else 'CLEAN'
+            base_refs = commiting.iter_commit_ref(self._refenv, head_commit)
+
+        stage_refs = RecordQuery(self._stageenv)._traverse_all_records()
+        # every commit record is read, even after a difference is found, so that
+        # the integrity of the commit refs is always verified.
+        status = 'CLEAN'
+        for base_ref, stage_ref in zip_longest(base_refs, stage_refs):
+            if base_ref != stage_ref:
+                status = 'DIRTY'
         return status
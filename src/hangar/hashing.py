@@ -0,0 +1,191 @@
+"""Computation of the digests and checksums of samples being written.
+
+Every sample written is hashed twice: a ``blake2b`` digest of the content
+(the data hash / content address recorded for the sample) and a ``xxh64``
+checksum (recorded by the backend in order to detect disk corruption on
+read). Both hash functions release the GIL while hashing large buffers, so a
+:class:`HashingEngine` computes them in a thread pool:
+
+*  for a single sample, the checksum is computed in a worker thread while the
+   digest is computed on the calling thread. Both are needed before the
+   sample can be written, so the backend write itself is not overlapped.
+
+*  for a batch of samples, every digest is computed concurrently, and the
+   checksums of samples still to be written are computed while the backend
+   writes the samples before them.
+
+Arrays smaller than ``min_threaded_nbytes`` are always hashed on the calling
+thread, since handing them to a worker would cost more than hashing them.
+"""
+import hashlib
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import cpu_count
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from xxhash import xxh64_hexdigest
+
+# arrays smaller than this (in bytes) are hashed on the calling thread.
+THREADED_HASH_MIN_NBYTES = 2 ** 16
+
+SampleHashes = NamedTuple('SampleHashes', [('digest', str), ('checksum', str)])
+
+HashingStats = NamedTuple('HashingStats', [('samples', int), ('seconds', float),
+                                           ('seconds_per_sample', float)])
+
+
+def data_hash_digest(data: np.ndarray) -> str:
+    """Compute the content address (data hash digest) of a sample.
+
+    The digest covers the array bytes, shape, and dtype.
+    """
+    hasher = hashlib.blake2b(data, digest_size=20)
+    hasher.update(struct.pack(f'<{len(data.shape)}QB', *data.shape, data.dtype.num))
+    return hasher.hexdigest()
+
+
+def data_checksum(data: np.ndarray) -> str:
+    """Compute the checksum recorded by backends to verify the data read from disk.
+    """
+    return xxh64_hexdigest(data)
+
+
+def _completed(result) -> Future:
+    fut = Future()
+    fut.set_result(result)
+    return fut
+
+
+class HashingEngine(object):
+    """Thread pool computing the digests and checksums of samples being written.
+
+    One instance is owned by every :class:`~.checkout.WriterCheckout` and shared
+    by it's arraysets. The worker threads are started on first use, and stopped
+    by :meth:`close`. The time spent hashing is recorded, see :attr:`stats`.
+
+    Parameters
+    ----------
+    max_workers : Optional[int], optional
+        number of hashing threads. If None (default), the number of cpus.
+    min_threaded_nbytes : int, optional, kwarg-only
+        arrays smaller than this (in bytes) are hashed on the calling thread.
+        Default is ``THREADED_HASH_MIN_NBYTES``.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, *,
+                 min_threaded_nbytes: int = THREADED_HASH_MIN_NBYTES):
+        self._max_workers = max_workers if max_workers is not None else cpu_count()
+        self._min_threaded_nbytes = min_threaded_nbytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._samples = 0
+        self._seconds = 0.0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(max_workers={self._max_workers})'
+
+    @property
+    def stats(self) -> HashingStats:
+        """Number of samples hashed and the time spent hashing them.
+
+        Returns
+        -------
+        HashingStats
+            NamedTuple with fields ``samples`` (number of digests computed),
+            ``seconds`` (total time spent computing digests and checksums, summed
+            over all threads), and ``seconds_per_sample``.
+        """
+        with self._lock:
+            perSample = (self._seconds / self._samples) if self._samples else 0.0
+            return HashingStats(self._samples, self._seconds, perSample)
+
+    def reset_stats(self):
+        """Set the sample count and time spent hashing back to zero.
+        """
+        with self._lock:
+            self._samples = 0
+            self._seconds = 0.0
+
+    def close(self):
+        """Stop the worker threads (they are restarted if the engine is used again).
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _timed(self, func: Callable[[np.ndarray], str], data: np.ndarray, count: bool) -> str:
+        start = time.perf_counter()
+        res = func(data)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._seconds += elapsed
+            if count:
+                self._samples += 1
+        return res
+
+    def _submit(self, func: Callable[[np.ndarray], str], data: np.ndarray, count: bool) -> Future:
+        if (self._max_workers < 1) or (data.nbytes < self._min_threaded_nbytes):
+            return _completed(self._timed(func, data, count))
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix='hangar-hashing')
+        return self._executor.submit(self._timed, func, data, count)
+
+    def hash(self, data: np.ndarray) -> SampleHashes:
+        """Compute the digest and checksum of a single sample concurrently.
+
+        Only the two hashes overlap each other; the call blocks until both are
+        computed.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            sample to hash
+
+        Returns
+        -------
+        SampleHashes
+            NamedTuple with fields ``digest`` and ``checksum``
+        """
+        checksum = self._submit(data_checksum, data, count=False)
+        digest = self._timed(data_hash_digest, data, count=True)
+        return SampleHashes(digest, checksum.result())
+
+    def digests(self, arrays: Sequence[np.ndarray]) -> List[str]:
+        """Compute the digests of many samples concurrently.
+
+        Parameters
+        ----------
+        arrays : Sequence[np.ndarray]
+            samples to hash
+
+        Returns
+        -------
+        List[str]
+            digest of each sample, in the same order as ``arrays``
+        """
+        futures = [self._submit(data_hash_digest, arr, count=True) for arr in arrays]
+        return [fut.result() for fut in futures]
+
+    def checksums(self, arrays: Sequence[np.ndarray]) -> List[Future]:
+        """Start computing the checksums of many samples.
+
+        The futures are returned immediately so that the caller can write each
+        sample as soon as it's checksum is available, while the checksums of
+        later samples are still being computed.
+
+        Parameters
+        ----------
+        arrays : Sequence[np.ndarray]
+            samples to hash
+
+        Returns
+        -------
+        List[Future]
+            future resolving to the checksum of each sample, in the same order
+            as ``arrays``
+        """
+        return [self._submit(data_checksum, arr, count=False) for arr in arrays]
@@ -5,7 +5,7 @@ from typing import Optional, Union, Iterator, Tuple, Dict
 import lmdb
 
 from .context import TxnRegister
-from .records import parsing
+from .records import parsing, stage_digest
 from .records.queries import RecordQuery
 from .utils import is_suitable_user_key, is_ascii
 
@@ -381,7 +381,7 @@ class MetadataWriter(MetadataReader):
                 hashVal = parsing.hash_meta_db_val_from_raw_val(value)
                 self._labelTxn.put(hashKey, hashVal)
 
-            self._dataTxn.put(metaRecKey, metaRecVal)
+            stage_digest.put_record(self._dataTxn, metaRecKey, metaRecVal)
             self._mspecs[key] = hashKey
 
         finally:
@@ -416,7 +416,7 @@ class MetadataWriter(MetadataReader):
                 raise KeyError(f'No metadata exists with key: {key}')
 
             metaRecKey = parsing.metadata_record_db_key_from_raw_key(key)
-            delete_succeeded = self._dataTxn.delete(metaRecKey)
+            delete_succeeded = stage_digest.delete_record(self._dataTxn, metaRecKey)
             if delete_succeeded is False:
                 raise KeyError(f'No metadata exists with key: {key}')
             del self._mspecs[key]
@@ -0,0 +1,147 @@
+"""On-disk cache of the unpacked record environments of committed data.
+
+A read-only checkout reads the records of it's commit from an lmdb environment
+holding every record of the commit. Building this environment requires the
+commit refs to be decompressed, verified, and written to disk. Since the
+contents of a commit can never change, the environment built the first time a
+commit is checked out is kept in the repository directory, and opened (read
+only) by later checkouts of the same commit in any process.
+
+An environment is built in a temporary file which is moved into place only
+once all records are written, so a partially written environment is never
+opened; the integrity of the commit refs is verified at that time. As the
+environment is never written again, no lmdb lock is needed to share it
+between processes. Once the total size of all environments exceeds a byte
+budget, the least recently used commits are removed.
+"""
+import os
+import tempfile
+from contextlib import suppress
+from os.path import join as pjoin
+from typing import Optional
+
+import lmdb
+
+from . import commiting
+from .. import constants as c
+
+_ENV_SUFFIX = '.lmdb'
+
+
+class CommitCache(object):
+    """Unpacked record environments of the commits in a repository.
+
+    Parameters
+    ----------
+    repo_path : str
+        path to the hangar repository directory (``.hangar``).
+    refenv : lmdb.Environment
+        lmdb environment where the commit refs are stored.
+    max_nbytes : int, optional
+        total size (in bytes) of the environments of all commits above which
+        the least recently used are removed. Default is
+        ``constants.COMMIT_CACHE_MAX_NBYTES``.
+    """
+
+    def __init__(self, repo_path: str, refenv: lmdb.Environment, *,
+                 max_nbytes: int = c.COMMIT_CACHE_MAX_NBYTES):
+        self._cache_dir = pjoin(repo_path, c.DIR_COMMIT_CACHE)
+        self._refenv = refenv
+        self._max_nbytes = max_nbytes
+
+    def _env_path(self, commit: str) -> str:
+        return pjoin(self._cache_dir, f'{commit}{_ENV_SUFFIX}')
+
+    def open(self, commit: str) -> lmdb.Environment:
+        """Open the (read only) environment holding every record of a commit.
+
+        Parameters
+        ----------
+        commit : str
+            hash of the commit.
+
+        Returns
+        -------
+        lmdb.Environment
+            environment with all records of the commit.
+
+        Raises
+        ------
+        ValueError
+            If no commit exists with the provided hash.
+        IOError
+            If the commit refs are corrupt (when the environment is built).
+        """
+        try:
+            commitExists = commiting.check_commit_hash_in_history(self._refenv, commit)
+        except lmdb.BadValsizeError:
+            commitExists = False
+        if not commitExists:
+            raise ValueError(f'No commit exists with the hash: {commit}')
+
+        envPth = self._env_path(commit)
+        env = self._open_existing(envPth)
+        if env is None:
+            self._populate(commit, envPth)
+            env = lmdb.open(path=envPth, readonly=True, **c.LMDB_SETTINGS)
+            self._evict(envPth)
+        return env
+
+    @staticmethod
+    def _open_existing(envPth: str) -> Optional[lmdb.Environment]:
+        if not os.path.isfile(envPth):
+            return None
+        try:
+            env = lmdb.open(path=envPth, readonly=True, **c.LMDB_SETTINGS)
+        except lmdb.Error:
+            # unreadable environment, remove so it is built again.
+            with suppress(OSError):
+                os.remove(envPth)
+            return None
+        # mark the commit as recently used for eviction.
+        with suppress(OSError):
+            os.utime(envPth)
+        return env
+
+    def _populate(self, commit: str, envPth: str):
+        """Unpack (and verify) the commit refs into a new environment at ``envPth``.
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+        fd, tmpPth = tempfile.mkstemp(suffix='.tmp', prefix=f'{commit}.', dir=self._cache_dir)
+        os.close(fd)
+        try:
+            tmpDB = lmdb.open(path=tmpPth, **c.LMDB_SETTINGS)
+            try:
+                commiting.unpack_commit_ref(self._refenv, tmpDB, commit)
+            finally:
+                tmpDB.close()
+            # atomic; a concurrent process building the same commit writes
+            # identical records, so it does not matter which is kept.
+            os.replace(tmpPth, envPth)
+        finally:
+            with suppress(OSError):
+                os.remove(tmpPth)
+
+    def _evict(self, keepPth: str):
+        """Remove the least recently used environments until under the byte budget.
+
+        The environment at ``keepPth`` is never removed. Environments which are
+        open in other processes remain readable by them on platforms which
+        allow open files to be removed, and are skipped on those which do not.
+        """
+        envs, totalNbytes = [], 0
+        for entry in os.scandir(self._cache_dir):
+            if entry.is_file() and entry.name.endswith(_ENV_SUFFIX):
+                stat = entry.stat()
+                envs.append((stat.st_mtime, entry.path, stat.st_size))
+                totalNbytes += stat.st_size
+        for _, path, nbytes in sorted(envs):
+            if totalNbytes <= self._max_nbytes:
+                break
+            if path == keepPth:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            totalNbytes -= nbytes
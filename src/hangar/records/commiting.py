@@ -5,17 +5,25 @@ from os.path import join as pjoin
 import shutil
 from contextlib import contextmanager
 import configparser
+import heapq
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
 
 import lmdb
 
-from . import heads, parsing
+from . import heads, parsing, stage_digest, vcompat
 from .. import constants as c
 from ..context import TxnRegister
 from .parsing import DigestAndBytes
 from .queries import RecordQuery
+from .record_view import RecordView
 from ..utils import symlink_rel
 
 
+# max number of deltas replayed to rebuild the records of a commit; a commit
+# further from the last checkpoint stores the full set of it's records.
+COMMIT_REF_CHECKPOINT_INTERVAL = 16
+
+
 """
 Reading commit specifications and parents.
 ------------------------------------------
@@ -225,55 +233,185 @@ Methods for reading packed commit data and reconstructing an unpacked format.
 """
 
 
-def get_commit_ref(refenv, commit_hash):
-    """Read the commit data record references from a specific commit.
+def _commit_ref_delta_depth(reftxn: lmdb.Transaction, commit_hash: str) -> int:
+    """Number of deltas replayed to rebuild the records of a commit (0 for checkpoints).
+    """
+    deltaVal = reftxn.get(parsing.commit_ref_delta_db_key_from_raw_key(commit_hash), default=False)
+    if deltaVal is False:
+        return 0
+    return parsing.commit_ref_delta_raw_val_from_db_val(deltaVal).depth
 
-    This only returns a list of tuples with binary encoded key/value pairs.
+
+def _commit_ref_vals(reftxn: lmdb.Transaction,
+                     commit_hash: str) -> Tuple[bytes, Tuple[parsing.CommitRefDelta]]:
+    """Read the refs of the nearest checkpoint of a commit and the deltas after it.
 
     Parameters
     ----------
-    refenv : lmdb.Environment`
-        lmdb environment where the references are stored
-    commit_hash : string
-        hash of the commit to retrieve.
+    reftxn : lmdb.Transaction
+        reader transaction on the refenv
+    commit_hash : str
+        hash of the commit to read the refs of
 
     Returns
     -------
-    tuple
-        tuple of tuples containing encoded key/value pairs of the data
-        records
+    Tuple[bytes, Tuple[parsing.CommitRefDelta]]
+        compressed refs db value of the checkpoint commit, and the deltas to
+        apply to it (most recent first).
+
+    Raises
+    ------
+    ValueError
+        if no refs exist for the commit (or any commit in it's delta chain)
+    """
+    deltas = []
+    cmt = commit_hash
+    while True:
+        refVal = reftxn.get(parsing.commit_ref_db_key_from_raw_key(cmt), default=False)
+        if refVal is not False:
+            break
+        deltaVal = reftxn.get(parsing.commit_ref_delta_db_key_from_raw_key(cmt), default=False)
+        if deltaVal is False:
+            raise ValueError(f'No commit exists with the hash: {commit_hash}')
+        deltas.append(parsing.commit_ref_delta_raw_val_from_db_val(deltaVal))
+        cmt = deltas[-1].parent
+    return refVal, tuple(deltas)
+
+
+def _iter_commit_ref_records(refVal: bytes,
+                             deltas: Sequence[parsing.CommitRefDelta]) -> Iterator[Tuple[bytes, bytes]]:
+    """Stream the (sorted) records of a checkpoint commit with deltas applied.
+
+    Only the records changed by the deltas are held in memory; the records of
+    the checkpoint are decompressed one chunk at a time.
+    """
+    records = parsing.iter_commit_ref_db_kvs(refVal)
+    if not deltas:
+        return records
+
+    changed, removed = {}, set()
+    for delta in reversed(deltas):
+        changed.update(delta.db_kvs)
+        removed.difference_update(k for k, _ in delta.db_kvs)
+        removed.update(delta.removed)
+        for key in delta.removed:
+            changed.pop(key, None)
+    unchanged = ((k, v) for k, v in records if (k not in changed) and (k not in removed))
+    return heapq.merge(unchanged, sorted(changed.items()))
+
+
+def _diff_commit_ref_records(parentRecords: Iterable[Tuple[bytes, bytes]],
+                             records: Iterable[Tuple[bytes, bytes]],
+                             max_changes: int) -> Optional[Tuple[tuple, tuple]]:
+    """Find the records changed / removed from the parent by merging both sorted streams.
+
+    Parameters
+    ----------
+    parentRecords : Iterable[Tuple[bytes, bytes]]
+        sorted key/value pairs of the parent commit records, consumed lazily.
+    records : Iterable[Tuple[bytes, bytes]]
+        sorted key/value pairs of the staged records, consumed lazily.
+    max_changes : int
+        give up once more than this many records are changed or removed.
+
+    Returns
+    -------
+    Optional[Tuple[tuple, tuple]]
+        key/value pairs which were added or changed, and keys which were
+        removed; None if there are more than ``max_changes`` of them.
+    """
+    changed, removed = [], []
+    records = iter(records)
+    rec = next(records, None)
+    for pKey, pVal in parentRecords:
+        while (rec is not None) and (rec[0] < pKey):
+            changed.append(rec)
+            rec = next(records, None)
+        if (rec is not None) and (rec[0] == pKey):
+            if rec[1] != pVal:
+                changed.append(rec)
+            rec = next(records, None)
+        else:
+            removed.append(pKey)
+        if len(changed) + len(removed) > max_changes:
+            return None
+    while rec is not None:
+        changed.append(rec)
+        rec = next(records, None)
+    if len(changed) + len(removed) > max_changes:
+        return None
+    return tuple(changed), tuple(removed)
+
+
+def _commit_ref_db_kvs(reftxn: lmdb.Transaction, commit_hash: str) -> Tuple[Tuple[bytes, bytes]]:
+    """Rebuild the records of a commit from the nearest checkpoint and the deltas after it.
+
+    Parameters
+    ----------
+    reftxn : lmdb.Transaction
+        reader transaction on the refenv
+    commit_hash : str
+        hash of the commit to rebuild the records of
+
+    Returns
+    -------
+    Tuple[Tuple[bytes, bytes]]
+        sorted key/value pairs of the commit records
+
+    Raises
+    ------
+    ValueError
+        if no refs exist for the commit (or any commit in it's delta chain)
+    """
+    return tuple(_iter_commit_ref_records(*_commit_ref_vals(reftxn, commit_hash)))
+
+
+def _commit_spec_and_parent_vals(reftxn: lmdb.Transaction, commit_hash: str) -> Tuple[bytes, bytes]:
+    """Read the spec and parent db values of a commit.
 
     Raises
     ------
     ValueError
         if no commit exists with the provided hash
     """
-    reftxn = TxnRegister().begin_reader_txn(refenv)
     try:
-        cmtRefKey = parsing.commit_ref_db_key_from_raw_key(commit_hash)
-        cmtSpecKey = parsing.commit_spec_db_key_from_raw_key(commit_hash)
-        cmtParentKey = parsing.commit_parent_db_key_from_raw_key(commit_hash)
-
-        cmtRefVal = reftxn.get(cmtRefKey, default=False)
-        cmtSpecVal = reftxn.get(cmtSpecKey, default=False)
-        cmtParentVal = reftxn.get(cmtParentKey, default=False)
+        cmtSpecVal = reftxn.get(parsing.commit_spec_db_key_from_raw_key(commit_hash), default=False)
+        cmtParentVal = reftxn.get(parsing.commit_parent_db_key_from_raw_key(commit_hash), default=False)
     except lmdb.BadValsizeError:
         raise ValueError(f'No commit exists with the hash: {commit_hash}')
-    finally:
-        TxnRegister().abort_reader_txn(refenv)
-
-    if (cmtRefVal is False) or (cmtSpecVal is False) or (cmtParentVal is False):
+    if (cmtSpecVal is False) or (cmtParentVal is False):
         raise ValueError(f'No commit exists with the hash: {commit_hash}')
+    return cmtSpecVal, cmtParentVal
+
+
+def _verify_commit_refs(commit_hash: str, cmtSpecVal: bytes, cmtParentVal: bytes,
+                        refs_digest: str):
+    """Verify the records of a commit against the commit hash.
 
-    commitRefs = parsing.commit_ref_raw_val_from_db_val(cmtRefVal)
+    Parameters
+    ----------
+    commit_hash : str
+        hash of the commit the records were read for.
+    cmtSpecVal : bytes
+        spec db value of the commit
+    cmtParentVal : bytes
+        parent db value of the commit
+    refs_digest : str
+        digest of the commit records.
+
+    Raises
+    ------
+    IOError
+        if the digest calculated from the spec, parent, and records does not
+        match the commit hash.
+    """
     commitSpecs = parsing.commit_spec_raw_val_from_db_val(cmtSpecVal)
     commitParent = parsing.commit_parent_raw_val_from_db_val(cmtParentVal)
 
     calculatedDigest = parsing.cmt_final_digest(
         parent_digest=commitParent.digest,
         spec_digest=commitSpecs.digest,
-        refs_digest=commitRefs.digest)
-
+        refs_digest=refs_digest)
     if calculatedDigest != commit_hash:
         raise IOError(
             f'DATA CORRUPTION ERROR: on retrieval of stored references for '
@@ -282,14 +420,180 @@ def get_commit_ref(refenv, commit_hash):
             f'expected: {commit_hash}. Please alert the Hangar development team to '
             f'this error if possible.')
 
-    return commitRefs.db_kvs
+
+def iter_commit_ref(refenv: lmdb.Environment, commit_hash: str) -> Iterator[Tuple[bytes, bytes]]:
+    """Stream the (verified) commit data record references of a specific commit.
+
+    The records are decompressed (and the digest used to verify them updated)
+    one chunk at a time, so memory use does not depend on the number of
+    records in the commit.
+
+    Parameters
+    ----------
+    refenv : lmdb.Environment
+        lmdb environment where the references are stored
+    commit_hash : str
+        hash of the commit to retrieve.
+
+    Yields
+    ------
+    Tuple[bytes, bytes]
+        encoded key/value pairs of the data records, in sorted order.
+
+    Raises
+    ------
+    ValueError
+        if no commit exists with the provided hash (before any record is
+        yielded).
+    IOError
+        if the records of the commit are corrupt. As verification requires
+        every record to be read, this is raised after the last record is
+        yielded; consumers must discard the records they received.
+    """
+    reftxn = TxnRegister().begin_reader_txn(refenv)
+    try:
+        cmtSpecVal, cmtParentVal = _commit_spec_and_parent_vals(reftxn, commit_hash)
+        refVal, deltas = _commit_ref_vals(reftxn, commit_hash)
+    finally:
+        TxnRegister().abort_reader_txn(refenv)
+
+    recordDigests = []
+    for db_kv in _iter_commit_ref_records(refVal, deltas):
+        recordDigests.append(parsing.commit_ref_record_digest(*db_kv))
+        yield db_kv
+
+    _verify_commit_refs(
+        commit_hash, cmtSpecVal, cmtParentVal,
+        refs_digest=parsing.commit_ref_digest_from_record_digests(recordDigests))
+
+
+def get_commit_ref(refenv, commit_hash):
+    """Read the commit data record references from a specific commit.
+
+    This only returns a list of tuples with binary encoded key/value pairs.
+    Records of commits stored as a delta are rebuilt by replaying the deltas
+    after the nearest checkpoint commit. To read the records without holding
+    all of them in memory, use :func:`iter_commit_ref`.
+
+    Parameters
+    ----------
+    refenv : lmdb.Environment`
+        lmdb environment where the references are stored
+    commit_hash : string
+        hash of the commit to retrieve.
+
+    Returns
+    -------
+    tuple
+        tuple of tuples containing encoded key/value pairs of the data
+        records
+
+    Raises
+    ------
+    ValueError
+        if no commit exists with the provided hash
+    IOError
+        if the records of the commit are corrupt.
+    """
+    return tuple(iter_commit_ref(refenv, commit_hash))
+
+
+def get_commit_ref_view(refenv: lmdb.Environment, commit_hash: str) -> RecordView:
+    """Read the records of a commit into an in memory, read-only, record view.
+
+    The records of commits storing a full set of records are not split or
+    copied; the view is built directly over the decompressed refs.
+
+    Parameters
+    ----------
+    refenv : lmdb.Environment
+        lmdb environment where the references are stored
+    commit_hash : str
+        hash of the commit to retrieve.
+
+    Returns
+    -------
+    RecordView
+        verified records of the commit, usable in place of an unpacked commit
+        lmdb environment.
+
+    Raises
+    ------
+    ValueError
+        if no commit exists with the provided hash
+    IOError
+        if the records of the commit are corrupt.
+    """
+    reftxn = TxnRegister().begin_reader_txn(refenv)
+    try:
+        cmtSpecVal, cmtParentVal = _commit_spec_and_parent_vals(reftxn, commit_hash)
+        cmtRefVal = reftxn.get(parsing.commit_ref_db_key_from_raw_key(commit_hash), default=False)
+        if cmtRefVal is False:
+            db_kvs = _commit_ref_db_kvs(reftxn, commit_hash)
+    finally:
+        TxnRegister().abort_reader_txn(refenv)
+
+    if cmtRefVal is not False:
+        view = RecordView(parsing.commit_ref_joined_from_db_val(cmtRefVal), name=commit_hash)
+    else:
+        view = RecordView.from_db_kvs(db_kvs, name=commit_hash)
+    _verify_commit_refs(
+        commit_hash, cmtSpecVal, cmtParentVal,
+        refs_digest=parsing.commit_ref_digest_from_joined(view.joined_records()))
+    return view
+
+
+def get_commit_ref_db_val(refenv: lmdb.Environment, commit_hash: str,
+                          *, chunked: bool = False) -> Union[bytes, bool]:
+    """Get the full (not delta encoded) commit ref db value of a commit.
+
+    This is the value sent to other repositories (which may not have the
+    checkpoint a delta was encoded against) by remote operations. Unless the
+    other repository reports that it stores chunked commit refs, the records
+    are sent as a single compressed buffer, which every version can read.
+
+    Parameters
+    ----------
+    refenv : lmdb.Environment
+        lmdb environment where the references are stored
+    commit_hash : str
+        hash of the commit to retrieve.
+    chunked : bool, optional, kwarg-only
+        If True, the records may be compressed in chunks. The stored refs of a
+        checkpoint commit are returned as is, and the records of a delta
+        commit are streamed into the chunk encoder. by default False.
+
+    Returns
+    -------
+    Union[bytes, bool]
+        serialized and compressed records of the commit, or False if no
+        commit exists with the provided hash.
+    """
+    reftxn = TxnRegister().begin_reader_txn(refenv)
+    try:
+        cmtRefVal = reftxn.get(parsing.commit_ref_db_key_from_raw_key(commit_hash), default=False)
+        if cmtRefVal is not False:
+            if not chunked:
+                cmtRefVal = parsing.commit_ref_single_buffer_db_val_from_db_val(cmtRefVal)
+        else:
+            cmtDeltaKey = parsing.commit_ref_delta_db_key_from_raw_key(commit_hash)
+            if reftxn.get(cmtDeltaKey, default=False) is not False:
+                records = _iter_commit_ref_records(*_commit_ref_vals(reftxn, commit_hash))
+                if chunked:
+                    cmtRefVal = parsing.commit_ref_db_val_from_raw_val(records, digest=False).raw
+                else:
+                    cmtRefVal = parsing.commit_ref_single_buffer_db_val_from_raw_val(records)
+    finally:
+        TxnRegister().abort_reader_txn(refenv)
+    return cmtRefVal
 
 
 def unpack_commit_ref(refenv, cmtrefenv, commit_hash):
     """unpack a commit record ref into a new key/val db for reader checkouts.
 
     This method also validates that the record data (parent, spec, and refs)
-    have not been corrupted on disk (ie)
+    have not been corrupted on disk (ie). Records are written as they are
+    decompressed; if validation fails, every written record is removed again.
 
     Parameters
     ----------
@@ -301,12 +605,17 @@ def unpack_commit_ref(refenv, cmtrefenv, commit_hash):
         hash of the commit to read in from refs and unpack in a checkout.
     """
 
-    commitRefs = get_commit_ref(refenv=refenv, commit_hash=commit_hash)
     cmttxn = TxnRegister().begin_writer_txn(cmtrefenv)
     try:
         with cmttxn.cursor() as cursor:
             cursor.first()
-            cursor.putmulti(commitRefs, append=True)
+            try:
+                cursor.putmulti(iter_commit_ref(refenv, commit_hash), append=True)
+            except (IOError, ValueError):
+                positionExists = cursor.first()
+                while positionExists:
+                    positionExists = cursor.delete()
+                raise
         try:
             cursor.close()
         except Exception as e:
@@ -436,24 +745,72 @@ def _commit_spec(message: str, user: str, email: str) -> DigestAndBytes:
     return spec_db
 
 
-def _commit_ref(stageenv: lmdb.Environment) -> DigestAndBytes:
+def _commit_ref(stageenv: lmdb.Environment, refenv: lmdb.Environment,
+                parent: str, *, ref_format: int = c.CMT_REF_FORMAT) -> Tuple[DigestAndBytes, bool]:
     """Query and format all staged data records, and format it for ref storage.
 
+    In repositories which do not record the ``c.CMT_REF_FORMAT`` commit ref
+    format, all records are stored as a single compressed buffer (readable by
+    every release). Otherwise, the records are stored as a delta against the
+    ``parent`` commit, unless the parent is ``COMMIT_REF_CHECKPOINT_INTERVAL``
+    deltas away from a checkpoint, or more than half of the records changed.
+    Then (or if there is no parent) all records are stored, compressed in
+    chunks. The records of the parent are streamed and merged against the
+    (sorted) staged records, and the staged records are streamed again into
+    the chunk encoder, so neither are ever all held in memory at once.
+
+    The digest of the records is the one maintained as they were staged (see
+    :mod:`.stage_digest`), so the records are not rehashed.
+
     Parameters
     ----------
     stageenv : lmdb.Environment
         lmdb environment where the staged record data is actually stored.
+    refenv : lmdb.Environment
+        lmdb environment where the commit ref records are stored.
+    parent : str
+        hash of the (master) parent commit, or empty string if none.
+    ref_format : int, optional, kwarg-only
+        commit ref storage format recorded for the repository, by default
+        ``c.CMT_REF_FORMAT``.
 
     Returns
     -------
-    DigestAndBytes
-        Serialized and compressed version of all staged record data along with
-        digest of commit refs.
+    Tuple[DigestAndBytes, bool]
+        Serialized and compressed version of the staged record data (or of the
+        delta) along with digest of (all) commit refs, and a bool which is True
+        if the value is a delta.
     """
+    refsDigest = stage_digest.staging_digest(stageenv)
     querys = RecordQuery(dataenv=stageenv)
-    allRecords = tuple(querys._traverse_all_records())
-    res = parsing.commit_ref_db_val_from_raw_val(allRecords)
-    return res
+
+    if ref_format < c.CMT_REF_FORMAT:
+        raw = parsing.commit_ref_single_buffer_db_val_from_raw_val(querys._traverse_all_records())
+        return DigestAndBytes(digest=refsDigest, raw=raw), False
+
+    if parent:
+        diff = None
+        reftxn = TxnRegister().begin_reader_txn(refenv)
+        try:
+            depth = _commit_ref_delta_depth(reftxn, parent) + 1
+            if depth < COMMIT_REF_CHECKPOINT_INTERVAL:
+                parentRecords = _iter_commit_ref_records(*_commit_ref_vals(reftxn, parent))
+                records = querys._traverse_all_records()
+                try:
+                    maxChanges = stage_digest.record_count(stageenv) // 2
+                    diff = _diff_commit_ref_records(parentRecords, records, maxChanges)
+                finally:
+                    records.close()
+        finally:
+            TxnRegister().abort_reader_txn(refenv)
+
+        if diff is not None:
+            changed, removed = diff
+            raw = parsing.commit_ref_delta_db_val_from_raw_val(parent, depth, changed, removed)
+            return DigestAndBytes(digest=refsDigest, raw=raw), True
+
+    res = parsing.commit_ref_db_val_from_raw_val(querys._traverse_all_records(), digest=False)
+    return DigestAndBytes(digest=refsDigest, raw=res.raw), False
 
 
 # -------------------- Format ref k/v pairs and write the commit to disk ----------------
@@ -505,7 +862,10 @@ def commit_records(message, branchenv, stageenv, refenv, repo_path,
         raise RuntimeError(f'Username and Email are required. Please configure.')
 
     cmtSpec = _commit_spec(message=message, user=USER_NAME, email=USER_EMAIL)
-    cmtRefs = _commit_ref(stageenv=stageenv)
+    parentSpec = parsing.commit_parent_raw_val_from_db_val(cmtParent.raw).ancestor_spec
+    cmtRefs, isDelta = _commit_ref(stageenv=stageenv, refenv=refenv,
+                                   parent=parentSpec.master_ancestor,
+                                   ref_format=vcompat.get_repository_commit_ref_format(branchenv))
 
     commit_hash = parsing.cmt_final_digest(parent_digest=cmtParent.digest,
                                            spec_digest=cmtSpec.digest,
@@ -513,7 +873,10 @@ def commit_records(message, branchenv, stageenv, refenv, repo_path,
 
     commitSpecKey = parsing.commit_spec_db_key_from_raw_key(commit_hash)
     commitParentKey = parsing.commit_parent_db_key_from_raw_key(commit_hash)
-    commitRefKey = parsing.commit_ref_db_key_from_raw_key(commit_hash)
+    if isDelta:
+        commitRefKey = parsing.commit_ref_delta_db_key_from_raw_key(commit_hash)
+    else:
+        commitRefKey = parsing.commit_ref_db_key_from_raw_key(commit_hash)
 
     reftxn = TxnRegister().begin_writer_txn(refenv)
     try:
@@ -564,6 +927,11 @@ def replace_staging_area_with_commit(refenv, stageenv, commit_hash):
     TxnRegister().commit_writer_txn(stageenv)
 
     unpack_commit_ref(refenv=refenv, cmtrefenv=stageenv, commit_hash=commit_hash)
+    stagetxn = TxnRegister().begin_writer_txn(stageenv)
+    try:
+        stage_digest.reset(stagetxn)
+    finally:
+        TxnRegister().commit_writer_txn(stageenv)
     return
 
 
@@ -599,6 +967,7 @@ def replace_staging_area_with_refs(stageenv, sorted_content):
             cursor.first()
             cursor.putmulti(sorted_content, append=True)
         cursor.close()
+        stage_digest.reset(cmttxn)
     finally:
         TxnRegister().commit_writer_txn(stageenv)
 
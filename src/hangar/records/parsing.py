@@ -3,7 +3,7 @@ from itertools import cycle
 from time import sleep
 from time import perf_counter
 from random import randint
-from typing import Union, NamedTuple, Tuple, Iterable
+from typing import Union, NamedTuple, Tuple, Iterable, Iterator, List, Sequence
 from hashlib import blake2b
 
 import blosc
@@ -138,6 +138,34 @@ def repo_version_raw_val_from_db_val(db_val: bytes) -> VersionSpec:
     return res
 
 
+"""
+Methods working with the repository commit ref storage format
+-------------------------------------------------------------
+"""
+
+
+def repo_commit_ref_format_db_key() -> bytes:
+    """The db formated key which the commit ref storage format is recorded at.
+
+    Returns
+    -------
+    bytes
+        db formatted key to use to get/set the commit ref storage format.
+    """
+    db_key = c.K_CMT_REF_FORMAT.encode()
+    return db_key
+
+
+def repo_commit_ref_format_db_val_from_raw_val(ref_format: int) -> bytes:
+    db_val = f'{ref_format}'.encode()
+    return db_val
+
+
+def repo_commit_ref_format_raw_val_from_db_val(db_val: bytes) -> int:
+    ref_format = int(db_val.decode())
+    return ref_format
+
+
 """
 Methods working with writer HEAD branch name
 --------------------------------------------
@@ -787,6 +815,13 @@ DigestAndDbRefs = NamedTuple('DigestAndDbRefs', [
     ('db_kvs', Tuple[Tuple[bytes, bytes]])
 ])
 
+CommitRefDelta = NamedTuple('CommitRefDelta', [
+    ('parent', str),
+    ('depth', int),
+    ('db_kvs', Tuple[Tuple[bytes, bytes]]),
+    ('removed', Tuple[bytes])
+])
+
 
 def _hash_func(recs: bytes) -> str:
     """hash a tuple of db formatted k, v pairs.
@@ -930,19 +965,105 @@ def _commit_ref_joined_kv_digest(joined_db_kvs: Iterable[bytes]) -> str:
     str
         calculated digest of the commit ref record component
     """
-    joined_db_kvs = sorted(map(_hash_func, joined_db_kvs))
-    joined_digests = c.CMT_DIGEST_JOIN_KEY.join(joined_db_kvs).encode()
+    return commit_ref_digest_from_record_digests(list(map(_hash_func, joined_db_kvs)))
+
+
+def commit_ref_record_digest(db_key: bytes, db_val: bytes) -> str:
+    """digest of a single db_key/db_value pair, as sorted to form the commit ref digest.
+
+    Parameters
+    ----------
+    db_key : bytes
+        db formatted record key
+    db_val : bytes
+        db formatted record value
+
+    Returns
+    -------
+    str
+        digest of the joined k/v pair
+    """
+    return _hash_func(c.CMT_KV_JOIN_KEY.join((db_key, db_val)))
+
+
+def commit_ref_digest_from_record_digests(record_digests: List[str]) -> str:
+    """digest of the joined record k/v pairs from the (unsorted) digest of each pair.
+
+    Parameters
+    ----------
+    record_digests : List[str]
+        :func:`commit_ref_record_digest` of every record. sorted in place.
+
+    Returns
+    -------
+    str
+        digest of the commit ref record component
+    """
+    record_digests.sort()
+    joined_digests = c.CMT_DIGEST_JOIN_KEY.join(record_digests).encode()
     ref_digest = _hash_func(joined_digests)
     return ref_digest
 
 
-def commit_ref_db_val_from_raw_val(db_kvs: Iterable[Tuple[bytes, bytes]]) -> DigestAndBytes:
+def commit_ref_digest_from_raw_val(db_kvs: Iterable[Tuple[bytes, bytes]]) -> str:
+    """calculate the digest of a list of db_key/db_value pairs, without serializing them.
+
+    Parameters
+    ----------
+    db_kvs : Iterable[Tuple[bytes, bytes]]
+        Iterable collection binary encoded db_key/db_val pairs.
+
+    Returns
+    -------
+    str
+        digest of the joined db kvs, identical to the `digest` returned by
+        :func:`commit_ref_db_val_from_raw_val` for the same pairs.
+    """
+    return _commit_ref_joined_kv_digest(map(c.CMT_KV_JOIN_KEY.join, db_kvs))
+
+
+def commit_ref_digest_from_joined(joined_db_kvs: Iterable[bytes]) -> str:
+    """calculate the (sorted) digest of joined db_key/db_value pairs.
+
+    Parameters
+    ----------
+    joined_db_kvs : Iterable[bytes]
+        each element is the joining of a kv pair (bytes or memoryview)
+
+    Returns
+    -------
+    str
+        identical to :func:`commit_ref_digest_from_raw_val` of the (unjoined)
+        pairs.
+    """
+    return _commit_ref_joined_kv_digest(joined_db_kvs)
+
+
+def _compress_commit_ref_chunk(joined_db_kvs: Sequence[bytes]) -> bytes:
+    pck = c.CMT_REC_JOIN_KEY.join(joined_db_kvs)
+    return blosc.compress(pck, typesize=1, clevel=9, shuffle=blosc.SHUFFLE, cname='zlib')
+
+
+def commit_ref_db_val_from_raw_val(db_kvs: Iterable[Tuple[bytes, bytes]], *,
+                                   digest: bool = True,
+                                   chunk_nbytes: int = c.CMT_REF_CHUNK_NBYTES) -> DigestAndBytes:
     """serialize and compress a list of db_key/db_value pairs for commit storage
 
+    The pairs are compressed in chunks of (about) ``chunk_nbytes`` of joined
+    records at a time, so that reading the records back (see
+    :func:`iter_commit_ref_db_kvs`) never requires all of them to be
+    decompressed at once.
+
     Parameters
     ----------
     db_kvs : Iterable[Tuple[bytes, bytes]]
         Iterable collection binary encoded db_key/db_val pairs.
+    digest : bool, optional, kwarg-only
+        If True (default), calculate the digest of the joined db kvs. If False,
+        the `digest` field of the result is None.
+    chunk_nbytes : int, optional, kwarg-only
+        uncompressed size of the records in each compressed chunk. Default is
+        ``constants.CMT_REF_CHUNK_NBYTES``.
 
     Returns
     -------
@@ -950,15 +1071,115 @@ def commit_ref_db_val_from_raw_val(db_kvs: Iterable[Tuple[bytes, bytes]]) -> Dig
         `raw` serialized and compressed representation of the object. `digest`
         digest of the joined db kvs.
     """
-    joined = tuple(map(c.CMT_KV_JOIN_KEY.join, db_kvs))
-    refDigest = _commit_ref_joined_kv_digest(joined)
-
-    pck = c.CMT_REC_JOIN_KEY.join(joined)
-    raw = blosc.compress(pck, typesize=1, clevel=9, shuffle=blosc.SHUFFLE, cname='zlib')
-    res = DigestAndBytes(digest=refDigest, raw=raw)
+    recordDigests = [] if digest else None
+    chunks, chunk, nbytes = [c.CMT_REF_CHUNKED_PREFIX], [], 0
+    for joined in map(c.CMT_KV_JOIN_KEY.join, db_kvs):
+        if digest:
+            recordDigests.append(_hash_func(joined))
+        chunk.append(joined)
+        nbytes += len(joined) + 1
+        if nbytes >= chunk_nbytes:
+            chunks.append(_compress_commit_ref_chunk(chunk))
+            chunk, nbytes = [], 0
+    if chunk:
+        chunks.append(_compress_commit_ref_chunk(chunk))
+
+    refDigest = commit_ref_digest_from_record_digests(recordDigests) if digest else None
+    res = DigestAndBytes(digest=refDigest, raw=b''.join(chunks))
     return res
 
 
+def commit_ref_single_buffer_db_val_from_raw_val(db_kvs: Iterable[Tuple[bytes, bytes]]) -> bytes:
+    """serialize and compress db_key/db_value pairs as a single compressed buffer.
+
+    This is the encoding of commit refs before records were compressed in
+    chunks, which every version of hangar can read. It is used for the commit
+    refs sent to remotes, until the remote protocol is versioned.
+
+    Parameters
+    ----------
+    db_kvs : Iterable[Tuple[bytes, bytes]]
+        Iterable collection binary encoded db_key/db_val pairs.
+
+    Returns
+    -------
+    bytes
+        serialized and compressed representation of the records.
+    """
+    return _compress_commit_ref_chunk(tuple(map(c.CMT_KV_JOIN_KEY.join, db_kvs)))
+
+
+def commit_ref_single_buffer_db_val_from_db_val(commit_db_val: bytes) -> bytes:
+    """Convert a (possibly chunked) commit ref db_val into a single compressed buffer.
+
+    Parameters
+    ----------
+    commit_db_val : bytes
+        Serialized and compressed representation of commit refs.
+
+    Returns
+    -------
+    bytes
+        ``commit_db_val`` if it is already a single compressed buffer,
+        otherwise it's records recompressed as one (see
+        :func:`commit_ref_single_buffer_db_val_from_raw_val`).
+    """
+    if bytes(commit_db_val[:len(c.CMT_REF_CHUNKED_PREFIX)]) != c.CMT_REF_CHUNKED_PREFIX:
+        return commit_db_val
+    return _compress_commit_ref_chunk((commit_ref_joined_from_db_val(commit_db_val),))
+
+
+def iter_commit_ref_joined_chunks(commit_db_val: Union[bytes, bytearray, memoryview]) -> Iterator[bytes]:
+    """Decompress a commit ref db_val one chunk at a time.
+
+    Commit refs written before records were compressed in chunks are a single
+    compressed buffer, which is returned as one chunk.
+
+    Parameters
+    ----------
+    commit_db_val : Union[bytes, bytearray, memoryview]
+        Serialized and compressed representation of commit refs.
+
+    Yields
+    ------
+    bytes
+        sorted (non-empty) run of records, each the joining of a key/value
+        pair with ``CMT_KV_JOIN_KEY``, joined with ``CMT_REC_JOIN_KEY``.
+    """
+    buf = memoryview(commit_db_val)
+    prefixLen = len(c.CMT_REF_CHUNKED_PREFIX)
+    if bytes(buf[:prefixLen]) != c.CMT_REF_CHUNKED_PREFIX:
+        joined = blosc.decompress(commit_db_val)
+        if joined != b'':
+            yield joined
+        return
+
+    offset = prefixLen
+    while offset < len(buf):
+        # compressed size of the chunk is read from the (16 byte) blosc header.
+        _, cbytes, _ = blosc.get_cbuffer_sizes(bytes(buf[offset:offset + 16]))
+        yield blosc.decompress(buf[offset:offset + cbytes])
+        offset += cbytes
+
+
+def iter_commit_ref_db_kvs(commit_db_val: Union[bytes, bytearray, memoryview]) -> Iterator[Tuple[bytes, bytes]]:
+    """Load the key/value pairs of a commit ref db_val, one chunk at a time.
+
+    Parameters
+    ----------
+    commit_db_val : Union[bytes, bytearray, memoryview]
+        Serialized and compressed representation of commit refs.
+
+    Yields
+    ------
+    Tuple[bytes, bytes]
+        binary encoded key/value pairs making up the repo state at the time of
+        that commit, in sorted order.
+    """
+    for joined in iter_commit_ref_joined_chunks(commit_db_val):
+        yield from map(tuple, map(bytes.split, joined.split(c.CMT_REC_JOIN_KEY)))
+
+
 def commit_ref_raw_val_from_db_val(commit_db_val: bytes) -> DigestAndDbRefs:
     """Load and decompress a commit ref db_val into python object memory.
 
@@ -974,22 +1195,115 @@ def commit_ref_raw_val_from_db_val(commit_db_val: bytes) -> DigestAndDbRefs:
         Iterable of binary encoded key/value pairs making up the repo state at the
         time of that commit. key/value pairs are already in sorted order.
     """
-    uncomp_db_raw = blosc.decompress(commit_db_val)
-    # if a commit has nothing in it (completly empty), the return from query == ()
-    # the stored data is b'' from which the hash is calculated. We manually set these
-    # values as the expected unpacking routine will not work correctly.
-    if uncomp_db_raw == b'':
-        refsDigest = _hash_func(b'')
-        raw_db_kv_list = ()
-    else:
-        raw_joined_kvs_list = uncomp_db_raw.split(c.CMT_REC_JOIN_KEY)
-        refsDigest = _commit_ref_joined_kv_digest(raw_joined_kvs_list)
-        raw_db_kv_list = tuple(map(tuple, map(bytes.split, raw_joined_kvs_list)))
-
+    raw_db_kv_list = commit_ref_db_kvs_from_db_val(commit_db_val)
+    # if a commit has nothing in it (completly empty), the digest is calculated
+    # from b'' (the join of no record digests).
+    refsDigest = commit_ref_digest_from_raw_val(raw_db_kv_list)
     res = DigestAndDbRefs(digest=refsDigest, db_kvs=raw_db_kv_list)
     return res
 
 
+def commit_ref_db_kvs_from_db_val(commit_db_val: bytes) -> Tuple[Tuple[bytes, bytes]]:
+    """Load and decompress a commit ref db_val without calculating it's digest.
+
+    Parameters
+    ----------
+    commit_db_val : bytes
+        Serialized and compressed representation of commit refs.
+
+    Returns
+    -------
+    Tuple[Tuple[bytes, bytes]]
+        binary encoded key/value pairs making up the repo state at the time of
+        that commit, in sorted order.
+    """
+    return tuple(iter_commit_ref_db_kvs(commit_db_val))
+
+
+def commit_ref_joined_from_db_val(commit_db_val: bytes) -> bytes:
+    """Decompress a commit ref db_val, without splitting the joined records.
+
+    Parameters
+    ----------
+    commit_db_val : bytes
+        Serialized and compressed representation of commit refs.
+
+    Returns
+    -------
+    bytes
+        sorted records, each the joining of a key/value pair with
+        ``CMT_KV_JOIN_KEY``, joined with ``CMT_REC_JOIN_KEY``.
+    """
+    return c.CMT_REC_JOIN_KEY.join(iter_commit_ref_joined_chunks(commit_db_val))
+
+
+"""
+Commit reference delta key and values.
+--------------------------------------
+
+Rather than the full set of records, a commit may store the records which
+differ from those of it's (master) parent commit: the key/value pairs which
+were added or changed, and the keys which were removed. ``depth`` counts the
+deltas to replay on top of the nearest commit storing a full set of records
+(a checkpoint) to rebuild the records of the commit.
+"""
+
+
+def commit_ref_delta_db_key_from_raw_key(commit_hash: str) -> bytes:
+    commit_ref_delta_key = f'{commit_hash}{c.SEP_KEY}dref'.encode()
+    return commit_ref_delta_key
+
+
+def commit_ref_delta_db_val_from_raw_val(parent: str, depth: int,
+                                         db_kvs: Sequence[Tuple[bytes, bytes]],
+                                         removed: Sequence[bytes]) -> bytes:
+    """serialize and compress the records which differ from a parent commit for storage
+
+    Parameters
+    ----------
+    parent : str
+        digest of the commit the delta is applied to.
+    depth : int
+        number of deltas (including this one) applied on top of the nearest
+        checkpoint commit.
+    db_kvs : Sequence[Tuple[bytes, bytes]]
+        binary encoded db_key/db_val pairs added or changed since the parent.
+    removed : Sequence[bytes]
+        binary encoded db_keys of records removed since the parent.
+
+    Returns
+    -------
+    bytes
+        serialized and compressed representation of the delta.
+    """
+    header = f'{parent}{c.SEP_LST}{depth}{c.SEP_LST}{len(db_kvs)}'.encode()
+    pck = c.CMT_REC_JOIN_KEY.join((header, *map(c.CMT_KV_JOIN_KEY.join, db_kvs), *removed))
+    raw = blosc.compress(pck, typesize=1, clevel=9, shuffle=blosc.SHUFFLE, cname='zlib')
+    return raw
+
+
+def commit_ref_delta_raw_val_from_db_val(db_val: bytes) -> CommitRefDelta:
+    """Load and decompress a commit ref delta db_val into python object memory.
+
+    Parameters
+    ----------
+    db_val : bytes
+        serialized and compressed representation of the delta.
+
+    Returns
+    -------
+    CommitRefDelta
+        `parent` commit digest, `depth` of the delta, added / changed `db_kvs`,
+        and `removed` keys.
+    """
+    header, *recs = blosc.decompress(db_val).split(c.CMT_REC_JOIN_KEY)
+    parent, depth, num_kvs = header.decode().split(c.SEP_LST)
+    num_kvs = int(num_kvs)
+    db_kvs = tuple(map(tuple, map(bytes.split, recs[:num_kvs])))
+    res = CommitRefDelta(parent=parent, depth=int(depth), db_kvs=db_kvs, removed=tuple(recs[num_kvs:]))
+    return res
+
+
 """
 Commit spec reference keys and values
 -------------------------------------
@@ -33,11 +33,15 @@ class RecordQuery(object):
         list of tuples of bytes
             list type stack of tuples with each db_key, db_val pair
         """
+        stageDigestKey = c.K_STGDIGEST.encode()
         try:
             datatxn = TxnRegister().begin_reader_txn(self._dataenv)
             with datatxn.cursor() as cursor:
                 cursor.first()
                 for db_kv in cursor.iternext(keys=True, values=True):
+                    if db_kv[0].startswith(stageDigestKey):
+                        # digest sums maintained in the staging area, not records
+                        break
                     yield db_kv
         finally:
             TxnRegister().abort_reader_txn(self._dataenv)
@@ -135,6 +139,35 @@ class RecordQuery(object):
 
         return data_records
 
+    def _traverse_arrayset_data_keys(self, arrayset_name) -> Iterator[bytes]:
+        """Internal method to traverse the data record keys (only) of an arrayset.
+
+        Unlike :meth:`_traverse_arrayset_data_records`, record values are not
+        read, and keys are yielded as the cursor moves rather than being
+        collected in memory.
+
+        Parameters
+        ----------
+        arrayset_name : str
+            name of the arrayset to traverse record keys for.
+
+        Yields
+        ------
+        bytes
+            db_key of each record traversed
+        """
+        startAsetRecCountRngK = parsing.arrayset_record_count_range_key(arrayset_name)
+        try:
+            datatxn = TxnRegister().begin_reader_txn(self._dataenv)
+            with datatxn.cursor() as cursor:
+                if cursor.set_range(startAsetRecCountRngK):
+                    for dataRecKey in cursor.iternext(keys=True, values=False):
+                        if not dataRecKey.startswith(startAsetRecCountRngK):
+                            break
+                        yield dataRecKey
+        finally:
+            TxnRegister().abort_reader_txn(self._dataenv)
+
 # ------------------------- process arraysets --------------------------------------------
 
     def arrayset_names(self) -> List[str]:
@@ -205,8 +238,8 @@ class RecordQuery(object):
         """Find all data names contained within a arrayset.
 
         If you need both names, and hash values, call the `arrayset_data_records`
-        function. The underlying cost of searching the db is identical, this just provides
-        a pretty filter on top.
+        function. This method only scans the record keys, and is cheaper than reading
+        the full records.
 
         Parameters
         ----------
@@ -218,8 +251,8 @@ class RecordQuery(object):
         list of str
             list of data names contained in the arrayset
         """
-        recs = self._traverse_arrayset_data_records(arrayset_name)
-        data_key_rec = map(parsing.data_record_raw_key_from_db_key, recs.keys())
+        recKeys = self._traverse_arrayset_data_keys(arrayset_name)
+        data_key_rec = map(parsing.data_record_raw_key_from_db_key, recKeys)
         data_names = list(map(lambda x: x.data_name, data_key_rec))
         return data_names
 
@@ -257,7 +290,7 @@ class RecordQuery(object):
         int
             number of samples in the arrayset with given name
         """
-        nrecs = len(self._traverse_arrayset_data_records(arrayset_name))
+        nrecs = sum(1 for _ in self._traverse_arrayset_data_keys(arrayset_name))
         return nrecs
 
 # ------------------------- process schema ----------------------------------------------
@@ -0,0 +1,215 @@
+"""Read-only, in memory, view of the (sorted) records of a commit.
+
+The records of a commit are stored as a single (compressed) buffer of sorted,
+joined ``key SEP_LST value`` pairs separated by ``SEP_HSH``. Rather than copying
+every record into a new lmdb environment just to read them back, a
+:class:`RecordView` holds the decompressed buffer along with arrays of the
+offsets where each record's key and value begin and end. Point lookups and
+prefix ranges are a binary search over the keys.
+
+The view implements the (small) subset of the ``lmdb.Environment`` /
+``lmdb.Transaction`` / ``lmdb.Cursor`` interfaces used to read records, so it
+can be passed anywhere a read-only checkout's record environment is expected
+(ie. :class:`~.queries.RecordQuery`, and the :class:`~hangar.context.TxnRegister`).
+"""
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from .. import constants as c
+
+
+class _Keys(object):
+    """Sequence of the keys in a view, for :func:`bisect.bisect_left`.
+    """
+
+    def __init__(self, view: 'RecordView'):
+        self._view = view
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __getitem__(self, idx: int) -> bytes:
+        return self._view._key(idx)
+
+
+class RecordView(object):
+    """Records of a commit, read directly from their joined buffer.
+
+    Parameters
+    ----------
+    joined : bytes
+        ``SEP_HSH`` separated ``key SEP_LST value`` records, sorted by key.
+    name : str, optional
+        description of the records (ie. the commit hash) returned by
+        :meth:`path`, by default ''.
+
+    Raises
+    ------
+    ValueError
+        If any record of the buffer does not contain a key and value.
+    """
+
+    def __init__(self, joined: bytes, *, name: str = ''):
+        self._buf = joined
+        self._name = name
+        if len(joined) == 0:
+            self._starts = self._key_ends = self._ends = np.zeros(0, dtype=np.int64)
+        else:
+            arr = np.frombuffer(joined, dtype=np.uint8)
+            recSeps = np.flatnonzero(arr == ord(c.CMT_REC_JOIN_KEY))
+            kvSeps = np.flatnonzero(arr == ord(c.CMT_KV_JOIN_KEY))
+            self._starts = np.concatenate(([0], recSeps + 1)).astype(np.int64)
+            self._ends = np.concatenate((recSeps, [len(joined)])).astype(np.int64)
+            # the key of a record ends at the first separator after it's start.
+            kvSeps = np.append(kvSeps, len(joined))
+            self._key_ends = kvSeps[np.searchsorted(kvSeps, self._starts)].astype(np.int64)
+            if np.any(self._key_ends >= self._ends):
+                raise ValueError(f'records of {name} are not joined key/value pairs')
+        self._keys = _Keys(self)
+
+    @classmethod
+    def from_db_kvs(cls, db_kvs: Iterable[Tuple[bytes, bytes]], *, name: str = '') -> 'RecordView':
+        """Create a view of (sorted) key/value pairs.
+        """
+        joined = c.CMT_REC_JOIN_KEY.join(map(c.CMT_KV_JOIN_KEY.join, db_kvs))
+        return cls(joined, name=name)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _key(self, idx: int) -> bytes:
+        return self._buf[self._starts[idx]:self._key_ends[idx]]
+
+    def _value(self, idx: int) -> bytes:
+        return self._buf[self._key_ends[idx] + 1:self._ends[idx]]
+
+    def _find(self, key: bytes) -> int:
+        """index of the first record with a key >= ``key``.
+        """
+        return bisect_left(self._keys, bytes(key))
+
+    def joined_records(self) -> Iterator[memoryview]:
+        """Iterate over the joined ``key SEP_LST value`` bytes of each record, in order.
+        """
+        buf = memoryview(self._buf)
+        for start, end in zip(self._starts.tolist(), self._ends.tolist()):
+            yield buf[start:end]
+
+    # --------------------- lmdb.Environment interface ------------------------
+
+    def begin(self, write: bool = False, buffers: bool = False, **kwargs) -> '_RecordViewTxn':
+        if write:
+            raise PermissionError(f'records of {self._name} are read-only')
+        return _RecordViewTxn(self)
+
+    def path(self) -> str:
+        return self._name
+
+    def close(self):
+        return
+
+
+class _RecordViewTxn(object):
+    """Read-only transaction over a :class:`RecordView`.
+    """
+
+    def __init__(self, view: RecordView):
+        self._view = view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return
+
+    def get(self, key: bytes, default=None) -> Union[bytes, None]:
+        view = self._view
+        idx = view._find(key)
+        if idx < len(view) and view._key(idx) == key:
+            return view._value(idx)
+        return default
+
+    def cursor(self) -> '_RecordViewCursor':
+        return _RecordViewCursor(self._view)
+
+    def stat(self) -> dict:
+        return {'entries': len(self._view)}
+
+    def abort(self):
+        return
+
+    def commit(self):
+        return
+
+
+class _RecordViewCursor(object):
+    """Cursor over the records of a :class:`RecordView`.
+
+    Like an lmdb cursor, it is unpositioned (``key()`` and ``value()`` return
+    ``b''``) when created, and after moving past the last record. ``next()``
+    moves an unpositioned cursor to the first record only if it was never
+    positioned.
+    """
+
+    def __init__(self, view: RecordView):
+        self._view = view
+        self._idx: Optional[int] = None
+        self._eof = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return
+
+    def __iter__(self):
+        return self.iternext()
+
+    def _position(self, idx: int) -> bool:
+        self._idx = idx if idx < len(self._view) else None
+        self._eof = self._idx is None
+        return not self._eof
+
+    def first(self) -> bool:
+        return self._position(0)
+
+    def next(self) -> bool:
+        if self._idx is None:
+            return False if self._eof else self.first()
+        return self._position(self._idx + 1)
+
+    def set_key(self, key: bytes) -> bool:
+        idx = self._view._find(key)
+        if idx < len(self._view) and self._view._key(idx) == key:
+            return self._position(idx)
+        self._idx, self._eof = None, True
+        return False
+
+    def set_range(self, key: bytes) -> bool:
+        return self._position(self._view._find(key))
+
+    def key(self) -> bytes:
+        return b'' if self._idx is None else self._view._key(self._idx)
+
+    def value(self) -> bytes:
+        return b'' if self._idx is None else self._view._value(self._idx)
+
+    def item(self) -> Tuple[bytes, bytes]:
+        return self.key(), self.value()
+
+    def iternext(self, keys: bool = True, values: bool = True) -> Iterator:
+        if self._idx is None:
+            self.first()
+        while self._idx is not None:
+            if keys and values:
+                yield self.item()
+            elif keys:
+                yield self.key()
+            else:
+                yield self.value()
+            self.next()
+
+    def close(self):
+        return
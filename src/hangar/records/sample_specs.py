@@ -0,0 +1,545 @@
+import base64
+import binascii
+import importlib
+import json
+import os
+from collections import defaultdict
+from typing import (
+    Dict, ItemsView, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Union, ValuesView)
+
+import lmdb
+import numpy as np
+
+from . import parsing
+from .. import constants as c
+from .queries import RecordQuery
+from ..backends import backend_decoder, is_local_backend
+from ..context import TxnRegister
+
+"""
+Lazily resolved sample specifications
+-------------------------------------
+"""
+
+
+class LazySampleSpecs(Mapping):
+    """Mapping of sample name -> backend data hash spec resolved on demand.
+
+    The default behavior of an arrayset reader is to read every data record of
+    the arrayset, and look up / decode the backend specification of every
+    sample when the checkout is opened. For arraysets with many millions of
+    samples this can take minutes and a large amount of memory. This mapping
+    instead resolves the spec of a sample from the lmdb databases only when it
+    is first requested, and memoizes the result for later use.
+
+    ``len()``, iteration over names, and membership tests are answered with
+    scans / lookups of the record keys alone, without resolving any specs.
+
+    Since the records of a committed arrayset never change, this mapping must
+    only be used for arraysets in read-only checkouts.
+
+    Parameters
+    ----------
+    aset_name : str
+        name of the arrayset whose samples are mapped.
+    dataenv : lmdb.Environment
+        environment where the arrayset data records are stored.
+    hashenv : lmdb.Environment
+        environment where the data hash -> backend spec records are stored.
+    """
+
+    def __init__(self, aset_name: str, dataenv: lmdb.Environment, hashenv: lmdb.Environment):
+        self._asetn = aset_name
+        self._dataenv = dataenv
+        self._hashenv = hashenv
+        self._specs: Dict[Union[str, int], tuple] = {}
+        self._digests: Dict[Union[str, int], str] = {}
+        self._count: Optional[int] = None
+
+    def _resolve(self, name: Union[str, int]) -> tuple:
+        dataRecKey = parsing.data_record_db_key_from_raw_key(self._asetn, name)
+        _TxnRegister = TxnRegister()
+        dataTxn = _TxnRegister.begin_reader_txn(self._dataenv)
+        hashTxn = _TxnRegister.begin_reader_txn(self._hashenv)
+        try:
+            dataRecVal = dataTxn.get(dataRecKey, default=False)
+            if dataRecVal is False:
+                raise KeyError(name)
+            digest = parsing.data_record_raw_val_from_db_val(dataRecVal).data_hash
+            hashKey = parsing.hash_data_db_key_from_raw_key(digest)
+            spec = backend_decoder(hashTxn.get(hashKey))
+        finally:
+            _TxnRegister.abort_reader_txn(self._dataenv)
+            _TxnRegister.abort_reader_txn(self._hashenv)
+
+        self._specs[name] = spec
+        self._digests[name] = digest
+        return spec
+
+    def __getitem__(self, name: Union[str, int]) -> tuple:
+        try:
+            return self._specs[name]
+        except KeyError:
+            return self._resolve(name)
+
+    def __contains__(self, name: Union[str, int]) -> bool:
+        if name in self._specs:
+            return True
+        try:
+            dataRecKey = parsing.data_record_db_key_from_raw_key(self._asetn, name)
+        except TypeError:
+            return False
+        dataTxn = TxnRegister().begin_reader_txn(self._dataenv)
+        try:
+            return dataTxn.get(dataRecKey, default=False) is not False
+        finally:
+            TxnRegister().abort_reader_txn(self._dataenv)
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = RecordQuery(self._dataenv).arrayset_data_count(self._asetn)
+        return self._count
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        return iter(RecordQuery(self._dataenv).arrayset_data_names(self._asetn))
+
+    @property
+    def resolved(self) -> Dict[Union[str, int], tuple]:
+        """Specs of the samples which have been resolved so far.
+        """
+        return self._specs
+
+    @property
+    def digests(self) -> 'LazySampleDigests':
+        """Mapping of sample name -> data hash digest, resolved on demand.
+        """
+        return LazySampleDigests(self)
+
+    def digest(self, name: Union[str, int]) -> str:
+        """Get the data hash digest of a sample's content.
+        """
+        try:
+            return self._digests[name]
+        except KeyError:
+            self._resolve(name)
+            return self._digests[name]
+
+
+class LazySampleDigests(Mapping):
+    """Mapping of sample name -> data hash digest backed by a :class:`LazySampleSpecs`.
+    """
+
+    def __init__(self, specs: LazySampleSpecs):
+        self._lazy_specs = specs
+
+    def __getitem__(self, name: Union[str, int]) -> str:
+        return self._lazy_specs.digest(name)
+
+    def __contains__(self, name: Union[str, int]) -> bool:
+        return name in self._lazy_specs
+
+    def __len__(self) -> int:
+        return len(self._lazy_specs)
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        return iter(self._lazy_specs)
+
+
+"""
+Compact (columnar) sample spec table
+------------------------------------
+"""
+
+# spec fields which can be stored in the columns of a :class:`SampleSpecTable`
+_TABLE_SPEC_FIELDS = {'backend', 'uid', 'checksum', 'dataset', 'dtype', 'data',
+                      'dataset_idx', 'collection_idx', 'offset', 'length', 'shape'}
+# spec fields which are stored in the ``index`` column of a :class:`SampleSpecTable`
+_TABLE_INDEX_FIELDS = ('dataset_idx', 'collection_idx', 'offset')
+# size of a data hash digest in bytes (hex digest is twice as long)
+_DIGEST_NBYTES = 20
+
+
+class SampleSpecTable(Mapping):
+    """Immutable mapping of sample name -> backend spec stored in numpy arrays.
+
+    A python dict holding a ``NamedTuple`` spec (with string fields and a shape
+    tuple) for every sample costs hundreds of bytes per sample. This table
+    instead stores the specs in a single numpy structured array with one row
+    per sample and the columns:
+
+    *  ``backend``: index into the list of backend format codes
+    *  ``uid``, ``dataset``: indices into a table of interned strings
+    *  ``checksum``: the (16 hex character) xxh64 checksum as a uint64
+    *  ``index``: location index (``dataset_idx``, ``collection_idx``, or ``offset``)
+    *  ``length``: nbytes of the stored sample, for backends recording it, or
+       of the ``inline`` data
+    *  ``ndim``, ``shape``: number of dimensions and (zero padded) shape
+    *  ``dtype``: index into the table of interned strings
+    *  ``inline``: (zero padded) raw bytes of samples whose data is held in the
+       spec itself (ie. ``LMDB_40``). The column is only as wide as the
+       largest of these, so it takes no space in tables without them.
+    *  ``digest``: raw bytes of the sample content data hash digest
+
+    Rows are sorted by the encoded sample name, held in a parallel fixed width
+    bytes array which is binary searched to find a sample. Specs are
+    reconstructed (as the same ``NamedTuple`` the backend decoder returns) on
+    access. Any spec which does not fit this layout (ie. remote references, or
+    backends with other record fields) is held in a small overflow dict.
+
+    Parameters
+    ----------
+    names : Sequence[Union[str, int]]
+        names of the samples
+    specs : Sequence[NamedTuple]
+        backend data hash spec of each sample
+    digests : Sequence[str]
+        data hash digest of each sample's content
+    """
+
+    def __init__(self, names: Sequence[Union[str, int]], specs: Sequence[tuple],
+                 digests: Sequence[str]):
+        self._overflow: Dict[Union[str, int], Tuple[tuple, str]] = {}
+        self._backends: List[str] = []
+        self._spec_types: Dict[str, type] = {}
+        self._strings: List[str] = []
+        internedStrings: Dict[str, int] = {}
+
+        def intern(val: str) -> int:
+            try:
+                return internedStrings[val]
+            except KeyError:
+                internedStrings[val] = len(self._strings)
+                self._strings.append(val)
+                return internedStrings[val]
+
+        rows, keys, digestHex, srcShapes, inlineData = [], [], [], [], []
+        for name, spec, digest in zip(names, specs, digests):
+            if not self._fits_table(spec, digest):
+                self._overflow[name] = (spec, digest)
+                continue
+            if spec.backend not in self._spec_types:
+                self._spec_types[spec.backend] = spec.__class__
+                self._backends.append(spec.backend)
+            fields = spec._asdict()
+            data = base64.b64decode(fields['data']) if 'data' in fields else b''
+            rows.append((
+                self._backends.index(spec.backend),
+                intern(fields.get('uid', '')),
+                int(fields.get('checksum', '0'), 16),
+                intern(fields.get('dataset', '')),
+                next((fields[f] for f in _TABLE_INDEX_FIELDS if f in fields), 0),
+                fields.get('length', len(data)),
+                len(spec.shape),
+                intern(fields.get('dtype', ''))))
+            keys.append(self._encode_key(name))
+            digestHex.append(digest)
+            srcShapes.append(spec.shape)
+            inlineData.append(data)
+
+        maxNdim = max([row[6] for row in rows], default=0)
+        maxInline = max(map(len, inlineData), default=0)
+        self._rows = np.zeros(len(rows), dtype=[
+            ('backend', np.uint8), ('uid', np.uint32), ('checksum', np.uint64),
+            ('dataset', np.uint32), ('index', np.int64), ('length', np.uint32),
+            ('ndim', np.uint8), ('dtype', np.uint32),
+            ('shape', np.uint64, (max(maxNdim, 1),)), ('inline', np.uint8, (max(maxInline, 1),)),
+            ('digest', np.uint8, (_DIGEST_NBYTES,))])
+        if len(rows) == 0:
+            self._keys = np.zeros(0, dtype='S1')
+            return
+
+        keysArr = np.array(keys, dtype=bytes)
+        order = np.argsort(keysArr, kind='stable')
+        self._keys = keysArr[order]
+        columns = np.array(rows, dtype=np.uint64).T
+        fieldNames = ('backend', 'uid', 'checksum', 'dataset', 'index', 'length', 'ndim', 'dtype')
+        for col, field in enumerate(fieldNames):
+            self._rows[field] = columns[col][order]
+        # pad shapes of rank < ``maxNdim`` with zeros; grouped by rank to vectorize.
+        shapes = np.zeros((len(rows), maxNdim), dtype=np.uint64)
+        srcNdims = columns[6]
+        for ndim in np.unique(srcNdims):
+            if ndim == 0:
+                continue
+            srcIdxs = np.nonzero(srcNdims == ndim)[0]
+            shapes[srcIdxs, :ndim] = np.array([srcShapes[i] for i in srcIdxs], dtype=np.uint64)
+        self._rows['shape'][:, :maxNdim] = shapes[order]
+        if maxInline > 0:
+            inline = np.zeros((len(rows), maxInline), dtype=np.uint8)
+            for srcIdx, data in enumerate(inlineData):
+                inline[srcIdx, :len(data)] = np.frombuffer(data, dtype=np.uint8)
+            self._rows['inline'][:, :maxInline] = inline[order]
+        digestBytes = np.frombuffer(bytes.fromhex(''.join(digestHex)), dtype=np.uint8)
+        self._rows['digest'] = digestBytes.reshape(-1, _DIGEST_NBYTES)[order]
+
+    @staticmethod
+    def _fits_table(spec: tuple, digest: str) -> bool:
+        fields = getattr(spec, '_fields', ())
+        if not set(fields).issubset(_TABLE_SPEC_FIELDS) or ('shape' not in fields):
+            return False
+        if sum(f in fields for f in _TABLE_INDEX_FIELDS) > 1:
+            return False
+        if ('length' in fields) and not (0 <= spec.length < 2 ** 32):
+            return False
+        if 'data' in fields:
+            if 'length' in fields:
+                return False
+            try:
+                # only canonical encodings are reproduced when the spec is rebuilt.
+                if base64.b64encode(base64.b64decode(spec.data, validate=True)).decode() != spec.data:
+                    return False
+            except (binascii.Error, TypeError, ValueError):
+                return False
+        if 'checksum' in fields:
+            try:
+                if f'{int(spec.checksum, 16):016x}' != spec.checksum:
+                    return False
+            except ValueError:
+                return False
+        try:
+            return len(bytes.fromhex(digest)) == _DIGEST_NBYTES
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _encode_key(name: Union[str, int]) -> bytes:
+        if isinstance(name, int):
+            return f'{c.K_INT}{name}'.encode()
+        return name.encode()
+
+    @staticmethod
+    def _decode_key(key: bytes) -> Union[str, int]:
+        name = key.decode()
+        if name.startswith(c.K_INT):
+            return int(name[len(c.K_INT):])
+        return name
+
+    def _row_index(self, name: Union[str, int]) -> int:
+        if not isinstance(name, (str, int)):
+            raise KeyError(name)
+        if isinstance(name, str) and name.startswith(c.K_INT):
+            # cannot be a valid name; would collide with the encoding of an int.
+            raise KeyError(name)
+        try:
+            key = self._encode_key(name)
+        except UnicodeEncodeError:
+            raise KeyError(name) from None
+        idx = int(self._keys.searchsorted(key))
+        if (idx >= len(self._keys)) or (self._keys[idx] != key):
+            raise KeyError(name)
+        return idx
+
+    def _spec_from_row(self, row: tuple) -> tuple:
+        beIdx, uid, checksum, dset, idx, length, ndim, dtype, shape, inline = row[:10]
+        backend = self._backends[beIdx]
+        specType = self._spec_types[backend]
+        fields = {
+            'backend': backend,
+            'uid': self._strings[uid],
+            'checksum': f'{checksum:016x}',
+            'dataset': self._strings[dset],
+            'dataset_idx': idx,
+            'collection_idx': idx,
+            'offset': idx,
+            'length': length,
+            'shape': tuple(shape[:ndim].tolist()),
+            'dtype': self._strings[dtype],
+        }
+        if 'data' in specType._fields:
+            data = np.asarray(inline, dtype=np.uint8)[:length].tobytes()
+            fields['data'] = base64.b64encode(data).decode()
+        return specType(*[fields[f] for f in specType._fields])
+
+    def __getitem__(self, name: Union[str, int]) -> tuple:
+        if name in self._overflow:
+            return self._overflow[name][0]
+        return self._spec_from_row(self._rows[self._row_index(name)].item())
+
+    def __contains__(self, name: Union[str, int]) -> bool:
+        if name in self._overflow:
+            return True
+        try:
+            self._row_index(name)
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._overflow)
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        for key in self._keys:
+            yield self._decode_key(key)
+        yield from self._overflow.keys()
+
+    def items(self) -> ItemsView:
+        return _SampleSpecTableItems(self)
+
+    def values(self) -> ValuesView:
+        return _SampleSpecTableValues(self)
+
+    def _iter_items(self) -> Iterator[Tuple[Union[str, int], tuple]]:
+        fields = [f for f in self._rows.dtype.names if f != 'digest']
+        for key, row in zip(self._keys.tolist(), self._rows[fields].tolist()):
+            yield self._decode_key(key), self._spec_from_row(row)
+        for name, (spec, _) in self._overflow.items():
+            yield name, spec
+
+    @property
+    def backends(self) -> Set[str]:
+        """Format codes of the backends the samples are stored in.
+        """
+        return set(self._backends) | set(spec.backend for spec, _ in self._overflow.values())
+
+    @property
+    def is_local(self) -> bool:
+        """Bool indicating if every sample's data is stored in a local backend.
+        """
+        return all(is_local_backend(spec) for spec, _ in self._overflow.values())
+
+    def save(self, path: str):
+        """Write the table to disk, in a form which can be loaded memory mapped.
+
+        The ``keys`` and ``rows`` arrays are written as ``.npy`` files and the
+        remaining (small) components as a ``.json`` file. Each file is written
+        to a temporary name and then moved into place, with the json file last;
+        a table is only complete (and loadable) once the json file exists.
+
+        Parameters
+        ----------
+        path : str
+            file path prefix; ``.keys.npy``, ``.rows.npy``, and ``.json``
+            suffixes are appended to it.
+        """
+        for suffix, arr in (('.keys.npy', self._keys), ('.rows.npy', self._rows)):
+            with open(f'{path}{suffix}.tmp', 'wb') as f:
+                np.save(f, arr, allow_pickle=False)
+            os.replace(f'{path}{suffix}.tmp', f'{path}{suffix}')
+
+        meta = {
+            'backends': self._backends,
+            'spec_types': {be: _spec_type_path(t) for be, t in self._spec_types.items()},
+            'strings': self._strings,
+            'overflow': [
+                [self._encode_key(name).decode(), _spec_type_path(spec.__class__), list(spec), digest]
+                for name, (spec, digest) in self._overflow.items()],
+        }
+        with open(f'{path}.json.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(f'{path}.json.tmp', f'{path}.json')
+
+    @classmethod
+    def load(cls, path: str, *, mmap: bool = True) -> 'SampleSpecTable':
+        """Read a table written by :meth:`save`.
+
+        Parameters
+        ----------
+        path : str
+            file path prefix the table was saved with.
+        mmap : bool, optional, kwarg-only
+            If True (default), the ``keys`` and ``rows`` arrays are memory
+            mapped read-only rather than read into memory.
+
+        Returns
+        -------
+        SampleSpecTable
+            table with the same contents as the one saved.
+
+        Raises
+        ------
+        FileNotFoundError
+            If no complete table was saved with the ``path`` prefix.
+        """
+        with open(f'{path}.json', 'r') as f:
+            meta = json.load(f)
+        mmapMode = 'r' if mmap else None
+        self = object.__new__(cls)
+        self._keys = np.load(f'{path}.keys.npy', mmap_mode=mmapMode, allow_pickle=False)
+        self._rows = np.load(f'{path}.rows.npy', mmap_mode=mmapMode, allow_pickle=False)
+        self._backends = meta['backends']
+        self._spec_types = {be: _spec_type_from_path(p) for be, p in meta['spec_types'].items()}
+        self._strings = meta['strings']
+        self._overflow = {}
+        for key, typePath, fields, digest in meta['overflow']:
+            fields = [tuple(v) if isinstance(v, list) else v for v in fields]
+            spec = _spec_type_from_path(typePath)(*fields)
+            self._overflow[self._decode_key(key.encode())] = (spec, digest)
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size (in bytes) of the arrays holding the table.
+        """
+        return self._rows.nbytes + self._keys.nbytes
+
+    @property
+    def digests(self) -> 'SampleSpecTableDigests':
+        """Mapping of sample name -> data hash digest.
+        """
+        return SampleSpecTableDigests(self)
+
+    def digest(self, name: Union[str, int]) -> str:
+        """Get the data hash digest of a sample's content.
+        """
+        if name in self._overflow:
+            return self._overflow[name][1]
+        return self._rows[self._row_index(name)]['digest'].tobytes().hex()
+
+    def file_uids(self) -> Dict[str, Set[str]]:
+        """Find the file uids which contain samples, grouped by backend format code.
+        """
+        res = defaultdict(set)
+        for beIdx, backend in enumerate(self._backends):
+            if 'uid' not in self._spec_types[backend]._fields:
+                continue
+            beRows = self._rows[self._rows['backend'] == beIdx]
+            res[backend].update(self._strings[i] for i in np.unique(beRows['uid']))
+        for spec, _ in self._overflow.values():
+            if hasattr(spec, 'uid'):
+                res[spec.backend].add(spec.uid)
+        return dict(res)
+
+
+def _spec_type_path(spec_type: type) -> str:
+    return f'{spec_type.__module__}:{spec_type.__qualname__}'
+
+
+def _spec_type_from_path(path: str) -> type:
+    module, qualname = path.split(':')
+    return getattr(importlib.import_module(module), qualname)
+
+
+class _SampleSpecTableItems(ItemsView):
+    """Items view of a :class:`SampleSpecTable` which iterates over rows in order.
+    """
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _SampleSpecTableValues(ValuesView):
+    """Values view of a :class:`SampleSpecTable` which iterates over rows in order.
+    """
+
+    def __iter__(self):
+        return (spec for _, spec in self._mapping._iter_items())
+
+
+class SampleSpecTableDigests(Mapping):
+    """Mapping of sample name -> data hash digest backed by a :class:`SampleSpecTable`.
+    """
+
+    def __init__(self, table: SampleSpecTable):
+        self._table = table
+
+    def __getitem__(self, name: Union[str, int]) -> str:
+        return self._table.digest(name)
+
+    def __contains__(self, name: Union[str, int]) -> bool:
+        return name in self._table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __iter__(self) -> Iterator[Union[str, int]]:
+        return iter(self._table)
@@ -0,0 +1,147 @@
+"""On-disk cache of the sample spec tables of committed arraysets.
+
+Opening a read-only checkout requires the backend spec of every sample in
+every arrayset, which is found by decoding one hash record per sample. Since
+the contents of a commit can never change, the :class:`~.sample_specs.SampleSpecTable`
+built for an arrayset the first time a commit is checked out is saved in the
+repository directory, and memory mapped by later checkouts of the same commit.
+
+The index of each commit is stored in its own directory, which is stamped with
+the version of the index layout and the backend format codes known to the
+running hangar installation; an index written under a different stamp is
+ignored (and replaced). Once the total size of all indexes exceeds a byte
+budget, the least recently used commits are removed.
+
+Tables containing references to data which resides on a remote server are
+never saved, as the specs of those samples change once the data is fetched.
+"""
+import os
+import shutil
+from contextlib import suppress
+from os.path import join as pjoin
+from typing import Optional
+
+from .sample_specs import SampleSpecTable
+from .. import constants as c
+from ..backends import BACKEND_ACCESSOR_MAP
+
+# bump whenever the layout of a saved :class:`SampleSpecTable` changes.
+SPEC_INDEX_VERSION = 3
+
+_STAMP_FILE_NAME = 'VERSION'
+
+
+def spec_index_stamp() -> str:
+    """Version stamp of the index layout and the backend formats known to hangar.
+    """
+    return f'{SPEC_INDEX_VERSION}:{",".join(sorted(BACKEND_ACCESSOR_MAP))}'
+
+
+def _dir_nbytes(path: str) -> int:
+    nbytes = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            nbytes += entry.stat().st_size
+    return nbytes
+
+
+class SpecIndex(object):
+    """Persisted sample spec tables of the arraysets in a single commit.
+
+    Parameters
+    ----------
+    repo_path : str
+        path to the hangar repository directory (``.hangar``).
+    commit : str
+        hash of the commit whose arraysets are indexed.
+    max_nbytes : int, optional
+        total size (in bytes) of the indexes of all commits above which the
+        least recently used are removed. Default is
+        ``constants.SPEC_INDEX_MAX_NBYTES``.
+    """
+
+    def __init__(self, repo_path: str, commit: str, *, max_nbytes: int = c.SPEC_INDEX_MAX_NBYTES):
+        self._index_dir = pjoin(repo_path, c.DIR_SPEC_INDEX)
+        self._commit_dir = pjoin(self._index_dir, commit)
+        self._max_nbytes = max_nbytes
+
+    def _is_current(self) -> bool:
+        try:
+            with open(pjoin(self._commit_dir, _STAMP_FILE_NAME), 'r') as f:
+                return f.read() == spec_index_stamp()
+        except FileNotFoundError:
+            return False
+
+    def load(self, aset_name: str) -> Optional[SampleSpecTable]:
+        """Memory map the saved spec table of an arrayset.
+
+        Parameters
+        ----------
+        aset_name : str
+            name of the arrayset.
+
+        Returns
+        -------
+        Optional[SampleSpecTable]
+            the saved table, or None if no (current) table has been saved.
+        """
+        if not self._is_current():
+            return None
+        try:
+            table = SampleSpecTable.load(pjoin(self._commit_dir, aset_name), mmap=True)
+        except (FileNotFoundError, ValueError):
+            return None
+        # mark the commit as recently used for eviction.
+        with suppress(OSError):
+            os.utime(self._commit_dir)
+        return table
+
+    def save(self, aset_name: str, table: SampleSpecTable) -> bool:
+        """Save the spec table of an arrayset, evicting old commits to stay in budget.
+
+        Parameters
+        ----------
+        aset_name : str
+            name of the arrayset.
+        table : SampleSpecTable
+            spec table of all samples in the arrayset at the commit.
+
+        Returns
+        -------
+        bool
+            True if the table was saved, False if it references remote data
+            (which cannot be saved) or could not be written.
+        """
+        if not table.is_local:
+            return False
+        try:
+            if not self._is_current():
+                shutil.rmtree(self._commit_dir, ignore_errors=True)
+                os.makedirs(self._commit_dir, exist_ok=True)
+                with open(pjoin(self._commit_dir, _STAMP_FILE_NAME), 'w') as f:
+                    f.write(spec_index_stamp())
+            table.save(pjoin(self._commit_dir, aset_name))
+            os.utime(self._commit_dir)
+        except OSError:
+            return False
+        self._evict()
+        return True
+
+    def _evict(self):
+        """Remove the least recently used commit indexes until under the byte budget.
+
+        The index of this commit is never removed.
+        """
+        commitDirs, totalNbytes = [], 0
+        for entry in os.scandir(self._index_dir):
+            if entry.is_dir():
+                nbytes = _dir_nbytes(entry.path)
+                commitDirs.append((entry.stat().st_mtime, entry.path, nbytes))
+                totalNbytes += nbytes
+        for _, path, nbytes in sorted(commitDirs):
+            if totalNbytes <= self._max_nbytes:
+                break
+            if path == self._commit_dir:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            totalNbytes -= nbytes
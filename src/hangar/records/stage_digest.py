@@ -0,0 +1,252 @@
+"""Digest of the staging area records, maintained as the records are written.
+
+The commit ref digest of a set of records is the hash of the sorted digests of
+each record (see :func:`~.parsing.commit_ref_digest_from_raw_val`). Rather than
+rehashing every record when a commit is made, an index of the record digests
+is updated as each record is put or deleted: every record has an (empty
+valued) key made of the ``K_STGDIGEST`` prefix and the digest of the record.
+As lmdb keeps keys in sorted order, the commit ref digest is calculated from
+the index keys without hashing (or sorting) any record.
+
+The index is stored in the staging area environment (it's keys sort after all
+record keys, and are never returned as records), alongside the number of
+records it holds, and is written in the same transaction as the records
+themselves.
+
+If the record count does not exist (ie. the staging area was written by a
+version of hangar which did not maintain the index, or which stored it in
+another format), the index is rebuilt from all the records the first time it
+is needed.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+import lmdb
+
+from . import parsing
+from .. import constants as c
+from ..context import TxnRegister
+
+
+_DigestPrefix = c.K_STGDIGEST.encode()
+# sorts before the index keys of every record digest (which are hex strings).
+_CountKey = _DigestPrefix + c.K_INT.encode()
+
+
+def is_digest_key(db_key: bytes) -> bool:
+    """True if the key is part of the digest index (rather than a record) in the staging area.
+    """
+    return db_key.startswith(_DigestPrefix)
+
+
+def _index_db_key(record_digest: str) -> bytes:
+    return _DigestPrefix + record_digest.encode()
+
+
+def _get_count(txn: lmdb.Transaction) -> Optional[int]:
+    """stored number of indexed records, or None if the index is missing (or of a previous format).
+    """
+    countVal = txn.get(_CountKey, default=None)
+    if countVal is None:
+        return None
+    return int(countVal.decode())
+
+
+def _rebuild(txn: lmdb.Transaction) -> None:
+    """(re)build the digest index from all records in the staging area.
+    """
+    recordDigests = []
+    with txn.cursor() as cursor:
+        cursor.first()
+        for k, v in cursor.iternext(keys=True, values=True):
+            if is_digest_key(k):
+                break
+            recordDigests.append(parsing.commit_ref_record_digest(k, v))
+        if cursor.set_range(_DigestPrefix):
+            while cursor.key().startswith(_DigestPrefix):
+                if not cursor.delete():
+                    break
+
+        recordDigests.sort()
+        indexItems = [(_CountKey, str(len(recordDigests)).encode())]
+        indexItems.extend((_index_db_key(digest), b'') for digest in recordDigests)
+        cursor.putmulti(indexItems, append=True)
+
+
+def _update(txn: lmdb.Transaction, added: List[str], removed: List[str]) -> None:
+    """add / remove record digests from the index.
+
+    Must be called after the records are written, in the same transaction.
+    """
+    count = _get_count(txn)
+    if count is None:
+        _rebuild(txn)
+        return
+
+    for digest in removed:
+        txn.delete(_index_db_key(digest))
+    for digest in added:
+        txn.put(_index_db_key(digest), b'')
+    txn.put(_CountKey, str(count + len(added) - len(removed)).encode())
+
+
+def put_record(txn: lmdb.Transaction, db_key: bytes, db_val: bytes) -> None:
+    """Put a record in the staging area, updating the digest index.
+
+    Parameters
+    ----------
+    txn : lmdb.Transaction
+        writer transaction on the staging area environment
+    db_key : bytes
+        db formatted record key
+    db_val : bytes
+        db formatted record value
+    """
+    put_records(txn, ((db_key, db_val),))
+
+
+def put_records(txn: lmdb.Transaction, items: Iterable[Tuple[bytes, bytes]]) -> None:
+    """Put many records in the staging area with a single ``putmulti``.
+
+    Parameters
+    ----------
+    txn : lmdb.Transaction
+        writer transaction on the staging area environment
+    items : Iterable[Tuple[bytes, bytes]]
+        db_key/db_val pairs to write, sorted by key.
+    """
+    items = tuple(items)
+    added, removed = [], []
+    with txn.cursor() as cursor:
+        for k, v in items:
+            if cursor.set_key(k):
+                existingVal = cursor.value()
+                if existingVal == v:
+                    continue
+                removed.append(parsing.commit_ref_record_digest(k, existingVal))
+            added.append(parsing.commit_ref_record_digest(k, v))
+        cursor.putmulti(items)
+    _update(txn, added, removed)
+
+
+def delete_record(txn: lmdb.Transaction, db_key: bytes) -> bool:
+    """Delete a record from the staging area, updating the digest index.
+
+    Parameters
+    ----------
+    txn : lmdb.Transaction
+        writer transaction on the staging area environment
+    db_key : bytes
+        db formatted record key
+
+    Returns
+    -------
+    bool
+        True if the record existed and was deleted, otherwise False.
+    """
+    db_val = txn.pop(db_key)
+    if db_val is None:
+        return False
+    _update(txn, [], [parsing.commit_ref_record_digest(db_key, db_val)])
+    return True
+
+
+def delete_range(txn: lmdb.Transaction, range_key: bytes) -> int:
+    """Delete every record whose key starts with ``range_key``, updating the digest index.
+
+    Parameters
+    ----------
+    txn : lmdb.Transaction
+        writer transaction on the staging area environment
+    range_key : bytes
+        prefix of the db formatted keys of the records to delete (ie. the
+        ``arrayset_record_count_range_key`` of an arrayset).
+
+    Returns
+    -------
+    int
+        number of records deleted.
+    """
+    removed = []
+    with txn.cursor() as cursor:
+        recordsExist = cursor.set_range(range_key)
+        while recordsExist:
+            k, v = cursor.item()
+            if not k.startswith(range_key):
+                break
+            removed.append(parsing.commit_ref_record_digest(k, v))
+            recordsExist = cursor.delete()
+    _update(txn, [], removed)
+    return len(removed)
+
+
+def reset(txn: lmdb.Transaction) -> None:
+    """Rebuild the digest index after the staging area records were replaced.
+    """
+    _rebuild(txn)
+
+
+def _ensure_index(stageenv: lmdb.Environment) -> int:
+    """build the digest index if it is missing, returning the number of records.
+    """
+    stagetxn = TxnRegister().begin_reader_txn(stageenv)
+    try:
+        count = _get_count(stagetxn)
+    finally:
+        TxnRegister().abort_reader_txn(stageenv)
+
+    if count is None:
+        stagetxn = TxnRegister().begin_writer_txn(stageenv)
+        try:
+            _rebuild(stagetxn)
+            count = _get_count(stagetxn)
+        finally:
+            TxnRegister().commit_writer_txn(stageenv)
+    return count
+
+
+def record_count(stageenv: lmdb.Environment) -> int:
+    """Number of records currently in the staging area.
+
+    Parameters
+    ----------
+    stageenv : lmdb.Environment
+        lmdb environment of the staging area
+
+    Returns
+    -------
+    int
+        number of records (as counted by the digest index), without reading
+        any of them.
+    """
+    return _ensure_index(stageenv)
+
+
+def staging_digest(stageenv: lmdb.Environment) -> str:
+    """Commit ref digest of the records currently in the staging area.
+
+    Parameters
+    ----------
+    stageenv : lmdb.Environment
+        lmdb environment of the staging area
+
+    Returns
+    -------
+    str
+        identical to :func:`~.parsing.commit_ref_digest_from_raw_val` of all
+        records in the staging area.
+    """
+    _ensure_index(stageenv)
+    recordDigests = []
+    prefixLen = len(_DigestPrefix)
+    stagetxn = TxnRegister().begin_reader_txn(stageenv)
+    try:
+        with stagetxn.cursor() as cursor:
+            # the count key is the first key of the index, the digests follow it.
+            cursor.set_key(_CountKey)
+            for k in cursor.iternext(keys=True, values=False):
+                if k != _CountKey:
+                    recordDigests.append(k[prefixLen:].decode())
+    finally:
+        TxnRegister().abort_reader_txn(stageenv)
+
+    return parsing.commit_ref_digest_from_record_digests(recordDigests)
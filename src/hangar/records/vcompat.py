@@ -114,6 +114,72 @@ def get_repository_software_version_str(branchenv: lmdb.Environment) -> str:
         return ver_Str
 
 
+"""
+Commit ref storage format methods
+---------------------------------
+
+Commit refs compressed in chunks and commits stored as a delta against their
+parent can not be read by earlier releases of the same (compatible) software
+version. They are only written to repositories which record that they store
+them; other repositories keep writing refs in the original format.
+"""
+
+
+def set_repository_commit_ref_format(branchenv: lmdb.Environment, ref_format: int,
+                                     *, overwrite: bool = False) -> bool:
+    """Record the commit ref storage format written to the repository.
+
+    Parameters
+    ----------
+    branchenv : lmdb.Environment
+        db where the head, branch, and version specs are stored
+    ref_format : int
+        commit ref storage format (see ``constants.CMT_REF_FORMAT``)
+    overwrite : bool, optional
+        If True, replace current value with new value; If False, do not
+        overwrite if this key exists, by default False
+
+    Returns
+    -------
+    bool
+        True if successful, False otherwise
+    """
+    formatKey = parsing.repo_commit_ref_format_db_key()
+    formatVal = parsing.repo_commit_ref_format_db_val_from_raw_val(ref_format)
+    branchTxn = TxnRegister().begin_writer_txn(branchenv)
+    try:
+        success = branchTxn.put(formatKey, formatVal, overwrite=overwrite)
+    finally:
+        TxnRegister().commit_writer_txn(branchenv)
+    return success
+
+
+def get_repository_commit_ref_format(branchenv: lmdb.Environment) -> int:
+    """Get the commit ref storage format written to the repository.
+
+    Parameters
+    ----------
+    branchenv : lmdb.Environment
+        db where the head, branch, and version specs are stored
+
+    Returns
+    -------
+    int
+        recorded commit ref storage format, or 0 (a single compressed buffer
+        of all records for each commit) if none is recorded.
+    """
+    formatKey = parsing.repo_commit_ref_format_db_key()
+    branchTxn = TxnRegister().begin_reader_txn(branchenv)
+    try:
+        formatVal = branchTxn.get(formatKey, default=False)
+    finally:
+        TxnRegister().abort_reader_txn(branchenv)
+
+    if formatVal is False:
+        return 0
+    return parsing.repo_commit_ref_format_raw_val_from_db_val(formatVal)
+
+
 """
 Initial checking of repository versions
 ---------------------------------------
@@ -24,6 +24,7 @@ from ..records import hashs
 from ..records import parsing
 from ..records import queries
 from ..records import summarize
+from ..records import vcompat
 from ..utils import set_blosc_nthreads
 
 set_blosc_nthreads()
@@ -98,6 +99,11 @@ class HangarClient(object):
                 response = tmp_stub.GetClientConfig(request)
                 self.cfg['push_max_nbytes'] = int(response.config['push_max_nbytes'])
                 self.cfg['optimization_target'] = response.config['optimization_target']
+                # servers which do not report a commit ref format only read single buffer refs
+                if c.K_CMT_REF_FORMAT in response.config:
+                    self.cfg['commit_ref_format'] = int(response.config[c.K_CMT_REF_FORMAT])
+                else:
+                    self.cfg['commit_ref_format'] = 0
 
                 enable_compression = response.config['enable_compression']
                 if enable_compression == 'NoCompression':
@@ -233,8 +239,9 @@ class HangarClient(object):
         Tuple[str, bytes, bytes, bytes]
             ['commit hash', 'parentVal', 'specVal', 'refVal']
         """
+        refFormat = vcompat.get_repository_commit_ref_format(self.env.branchenv)
         request = hangar_service_pb2.FetchCommitRequest(commit=commit)
-        replies = self.stub.FetchCommit(request)
+        replies = self.stub.FetchCommit(request, metadata=((c.K_CMT_REF_FORMAT, str(refFormat)),))
         for idx, reply in enumerate(replies):
             if idx == 0:
                 refVal = bytearray(reply.total_byte_size)
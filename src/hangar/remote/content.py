@@ -4,7 +4,10 @@ import numpy as np
 
 from ..context import Environments, TxnRegister
 from ..backends import BACKEND_ACCESSOR_MAP, backend_from_heuristics, backend_opts_from_heuristics
-from ..records import parsing
+from ..backends import is_local_backend
+from ..hashing import HashingEngine
+from .. import constants as c
+from ..records import commiting, parsing, vcompat
 
 
 class ContentWriter(object):
@@ -18,11 +21,15 @@ class ContentWriter(object):
     ----------
     envs : context.Environments
         main hangar environment context object.
+    hasher : Optional[HashingEngine]
+        engine computing the checksums of received data. If None, one is
+        created for this writer.
     """
 
-    def __init__(self, envs):
+    def __init__(self, envs, hasher: Optional[HashingEngine] = None):
 
         self.env: Environments = envs
+        self.hasher = hasher if hasher is not None else HashingEngine()
 
     def commit(self, commit: str, parentVal: bytes, specVal: bytes,
                refVal: bytes) -> Union[str, bool]:
@@ -50,11 +57,19 @@ class ContentWriter(object):
         commitSpecKey = parsing.commit_spec_db_key_from_raw_key(commit)
         commitParentKey = parsing.commit_parent_db_key_from_raw_key(commit)
         commitRefKey = parsing.commit_ref_db_key_from_raw_key(commit)
+        if vcompat.get_repository_commit_ref_format(self.env.branchenv) < c.CMT_REF_FORMAT:
+            # repositories not recording the chunked format must stay readable
+            # by earlier releases.
+            refVal = parsing.commit_ref_single_buffer_db_val_from_db_val(refVal)
         refTxn = TxnRegister().begin_writer_txn(self.env.refenv)
         try:
             cmtParExists = refTxn.put(commitParentKey, parentVal, overwrite=False)
-            cmtRefExists = refTxn.put(commitRefKey, refVal, overwrite=False)
-            cmtSpcExists = refTxn.put(commitSpecKey, specVal, overwrite=False)
+            # a commit recorded locally may store it's refs as a delta (under a
+            # different key), only write the refs of commits not yet recorded.
+            cmtRefExists, cmtSpcExists = False, False
+            if cmtParExists:
+                cmtRefExists = refTxn.put(commitRefKey, refVal, overwrite=False)
+                cmtSpcExists = refTxn.put(commitSpecKey, specVal, overwrite=False)
         finally:
             TxnRegister().commit_writer_txn(self.env.refenv)
 
@@ -146,11 +161,20 @@ class ContentWriter(object):
         be_accessor.open(mode='a', remote_operation=True)
         be_accessor.backend_opts = backend_opts
 
+        checksums = [None] * len(received_data)
+        if is_local_backend(backend):
+            # later checksums are computed while earlier samples are written
+            checksums = self.hasher.checksums([tensor for _, tensor in received_data])
+
         saved_digests = []
         hashTxn = TxnRegister().begin_writer_txn(self.env.hashenv)
         try:
-            for hdigest, tensor in received_data:
-                hashVal = be_accessor.write_data(tensor, remote_operation=True)
+            for (hdigest, tensor), checksum in zip(received_data, checksums):
+                if checksum is None:
+                    hashVal = be_accessor.write_data(tensor, remote_operation=True)
+                else:
+                    hashVal = be_accessor.write_data(
+                        tensor, remote_operation=True, checksum=checksum.result())
                 hashKey = parsing.hash_data_db_key_from_raw_key(hdigest)
                 hashTxn.put(hashKey, hashVal)
                 saved_digests.append(hdigest)
@@ -210,13 +234,17 @@ class ContentReader(object):
 
         self.env: Environments = envs
 
-    def commit(self, commit: str) -> Union[RawCommitContent, bool]:
+    def commit(self, commit: str, *, chunked: bool = False) -> Union[RawCommitContent, bool]:
         """Read a commit with a given hash and get db formatted content
 
         Parameters
         ----------
         commit : str
             commit hash to read from the ref db
+        chunked : bool, optional, kwarg-only
+            If True, the commit refs may be compressed in chunks (only readable
+            by repositories storing the ``c.CMT_REF_FORMAT`` commit ref format),
+            otherwise they are a single compressed buffer. by default False.
 
         Returns
         -------
@@ -226,13 +254,12 @@ class ContentReader(object):
 
             False if commit does not exist with provided digest.
         """
-        cmtRefKey = parsing.commit_ref_db_key_from_raw_key(commit)
         cmtParentKey = parsing.commit_parent_db_key_from_raw_key(commit)
         cmtSpecKey = parsing.commit_spec_db_key_from_raw_key(commit)
 
+        cmtRefVal = commiting.get_commit_ref_db_val(self.env.refenv, commit, chunked=chunked)
         reftxn = TxnRegister().begin_reader_txn(self.env.refenv)
         try:
-            cmtRefVal = reftxn.get(cmtRefKey, default=False)
             cmtParentVal = reftxn.get(cmtParentKey, default=False)
             cmtSpecVal = reftxn.get(cmtSpecKey, default=False)
         finally:
@@ -22,7 +22,7 @@ from .content import ContentWriter
 from .. import constants as c
 from ..context import Environments, TxnRegister
 from ..backends.selection import BACKEND_ACCESSOR_MAP, backend_decoder
-from ..records import commiting, hashs, heads, parsing, queries, summarize
+from ..records import commiting, hashs, heads, parsing, queries, summarize, vcompat
 from ..utils import set_blosc_nthreads
 
 set_blosc_nthreads()
@@ -87,6 +87,9 @@ class HangarServer(hangar_service_pb2_grpc.HangarServiceServicer):
         reply.config['push_max_nbytes'] = push_max_nbytes
         reply.config['enable_compression'] = enable_compression
         reply.config['optimization_target'] = optimization_target
+        # clients only push commit refs compressed in chunks to servers storing them.
+        refFormat = vcompat.get_repository_commit_ref_format(self.env.branchenv)
+        reply.config[c.K_CMT_REF_FORMAT] = str(refFormat)
         return reply
 
     # -------------------- Branch Record --------------------------------------
@@ -135,15 +138,20 @@ class HangarServer(hangar_service_pb2_grpc.HangarServiceServicer):
 
     def FetchCommit(self, request, context):
         """Return raw data representing contents, spec, and parents of a commit hash.
+
+        Commit refs are only sent compressed in chunks to clients which report
+        (in the request metadata) that they store them.
         """
         commit = request.commit
-        commitRefKey = parsing.commit_ref_db_key_from_raw_key(commit)
         commitParentKey = parsing.commit_parent_db_key_from_raw_key(commit)
         commitSpecKey = parsing.commit_spec_db_key_from_raw_key(commit)
 
+        clientMetadata = dict(context.invocation_metadata())
+        clientRefFormat = int(clientMetadata.get(c.K_CMT_REF_FORMAT, 0))
+        commitRefVal = commiting.get_commit_ref_db_val(
+            self.env.refenv, commit, chunked=(clientRefFormat >= c.CMT_REF_FORMAT))
         reftxn = self.txnregister.begin_reader_txn(self.env.refenv)
         try:
-            commitRefVal = reftxn.get(commitRefKey, default=False)
             commitParentVal = reftxn.get(commitParentKey, default=False)
             commitSpecVal = reftxn.get(commitSpecKey, default=False)
         finally:
@@ -543,8 +543,9 @@ class Remotes(object):
                     raise KeyError(f'no label with hash: {label} exists')
                 client.push_label(label, labelVal)
             # commit refs
+            chunkedRefs = client.cfg['commit_ref_format'] >= c.CMT_REF_FORMAT
             for commit in tqdm(m_commits, desc='pushing commit refs'):
-                cmtContent = CR.commit(commit)
+                cmtContent = CR.commit(commit, chunked=chunkedRefs)
                 if not cmtContent:
                     raise KeyError(f'no commit with hash: {commit} exists')
                 client.push_commit_record(commit=cmtContent.commit,
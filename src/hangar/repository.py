@@ -182,7 +182,12 @@ class Repository(object):
                  write: bool = False,
                  *,
                  branch: str = '',
-                 commit: str = '') -> Union[ReaderCheckout, WriterCheckout]:
+                 commit: str = '',
+                 checksum_policy: str = 'always',
+                 checksum_fraction: float = 0.1,
+                 lazy_specs: bool = False,
+                 in_memory: bool = False,
+                 write_behind: int = 0) -> Union[ReaderCheckout, WriterCheckout]:
         """Checkout the repo at some point in time in either `read` or `write` mode.
 
         Only one writer instance can exist at a time. Write enabled checkout
@@ -203,11 +208,49 @@ class Repository(object):
             branch ``HEAD`` commit). This argument takes precedent over a branch
             name parameter if it is set. Note: this only will be used in
             non-writeable checkouts, defaults to ''
+        checksum_policy : str, optional
+            Determines which data reads from a read-only checkout are verified
+            against the checksum recorded when the data was written. One of
+            ``always``, ``once`` (only the first read of each sample),
+            ``sampled`` (a random fraction of reads), or ``never``. Write-enabled
+            checkouts always verify. defaults to 'always'
+        checksum_fraction : float, optional
+            Fraction of reads in the range [0, 1] which are verified if the
+            ``sampled`` checksum policy is used, defaults to 0.1
+        lazy_specs : bool, optional
+            If True, the storage location of each sample in a read-only
+            checkout is looked up the first time the sample is accessed,
+            rather than for every sample when the checkout is opened. This
+            makes opening checkouts of very large arraysets fast and memory
+            efficient. ``len()``, key iteration, and membership tests are
+            served by scanning / looking up the sample records directly.
+            Not valid for write-enabled checkouts. defaults to False
+        in_memory : bool, optional
+            If True, the records of a read-only checkout are read directly from
+            the decompressed commit refs held in memory, rather than from an
+            environment unpacked on disk, so the checkout writes nothing to
+            disk. Not valid for write-enabled checkouts. defaults to False
+        write_behind : int, optional
+            If > 0, samples added to a write-enabled checkout are queued and
+            written to the storage backends by a background thread, with at
+            most this many samples waiting at once (further adds block until
+            there is room). Queued samples are always stored before a commit
+            or when the checkout is closed. Not valid for read-only checkouts.
+            defaults to 0 (samples are written before ``add`` returns)
 
         Raises
         ------
         ValueError
             If the value of `write` argument is not boolean
+        ValueError
+            If the checksum policy is invalid, or is not ``always`` for a
+            write-enabled checkout.
+        ValueError
+            If ``lazy_specs`` is set for a write-enabled checkout.
+        ValueError
+            If ``in_memory`` is set for a write-enabled checkout.
+        ValueError
+            If ``write_behind`` is set for a read-only checkout.
 
         Returns
         -------
@@ -218,6 +261,14 @@ class Repository(object):
         self.__verify_repo_initialized()
         try:
             if write is True:
+                if checksum_policy != 'always':
+                    raise ValueError(
+                        f'checksum_policy: {checksum_policy} not allowed for '
+                        f'write-enabled checkouts, which always verify data.')
+                if lazy_specs:
+                    raise ValueError(f'lazy_specs not allowed for write-enabled checkouts.')
+                if in_memory:
+                    raise ValueError(f'in_memory not allowed for write-enabled checkouts.')
                 if branch == '':
                     branch = heads.get_staging_branch_head(self._env.branchenv)
                 co = WriterCheckout(
@@ -228,11 +279,14 @@ class Repository(object):
                     refenv=self._env.refenv,
                     stageenv=self._env.stageenv,
                     branchenv=self._env.branchenv,
-                    stagehashenv=self._env.stagehashenv)
+                    stagehashenv=self._env.stagehashenv,
+                    write_behind=write_behind)
                 return co
             elif write is False:
+                if write_behind:
+                    raise ValueError(f'write_behind not allowed for read-only checkouts.')
                 commit_hash = self._env.checkout_commit(
-                    branch_name=branch, commit=commit)
+                    branch_name=branch, commit=commit, in_memory=in_memory)
                 co = ReaderCheckout(
                     base_path=self._repo_path,
                     labelenv=self._env.labelenv,
@@ -240,7 +294,11 @@ class Repository(object):
                     hashenv=self._env.hashenv,
                     branchenv=self._env.branchenv,
                     refenv=self._env.refenv,
-                    commit=commit_hash)
+                    commit=commit_hash,
+                    checksum_policy=checksum_policy,
+                    checksum_fraction=checksum_fraction,
+                    lazy_specs=lazy_specs,
+                    in_memory=in_memory)
                 return co
             else:
                 raise ValueError("Argument `write` only takes True or False as value")
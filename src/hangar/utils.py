@@ -7,7 +7,7 @@ import weakref
 from io import StringIO
 from functools import partial
 from itertools import tee, filterfalse
-from typing import Union, Any
+from typing import Union, Any, Tuple
 import importlib
 import types
 
@@ -201,6 +201,34 @@ def unique_everseen(iterable, key=None):
                 yield element
 
 
+def shape_bucket(shape: Tuple[int, ...], width: int = 1) -> Tuple[int, ...]:
+    """Shape of the bucket which samples of some shape are grouped into.
+
+    Each dimension is rounded up to the next multiple of ``width``; samples
+    in a bucket are at most the bucket shape, and (for ``width > 1``) at
+    least the bucket shape - ``width - 1`` in each dimension.
+
+    >>> shape_bucket((3, 7))
+    (3, 7)
+    >>> shape_bucket((3, 7), width=4)
+    (4, 8)
+
+    Parameters
+    ----------
+    shape : Tuple[int, ...]
+        shape of the sample.
+    width : int, optional
+        width of the range of sizes of each dimension in a bucket, by default
+        1 (a bucket per shape).
+
+    Returns
+    -------
+    Tuple[int, ...]
+        shape of the bucket.
+    """
+    return tuple(-(-dim // width) * width for dim in shape)
+
+
 def find_next_prime(N: int) -> int:
     """Find next prime >= N
 
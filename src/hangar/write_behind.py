@@ -0,0 +1,182 @@
+"""Background storage of samples added to a write-enabled checkout.
+
+Adding a sample normally blocks until it has been checksummed, compressed,
+and written by the backend. In write-behind mode, an arrayset instead copies
+the (validated) sample into a bounded queue and returns immediately; a single
+background thread owned by the :class:`WriteBehindQueue` of the checkout
+drains the queue into the backends.
+
+LMDB transactions are only ever used from the thread which opened the
+environments, so the background thread never touches the record databases.
+When a sample has been written, the backend location is handed back and the
+records are stored the next time the producing thread interacts with the
+checkout (another ``add``, a read, a commit, etc.). Until then, the sample is
+not visible in the arrayset; any access which needs it waits for the queue to
+drain first.
+"""
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# number of samples which can be waiting to be written before ``add`` blocks.
+WRITE_BEHIND_MAXSIZE = 64
+
+
+class WriteBehindQueue(object):
+    """Bounded queue of sample writes performed by a background thread.
+
+    One instance is owned by a :class:`~.checkout.WriterCheckout` opened with
+    the ``write_behind`` option, and shared by it's arraysets.
+
+    *  :meth:`submit` blocks while ``maxsize`` writes are waiting, throttling
+       producers to the speed of the storage backends.
+    *  the result of each write is passed to it's ``done`` callback on the
+       thread which submitted it, the next time :meth:`submit`,
+       :meth:`apply`, or :meth:`flush` is called.
+    *  if a write fails, every write queued after it is discarded, and the
+       error is raised by the next call to :meth:`submit`, :meth:`apply`, or
+       :meth:`flush`.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        maximum number of writes waiting in the queue. Default is
+        ``WRITE_BEHIND_MAXSIZE``.
+
+    Raises
+    ------
+    ValueError
+        If ``maxsize`` is not a positive integer.
+    """
+
+    def __init__(self, maxsize: int = WRITE_BEHIND_MAXSIZE):
+        if not isinstance(maxsize, int) or (maxsize <= 0):
+            raise ValueError(f'maxsize: {maxsize} must be an int > 0')
+        self._maxsize = maxsize
+        self._queue: 'queue.Queue[Optional[Tuple[Callable, Callable]]]' = queue.Queue(maxsize)
+        self._results: Deque[Tuple[Callable[[Any], None], Any]] = deque()
+        self._syncs: Dict[int, Callable[[], None]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._discarded = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(maxsize={self._maxsize})'
+
+    def __len__(self) -> int:
+        return self._queue.unfinished_tasks
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of writes waiting in the queue. Read-only attribute.
+        """
+        return self._maxsize
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                write, done = task
+                if self._error is not None:
+                    self._discarded += 1
+                    self._results.append((done, None))
+                    continue
+                try:
+                    self._results.append((done, write()))
+                except BaseException as e:
+                    self._error = e
+                    self._discarded += 1
+                    self._results.append((done, None))
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            err, nDiscarded = self._error, self._discarded
+            self._error, self._discarded = None, 0
+            raise RuntimeError(
+                f'Write-behind storage of samples failed, {nDiscarded} sample(s) were '
+                f'not stored. Error: {err!r}') from err
+
+    def submit(self, write: Callable[[], Any], done: Callable[[Any], None],
+               sync: Optional[Callable[[], None]] = None):
+        """Queue a write to be performed by the background thread.
+
+        Blocks while the queue is full.
+
+        Parameters
+        ----------
+        write : Callable[[], Any]
+            function performing the write, called in the background thread.
+        done : Callable[[Any], None]
+            called on the submitting thread with the return value of ``write``,
+            or with None if the write failed or was discarded.
+        sync : Optional[Callable[[], None]], optional
+            called (once) on the flushing thread by the next :meth:`flush`,
+            after all queued writes have completed; ie. to flush the file
+            handles the write went to. by default None
+
+        Raises
+        ------
+        RuntimeError
+            If a previously queued write failed.
+        """
+        self.apply()
+        if sync is not None:
+            self._syncs.setdefault(id(getattr(sync, '__self__', sync)), sync)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name='hangar-write-behind', daemon=True)
+            self._thread.start()
+        self._queue.put((write, done))
+
+    def apply(self):
+        """Pass the results of every completed write to their ``done`` callback.
+
+        Raises
+        ------
+        RuntimeError
+            If a queued write failed.
+        """
+        while self._results:
+            done, res = self._results.popleft()
+            done(res)
+        self._raise_error()
+
+    def flush(self):
+        """Wait for all queued writes to complete, and apply their results.
+
+        Raises
+        ------
+        RuntimeError
+            If any queued write failed.
+        """
+        if self._thread is not None:
+            self._queue.join()
+        try:
+            self.apply()
+        finally:
+            syncs, self._syncs = self._syncs, {}
+            for sync in syncs.values():
+                sync()
+
+    def close(self):
+        """Flush the queue and stop the background thread.
+
+        The thread is restarted if more writes are submitted.
+
+        Raises
+        ------
+        RuntimeError
+            If any queued write failed.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
@@ -13,7 +13,7 @@ from hangar import Repository
 import hangar
 
 
-backend_params = ['00', '10']
+backend_params = ['00', '10', '30']
 
 
 @pytest.fixture()
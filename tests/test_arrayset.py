@@ -216,7 +216,10 @@ class TestDataWithFixedSizedArrayset(object):
         co.commit('this is a commit message')
         co.close()
         co = repo.checkout()
-        # perform the mock
+        # perform the mock (reader specs are held in an immutable table)
+        for asetn in ('aset1', 'aset2'):
+            mockaset = co._arraysets._arraysets[asetn]
+            mockaset._sspecs = dict(mockaset._sspecs.items())
         template = co._arraysets._arraysets['aset1']._sspecs['3']
         co._arraysets._arraysets['aset1']._sspecs['4'] = template._replace(backend='50')
         co._arraysets._arraysets['aset2']._sspecs['4'] = template._replace(backend='50')
@@ -911,6 +914,30 @@ class TestVariableSizedArrayset(object):
         assert d.iswriteable is False
         co.close()
 
+    @pytest.mark.parametrize('backend', backend_params)
+    def test_shape_buckets_group_samples_by_shape(self, repo, backend):
+        shapes = [(2, 3), (4, 4), (2, 3), (3, 4), (1, 1), (4, 4), (4, 1)]
+        co = repo.checkout(write=True)
+        aset = co.arraysets.init_arrayset('aset', shape=(4, 4), dtype=np.float32,
+                                          variable_shape=True, backend_opts=backend)
+        for i, shape in enumerate(shapes):
+            aset[i] = np.full(shape, i, dtype=np.float32)
+        assert aset.shape_buckets() == {(2, 3): [0, 2], (4, 4): [1, 5], (3, 4): [3], (1, 1): [4], (4, 1): [6]}
+        co.commit('first')
+        co.close()
+
+        co = repo.checkout()
+        aset = co.arraysets['aset']
+        buckets = aset.shape_buckets(bucket_width=2)
+        assert {k: sorted(v) for k, v in buckets.items()} == {
+            (2, 4): [0, 2], (4, 4): [1, 3, 5], (2, 2): [4], (4, 2): [6]}
+        for bucketShape, names in buckets.items():
+            for arr in aset.get_batch(names, n_cpus=1):
+                assert all(dim <= maxDim for dim, maxDim in zip(arr.shape, bucketShape))
+        with pytest.raises(ValueError):
+            aset.shape_buckets(bucket_width=0)
+        co.close()
+
 
 class TestMultiprocessArraysetReads(object):
 
@@ -1011,6 +1038,96 @@ class TestMultiprocessArraysetReads(object):
             assert np.allclose(data, masterSampList[10+idx]) is True
         nco.close()
 
+    @pytest.mark.parametrize('backend', backend_params)
+    def test_batch_get_reuses_checkout_worker_pool(self, repo, backend):
+        co = repo.checkout(write=True)
+        co.arraysets.init_arrayset(name='aset1', shape=(5, 5), dtype=np.float32, backend_opts=backend)
+        co.arraysets.init_arrayset(name='aset2', shape=(5, 5), dtype=np.float32, backend_opts=backend)
+        masterSampList = []
+        for sIdx in range(10):
+            arr = np.random.randn(5, 5).astype(np.float32)
+            co.arraysets['aset1'][str(sIdx)] = arr
+            co.arraysets['aset2'][str(sIdx)] = arr * 2
+            masterSampList.append(arr)
+        cmt = co.commit('first')
+        co.close()
+
+        nco = repo.checkout(write=False, commit=cmt)
+        pool = nco._pool
+        assert pool.is_running is False
+        keys = [str(i) for i in range(10)]
+        res1 = nco.arraysets['aset1'].get_batch(keys, n_cpus=2)
+        assert pool.is_running is True
+        proc_pool = pool._pool
+        res2 = nco.arraysets['aset2'].get_batch(keys, n_cpus=2)
+        assert pool._pool is proc_pool
+        for arr, r1, r2 in zip(masterSampList, res1, res2):
+            assert np.allclose(arr, r1)
+            assert np.allclose(arr * 2, r2)
+
+        # changing pool configuration restarts the pool
+        nco.arraysets['aset1'].get_batch(keys, n_cpus=3)
+        assert pool.is_running is True
+        assert pool._pool is not proc_pool
+        nco.close()
+        assert pool.is_running is False
+
+    @pytest.mark.parametrize('backend', backend_params)
+    def test_zero_copy_reads_return_readonly_views(self, repo, array5by7, backend):
+        co = repo.checkout(write=True)
+        aset = co.arraysets.init_arrayset('aset', prototype=array5by7, backend_opts=backend)
+        for i in range(10):
+            aset[i] = array5by7 + i
+        with pytest.raises(PermissionError):
+            aset.zero_copy = True
+        assert aset.zero_copy is False
+        co.commit('first')
+        co.close()
+
+        nco = repo.checkout()
+        naset = nco.arraysets['aset']
+        assert naset.zero_copy is False
+        assert naset[0].flags.writeable is True
+        with pytest.raises(TypeError):
+            naset.zero_copy = 1
+        naset.zero_copy = True
+        assert naset.zero_copy is True
+
+        res = [naset[i] for i in range(10)] + naset.get_batch(list(range(10)), n_cpus=1)
+        for idx, arr in enumerate(res):
+            assert np.allclose(arr, array5by7 + (idx % 10))
+            if backend == '10':
+                assert arr.flags.writeable is False
+                assert arr.flags.owndata is False
+                with pytest.raises(ValueError):
+                    arr[:] = 0
+        naset.zero_copy = False
+        assert naset[0].flags.writeable is True
+        nco.close()
+
+    @pytest.mark.parametrize('write_behind', [0, 4])
+    @pytest.mark.parametrize('backend', backend_params)
+    def test_batch_get_writer_checkout_uses_per_call_pool(self, repo, backend, write_behind):
+        co = repo.checkout(write=True, write_behind=write_behind)
+        aset = co.arraysets.init_arrayset(
+            'aset', shape=(5,), dtype=np.int64, backend_opts=backend)
+        for i in range(6):
+            aset[i] = np.arange(5) + i
+        assert aset._pool is None
+        res = aset.get_batch(list(range(6)), n_cpus=2)
+        for idx, arr in enumerate(res):
+            assert np.array_equal(arr, np.arange(5) + idx)
+        co.commit('first')
+
+        # samples staged after the commit are visible to the worker processes
+        with aset:
+            aset[7] = np.arange(5) + 7
+            res = aset.get_batch([7, 0], n_cpus=2)
+        assert np.array_equal(res[0], np.arange(5) + 7)
+        assert np.array_equal(res[1], np.arange(5))
+        assert aset._pool is None
+        co.close()
+
     def test_writer_iterating_over_keys_can_have_additions_made_no_error(self, written_two_cmt_repo):
         # do not want ``RuntimeError dictionary changed size during iteration``
 
@@ -1104,3 +1221,321 @@ class TestMultiprocessArraysetReads(object):
 
         assert '1232' not in klist
         co.close()
+
+
+class TestLazySampleSpecs(object):
+
+    @pytest.fixture(params=backend_params)
+    def lazy_repo(self, request, repo, array5by7):
+        co = repo.checkout(write=True)
+        named = co.arraysets.init_arrayset(
+            'named', prototype=array5by7, backend_opts=request.param)
+        unnamed = co.arraysets.init_arrayset(
+            'named_int', prototype=array5by7, backend_opts=request.param)
+        for i in range(20):
+            named[f'n{i}'] = array5by7 + i
+            unnamed[i] = array5by7 + i
+        co.commit('first')
+        co.close()
+        return repo
+
+    def test_specs_resolved_on_demand(self, lazy_repo, array5by7):
+        co = lazy_repo.checkout(lazy_specs=True)
+        aset = co.arraysets['named']
+        assert len(aset._sspecs.resolved) == 0
+        assert len(aset) == 20
+        assert 'n3' in aset
+        assert 'n20' not in aset
+        assert 3 not in aset
+        assert sorted(aset.keys()) == sorted(f'n{i}' for i in range(20))
+        assert len(aset._sspecs.resolved) == 0
+
+        assert np.allclose(aset['n3'], array5by7 + 3)
+        assert list(aset._sspecs.resolved.keys()) == ['n3']
+        with pytest.raises(KeyError):
+            aset['n20']
+
+        intaset = co.arraysets['named_int']
+        assert 3 in intaset
+        assert '3' not in intaset
+        assert np.allclose(intaset[3], array5by7 + 3)
+        assert sorted(intaset.keys()) == list(range(20))
+        co.close()
+
+    def test_lazy_and_eager_reads_match(self, lazy_repo):
+        eco = lazy_repo.checkout()
+        lco = lazy_repo.checkout(lazy_specs=True)
+        for asetn in ('named', 'named_int'):
+            easet, laset = eco.arraysets[asetn], lco.arraysets[asetn]
+            assert laset.contains_remote_references is False
+            assert laset.remote_reference_keys == []
+            assert set(laset.keys(local=True)) == set(easet.keys())
+            for k, v in easet.items():
+                assert np.allclose(laset[k], v)
+        eco.close()
+        lco.close()
+
+    def test_batch_get_worker_pool(self, lazy_repo, array5by7):
+        co = lazy_repo.checkout(lazy_specs=True)
+        aset = co.arraysets['named']
+        keys = [f'n{i}' for i in range(0, 20, 2)]
+        res = aset.get_batch(keys, n_cpus=2)
+        for i, arr in zip(range(0, 20, 2), res):
+            assert np.allclose(arr, array5by7 + i)
+        assert len(aset._sspecs.resolved) == len(keys)
+        with pytest.raises(KeyError):
+            aset.get_batch(keys + ['doesnotexist'], n_cpus=2)
+        co.close()
+
+    def test_reader_pickled_to_other_process(self, lazy_repo, array5by7):
+        from multiprocessing import get_context
+        co = lazy_repo.checkout(lazy_specs=True)
+        aset = co.arraysets['named_int']
+        with get_context('spawn').Pool(2) as P:
+            res = P.map(aset.get, list(range(20)))
+        for i, arr in enumerate(res):
+            assert np.allclose(arr, array5by7 + i)
+        co.close()
+
+    def test_lazy_specs_not_allowed_for_writer(self, lazy_repo):
+        with pytest.raises(ValueError):
+            lazy_repo.checkout(write=True, lazy_specs=True)
+        assert lazy_repo.writer_lock_held is False
+
+
+class TestSampleSpecTable(object):
+
+    @pytest.fixture(params=backend_params)
+    def table_repo(self, request, repo, array5by7):
+        co = repo.checkout(write=True)
+        named = co.arraysets.init_arrayset(
+            'named', prototype=array5by7, backend_opts=request.param, variable_shape=True)
+        unnamed = co.arraysets.init_arrayset(
+            'named_int', prototype=array5by7, backend_opts=request.param)
+        for i in range(20):
+            named[f'n{i}'] = np.ascontiguousarray((array5by7 + i)[:, :(i % 7) + 1])
+            unnamed[i] = array5by7 + i
+        co.commit('first')
+        co.close()
+        return repo
+
+    def test_reader_uses_table_matching_writer_specs(self, table_repo):
+        from hangar.records.sample_specs import SampleSpecTable
+        rco = table_repo.checkout()
+        wco = table_repo.checkout(write=True)
+        for asetn in ('named', 'named_int'):
+            raset, waset = rco.arraysets[asetn], wco.arraysets[asetn]
+            assert isinstance(raset._sspecs, SampleSpecTable)
+            assert isinstance(waset._sspecs, dict)
+            assert list(raset._sspecs.keys()) == list(waset._sspecs.keys())
+            assert dict(raset._sspecs.items()) == waset._sspecs
+            assert list(raset._sspecs.values()) == list(waset._sspecs.values())
+            assert dict(raset._sdigests.items()) == waset._sdigests
+            for name, spec in waset._sspecs.items():
+                assert hash(raset._sspecs[name]) == hash(spec)
+                assert np.allclose(raset[name], waset[name])
+        wco.close()
+        rco.close()
+
+    def test_table_key_lookup(self, table_repo):
+        co = table_repo.checkout()
+        named, unnamed = co.arraysets['named'], co.arraysets['named_int']
+        assert len(named) == 20 and len(unnamed) == 20
+        assert 'n3' in named and 'n20' not in named and 3 not in named
+        assert 3 in unnamed and '3' not in unnamed and '#3' not in unnamed
+        assert 3.0 not in unnamed._sspecs
+        with pytest.raises(KeyError):
+            named['n20']
+        with pytest.raises(KeyError):
+            unnamed['#3']
+        assert sorted(unnamed.keys()) == list(range(20))
+        co.close()
+
+    def test_table_pickled_to_other_process(self, table_repo, array5by7):
+        from multiprocessing import get_context
+        co = table_repo.checkout()
+        aset = co.arraysets['named_int']
+        with get_context('spawn').Pool(2) as P:
+            res = P.map(aset.get, list(range(20)))
+        for i, arr in enumerate(res):
+            assert np.allclose(arr, array5by7 + i)
+        res = aset.get_batch(list(range(0, 20, 3)), n_cpus=2)
+        for i, arr in zip(range(0, 20, 3), res):
+            assert np.allclose(arr, array5by7 + i)
+        co.close()
+
+    def test_specs_not_fitting_table_held_in_overflow(self):
+        from hangar.backends.numpy_10 import NUMPY_10_DataHashSpec
+        from hangar.backends.remote_50 import REMOTE_50_DataHashSpec
+        from hangar.records.sample_specs import SampleSpecTable
+        specs = {
+            'a': NUMPY_10_DataHashSpec('10', 'uid0', '0123456789abcdef', 4, (2, 3)),
+            'b': REMOTE_50_DataHashSpec('50', 'schemahash'),
+            3: NUMPY_10_DataHashSpec('10', 'uid1', 'f123456789abcdef', 0, ()),
+        }
+        digests = {'a': 'aa' * 20, 'b': 'bb' * 20, 3: 'cc' * 20}
+        table = SampleSpecTable(list(specs.keys()), list(specs.values()), list(digests.values()))
+        assert len(table) == 3
+        assert dict(table.items()) == specs
+        assert dict(table.digests.items()) == digests
+        assert list(table._overflow.keys()) == ['b']
+        assert table.file_uids() == {'10': {'uid0', 'uid1'}}
+
+    def test_inline_specs_stored_in_table(self, managed_tmpdir):
+        import os
+        from hangar.backends.lmdb_40 import LMDB_40_DataHashSpec
+        from hangar.backends.numpy_10 import NUMPY_10_DataHashSpec
+        from hangar.records.sample_specs import SampleSpecTable
+        specs = {
+            'a': LMDB_40_DataHashSpec('40', '<i8', 'AQAAAAAAAAACAAAAAAAAAA==', (2,)),
+            'b': LMDB_40_DataHashSpec('40', '<f4', '', (0,)),
+            'c': NUMPY_10_DataHashSpec('10', 'uid0', '0123456789abcdef', 4, (2, 3)),
+            'd': LMDB_40_DataHashSpec('40', '<i2', 'AQ', ()),  # not canonical base64
+        }
+        digests = {'a': 'aa' * 20, 'b': 'bb' * 20, 'c': 'cc' * 20, 'd': 'dd' * 20}
+        table = SampleSpecTable(list(specs.keys()), list(specs.values()), list(digests.values()))
+        assert list(table._overflow.keys()) == ['d']
+        assert table._rows['inline'].shape == (3, 16)
+        assert dict(table.items()) == specs
+        assert dict(table.digests.items()) == digests
+        assert table.file_uids() == {'10': {'uid0'}}
+
+        pth = os.path.join(managed_tmpdir, 'table')
+        table.save(pth)
+        assert dict(SampleSpecTable.load(pth).items()) == specs
+
+
+class TestAddBatch(object):
+
+    @pytest.mark.parametrize('backend', backend_params)
+    def test_add_batch_matches_single_adds(self, repo, array5by7, backend):
+        co = repo.checkout(write=True)
+        single = co.arraysets.init_arrayset('single', prototype=array5by7, backend_opts=backend)
+        batch = co.arraysets.init_arrayset('batch', prototype=array5by7, backend_opts=backend)
+        arrs = [array5by7 + i for i in range(30)]
+        names = [f'n{i}' for i in range(30)]
+        for name, arr in zip(names, arrs):
+            single[name] = arr
+        assert batch.add_batch(arrs, names) == names
+        assert len(batch) == 30
+        for name, arr in zip(names, arrs):
+            assert np.allclose(batch[name], arr)
+            assert batch._sdigests[name] == single._sdigests[name]
+        co.commit('first')
+        co.close()
+
+        co = repo.checkout()
+        for name, arr in zip(names, arrs):
+            assert np.allclose(co.arraysets['batch'][name], arr)
+        co.close()
+
+    def test_add_batch_dedupes_content_and_names(self, repo, array5by7):
+        co = repo.checkout(write=True)
+        aset = co.arraysets.init_arrayset('aset', prototype=array5by7, backend_opts='10')
+        aset['existing'] = array5by7
+        writes = []
+        orig_write = aset._fs['10'].write_data_batch
+        aset._fs['10'].write_data_batch = lambda arrays, **kw: writes.append(len(arrays)) or orig_write(arrays, **kw)
+
+        arrs = [array5by7, array5by7 + 1, array5by7 + 1, array5by7 + 2, array5by7 + 3]
+        names = ['a', 'b', 'c', 'a', 'existing']
+        aset.add_batch(arrs, names)
+        # 'a' -> +2 (last wins), 'b'/'c' share content; only +1, +2, +3 are new data
+        assert writes == [3]
+        assert np.allclose(aset['a'], array5by7 + 2)
+        assert np.allclose(aset['b'], array5by7 + 1)
+        assert np.allclose(aset['c'], array5by7 + 1)
+        assert np.allclose(aset['existing'], array5by7 + 3)
+        assert aset._sspecs['b'] == aset._sspecs['c']
+        assert len(aset) == 4
+        co.close()
+
+    def test_add_batch_invalid_sample_writes_nothing(self, repo, array5by7):
+        co = repo.checkout(write=True)
+        aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+        arrs = [array5by7, array5by7 + 1, np.zeros((2, 2), dtype=np.float32)]
+        with pytest.raises(ValueError):
+            aset.add_batch(arrs, ['a', 'b', 'c'])
+        with pytest.raises(ValueError):
+            aset.add_batch(arrs[:2], ['a', 'b c'])
+        with pytest.raises(ValueError):
+            aset.add_batch(arrs[:2], ['a'])
+        with pytest.raises(ValueError):
+            aset.add_batch(arrs[:2])
+        assert len(aset) == 0
+        co.close()
+
+    @pytest.mark.parametrize('backend', backend_params)
+    def test_add_stack_matches_add_batch(self, repo, array5by7, backend, monkeypatch):
+        from hangar.backends import hdf5_00, numpy_10
+        monkeypatch.setattr(hdf5_00, 'COLLECTION_SIZE', 10)
+        monkeypatch.setattr(numpy_10, 'COLLECTION_SIZE', 10)
+        co = repo.checkout(write=True)
+        stack = np.stack([array5by7 + i for i in range(45)])
+        names = [f'n{i}' for i in range(45)]
+        batch = co.arraysets.init_arrayset('batch', prototype=array5by7, backend_opts=backend)
+        stacked = co.arraysets.init_arrayset('stacked', prototype=array5by7, backend_opts=backend)
+        stacked['n0'] = stack[0]  # rows starts partway through a collection
+        writes = []
+        orig_write = stacked._fs[backend].write_data_batch
+        monkeypatch.setattr(stacked._fs[backend], 'write_data_batch',
+                            lambda arrays, **kw: writes.append(arrays) or orig_write(arrays, **kw))
+
+        assert stacked.add_stack(stack, names) == names
+        batch.add_batch(list(stack), names)
+        assert len(writes) == 1
+        assert isinstance(writes[0], np.ndarray) and len(writes[0]) == 44
+        assert len(stacked) == 45
+        for idx, name in enumerate(names):
+            assert np.allclose(stacked[name], stack[idx])
+            assert stacked._sdigests[name] == batch._sdigests[name]
+        co.commit('stacked')
+        co.close()
+
+        co = repo.checkout()
+        assert np.allclose(co.arraysets['stacked'].get_batch(names, n_cpus=1), stack)
+        co.close()
+
+    def test_add_stack_unnamed_and_invalid_input(self, repo, array5by7):
+        co = repo.checkout(write=True)
+        aset = co.arraysets.init_arrayset('aset', prototype=array5by7, named_samples=False)
+        names = aset.add_stack(np.stack([array5by7, array5by7 + 1]))
+        assert len(names) == 2 and len(aset) == 2
+        with pytest.raises(ValueError):
+            aset.add_stack([array5by7, array5by7])
+        with pytest.raises(ValueError):
+            aset.add_stack(array5by7)
+        with pytest.raises(ValueError):
+            aset.add_stack(np.stack([array5by7, array5by7]).astype(np.float32))
+        with pytest.raises(ValueError):
+            aset.add_stack(np.stack([array5by7] * 4)[::2])
+        vaset = co.arraysets.init_arrayset('vaset', prototype=array5by7, variable_shape=True)
+        with pytest.raises(ValueError):
+            vaset.add_stack(np.stack([array5by7, array5by7]))
+        assert len(aset) == 2 and len(vaset) == 0
+        co.close()
+
+    def test_update_with_mapping_and_pairs(self, repo, array5by7):
+        co = repo.checkout(write=True)
+        aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+        aset.update({'a': array5by7, 'b': array5by7 + 1})
+        aset.update([('c', array5by7 + 2), (4, array5by7 + 3)])
+        assert set(aset.keys()) == {'a', 'b', 'c', 4}
+        assert np.allclose(aset[4], array5by7 + 3)
+
+        unnamed = co.arraysets.init_arrayset('unnamed', prototype=array5by7, named_samples=False)
+        with unnamed as cm_aset:
+            names = cm_aset.add_batch([array5by7, array5by7 + 1])
+        assert len(set(names)) == 2
+        assert np.allclose(unnamed[names[1]], array5by7 + 1)
+        co.close()
+
+    def test_large_batch_hashed_in_threads(self, repo):
+        co = repo.checkout(write=True)
+        proto = np.zeros((256, 256), dtype=np.float64)  # 512 KB per sample
+        aset = co.arraysets.init_arrayset('aset', prototype=proto)
+        arrs = [proto + i for i in range(4)]
+        aset.add_batch(arrs, list(range(4)))
+        for i, arr in enumerate(arrs):
+            assert np.allclose(aset[i], arr)
+        co.close()
@@ -94,10 +94,12 @@ def test_init_arrayset_with_backend_opts_works(repo, array5by7, backend):
 
 
 @pytest.mark.parametrize('prototype,expected_backend', [
-    [np.random.randn(10), '10'],
+    [np.random.randn(10), '40'],
+    [np.random.randn(100), '10'],
     [np.random.randn(1000), '00'],
-    [np.random.randn(2, 2), '00'],
-    [np.random.randn(5, 2), '00'],
+    [np.random.randn(2, 2), '40'],
+    [np.random.randn(5, 2), '40'],
+    [np.random.randn(5, 5), '00'],
 ])
 def test_heuristics_select_backend(repo, prototype, expected_backend):
 
@@ -117,6 +119,28 @@ def test_heuristics_select_backend(repo, prototype, expected_backend):
     nwco.close()
 
 
+@pytest.mark.parametrize('prototype,expected_backend', [
+    [np.random.randn(10), '40'],
+    [np.random.randn(100), '30'],
+    [np.random.randn(20, 20), '30'],
+])
+def test_heuristics_select_unpadded_backend_for_variable_shape(repo, prototype, expected_backend):
+
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', prototype=prototype, variable_shape=True)
+    assert aset.backend == expected_backend
+    sample = np.ascontiguousarray(prototype[:3])
+    aset['0'] = sample
+    wco.commit('first commit')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    assert naset.backend == expected_backend
+    assert np.allclose(sample, naset['0'])
+    rco.close()
+
+
 @pytest.mark.parametrize('prototype', [np.random.randn(10), np.random.randn(1000), np.random.randn(2, 2)])
 @pytest.mark.parametrize('backend', backend_params)
 def test_manual_override_heuristics_select_backend(repo, prototype, backend):
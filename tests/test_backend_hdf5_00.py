@@ -171,3 +171,110 @@ def test_arrayset_overflows_collection_size_collection_count(repo, monkeypatch):
             proto[:] = i
             assert np.allclose(proto, ncm_aset[i])
     rco.close()
+
+
+@pytest.mark.parametrize('variable_shape', [False, True])
+def test_read_data_batch_matches_single_sample_reads(repo, monkeypatch, variable_shape):
+    from hangar.backends import hdf5_00
+    monkeypatch.setattr(hdf5_00, 'COLLECTION_COUNT', 5)
+    monkeypatch.setattr(hdf5_00, 'COLLECTION_SIZE', 10)
+
+    wco = repo.checkout(write=True)
+    proto = np.arange(50).astype(np.uint16)
+    aset = wco.arraysets.init_arrayset(
+        'aset', prototype=proto, variable_shape=variable_shape, backend_opts='00')
+    with aset as cm_aset:
+        for i in range(120):
+            arr = proto[:(i % 50) + 1] if variable_shape else proto
+            arr = arr.copy()
+            arr[:] = i
+            cm_aset[i] = arr
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    # mix of contiguous runs, gaps, duplicates, multiple collections & files
+    names = [3, 4, 5, 6, 0, 99, 17, 18, 55, 5, 119, 11, 12, 13, 1]
+    specs = [naset._sspecs[name] for name in names]
+    res = naset._fs['00'].read_data_batch(specs)
+    assert len(res) == len(names)
+    for name, arr in zip(names, res):
+        assert np.allclose(arr, naset.get(name))
+        assert arr.shape == naset.get(name).shape
+    assert naset.get_batch(names, n_cpus=1)[-1].shape == naset.get(1).shape
+    rco.close()
+
+
+@pytest.mark.parametrize('variable_shape', [False, True])
+def test_write_data_batch_matches_single_sample_writes(repo, monkeypatch, variable_shape):
+    from hangar.backends import hdf5_00
+    monkeypatch.setattr(hdf5_00, 'COLLECTION_COUNT', 5)
+    monkeypatch.setattr(hdf5_00, 'COLLECTION_SIZE', 10)
+
+    wco = repo.checkout(write=True)
+    proto = np.arange(50).astype(np.uint16)
+    single = wco.arraysets.init_arrayset(
+        'single', prototype=proto, variable_shape=variable_shape, backend_opts='00')
+    batch = wco.arraysets.init_arrayset(
+        'batch', prototype=proto, variable_shape=variable_shape, backend_opts='00')
+    single[0] = proto
+    batch[0] = proto + 1  # batch starts partway through a collection
+    arrs = []
+    for i in range(1, 61):
+        arr = proto[:(i % 50) + 1] if (variable_shape and i % 3) else proto
+        arrs.append(np.full_like(arr, i))
+
+    singleSpecs = [hdf5_00.hdf5_00_decode(single._fs['00'].write_data(arr)) for arr in arrs]
+    batchSpecs = [hdf5_00.hdf5_00_decode(v) for v in batch._fs['00'].write_data_batch(arrs)]
+    assert [(s.dataset, s.dataset_idx) for s in batchSpecs] == \
+           [(s.dataset, s.dataset_idx) for s in singleSpecs]
+    assert len(set(s.uid for s in batchSpecs)) == 2
+    for arr, spec in zip(arrs, batchSpecs):
+        assert spec.shape == arr.shape
+        assert np.allclose(batch._fs['00'].read_data(spec), arr)
+    assert (batch._fs['00'].hNextPath, batch._fs['00'].hIdx, batch._fs['00'].hColsRemain) == \
+           (single._fs['00'].hNextPath, single._fs['00'].hIdx, single._fs['00'].hColsRemain)
+    wco.close()
+
+
+def test_collection_layout_adapts_to_sample_nbytes():
+    from hangar.backends import hdf5_00
+
+    size, count = hdf5_00._collection_layout(4)
+    assert (size, count) == (hdf5_00.COLLECTION_SIZE, hdf5_00.COLLECTION_COUNT)
+    size, count = hdf5_00._collection_layout(40_000)
+    assert size == hdf5_00.TARGET_COLLECTION_NBYTES // 40_000
+    assert size * (count - 1) * 40_000 <= hdf5_00.TARGET_FILE_NBYTES
+    size, count = hdf5_00._collection_layout(50_000_000)
+    assert size == 1
+    assert count == hdf5_00.TARGET_FILE_NBYTES // 50_000_000 + 1
+    assert hdf5_00._collection_layout(4_000_000_000) == (1, 2)
+
+
+def test_collection_layout_recorded_in_file_attrs(repo, monkeypatch):
+    from hangar.backends import hdf5_00
+    monkeypatch.setattr(hdf5_00, 'TARGET_COLLECTION_NBYTES', 1_000)
+    monkeypatch.setattr(hdf5_00, 'TARGET_FILE_NBYTES', 3_000)
+
+    wco = repo.checkout(write=True)
+    proto = np.zeros((10, 10), dtype=np.uint8)
+    aset = wco.arraysets.init_arrayset('aset', prototype=proto, backend_opts='00')
+    for i in range(31):
+        aset[i] = np.full_like(proto, i)
+    fs = aset._fs['00']
+    assert fs.hMaxSize == 10
+    attrs = fs.wFp[fs.w_uid]['/'].attrs
+    assert (attrs['collection_max_size'], attrs['collection_total']) == (10, 4)
+    # 3 collections of 10 samples are written to each file.
+    assert len(set(aset._sspecs[i].uid for i in range(30))) == 1
+    assert aset._sspecs[30].uid != aset._sspecs[0].uid
+    wco.commit('hello')
+    wco.close()
+
+    monkeypatch.undo()
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    for i in range(31):
+        assert np.allclose(naset[i], i)
+    rco.close()
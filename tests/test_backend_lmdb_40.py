@@ -0,0 +1,95 @@
+import os
+
+import pytest
+import numpy as np
+
+
+def test_encode_decode_roundtrip():
+    from hangar.backends.lmdb_40 import lmdb_40_encode, lmdb_40_decode, LMDB_40_DataHashSpec
+
+    db_val = lmdb_40_encode('<i2', 'AQACAAMABAA=', (2, 2))
+    assert db_val == b'40:<i2$AQACAAMABAA=*2 2'
+    assert lmdb_40_decode(db_val) == LMDB_40_DataHashSpec('40', '<i2', 'AQACAAMABAA=', (2, 2))
+    assert lmdb_40_decode(lmdb_40_encode('<f8', 'AAAAAAAA8D8=', ())).shape == ()
+
+
+@pytest.mark.parametrize('array', [
+    np.array([[1, 2], [3, 4]], dtype=np.int16),
+    np.array(1.0),
+    np.arange(16, dtype=np.float64),
+    np.zeros((0, 3), dtype=np.uint8),
+    np.array([True, False]),
+    np.arange(12, dtype='>u4').reshape(3, 4)[:, 1:3],
+])
+def test_write_read_roundtrip(array):
+    from hangar.backends.lmdb_40 import LMDB_40_FileHandles
+    from hangar.backends import backend_decoder
+
+    accessor = LMDB_40_FileHandles(repo_path=None, schema_shape=None, schema_dtype=None)
+    accessor.open(mode='a')
+    spec = backend_decoder(accessor.write_data(array))
+    out = accessor.read_data(spec)
+    assert out.dtype == array.dtype
+    assert np.array_equal(out, array)
+    assert out.flags.writeable
+    accessor.close()
+
+
+def test_write_above_inline_max_nbytes_fails():
+    from hangar.backends.lmdb_40 import LMDB_40_FileHandles, INLINE_MAX_NBYTES
+
+    accessor = LMDB_40_FileHandles(repo_path=None, schema_shape=None, schema_dtype=None)
+    accessor.open(mode='a')
+    accessor.write_data(np.zeros(INLINE_MAX_NBYTES, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        accessor.write_data(np.zeros(INLINE_MAX_NBYTES + 1, dtype=np.uint8))
+
+
+def test_corrupt_record_detected_on_read():
+    from hangar.backends.lmdb_40 import LMDB_40_FileHandles
+    from hangar.backends import backend_decoder
+
+    accessor = LMDB_40_FileHandles(repo_path=None, schema_shape=None, schema_dtype=None)
+    accessor.open(mode='a')
+    spec = backend_decoder(accessor.write_data(np.arange(4, dtype=np.int32)))
+    with pytest.raises(RuntimeError, match='DATA CORRUPTION'):
+        accessor.read_data(spec._replace(shape=(5,)))
+    with pytest.raises(RuntimeError, match='DATA CORRUPTION'):
+        accessor.read_data(spec._replace(dtype='<i8'))
+
+
+def test_samples_stored_without_data_files(repo):
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(4,), dtype=np.float32)
+    assert aset.backend == '40'
+    aset.add_batch([np.full(4, i, dtype=np.float32) for i in range(10)], names=list(range(10)))
+    aset[10] = np.full(4, 10, dtype=np.float32)
+    wco.commit('hello')
+    wco.close()
+    for root, dirs, files in os.walk(repo._repo_path):
+        assert '40' not in dirs
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    assert len(naset._sspecs._overflow) == 0
+    for i in range(11):
+        assert np.array_equal(naset[i], np.full(4, i, dtype=np.float32))
+    assert np.array_equal(naset.get_batch(list(range(11)), n_cpus=2),
+                          [np.full(4, i, dtype=np.float32) for i in range(11)])
+    rco.close()
+
+
+def test_variable_shape_samples(repo):
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(4, 4), dtype=np.int16,
+                                       variable_shape=True, backend_opts='40')
+    for i in range(4):
+        aset[i] = np.arange((i + 1) ** 2, dtype=np.int16).reshape(i + 1, i + 1)
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    for i in range(4):
+        assert np.array_equal(naset[i], np.arange((i + 1) ** 2, dtype=np.int16).reshape(i + 1, i + 1))
+    rco.close()
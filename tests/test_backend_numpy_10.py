@@ -0,0 +1,110 @@
+import pytest
+import numpy as np
+
+
+@pytest.mark.parametrize('variable_shape', [False, True])
+def test_read_data_batch_matches_single_sample_reads(repo, monkeypatch, variable_shape):
+    from hangar.backends import numpy_10
+    monkeypatch.setattr(numpy_10, 'COLLECTION_SIZE', 10)
+
+    wco = repo.checkout(write=True)
+    proto = np.zeros((5, 7), dtype=np.float32)
+    aset = wco.arraysets.init_arrayset(
+        'aset', prototype=proto, variable_shape=variable_shape, backend_opts='10')
+    with aset as cm_aset:
+        for i in range(45):
+            arr = proto[:(i % 5) + 1, :] if variable_shape else proto
+            cm_aset[i] = np.full_like(arr, i)
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    # mix of contiguous runs, reversed runs, gaps, duplicates, multiple files
+    names = [3, 4, 5, 6, 0, 44, 17, 18, 33, 5, 12, 11, 10, 1]
+    specs = [naset._sspecs[name] for name in names]
+    res = naset._fs['10'].read_data_batch(specs)
+    assert len(res) == len(names)
+    for name, arr in zip(names, res):
+        expected = naset.get(name)
+        assert arr.shape == expected.shape
+        assert np.allclose(arr, expected)
+    rco.close()
+
+
+def test_read_data_batch_fills_caller_provided_out_array(repo):
+    wco = repo.checkout(write=True)
+    proto = np.zeros((5, 7), dtype=np.float32)
+    aset = wco.arraysets.init_arrayset('aset', prototype=proto, backend_opts='10')
+    with aset as cm_aset:
+        for i in range(20):
+            cm_aset[i] = np.full_like(proto, i)
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    names = list(range(5, 15))
+    specs = [naset._sspecs[name] for name in names]
+    out = np.empty((len(names), 5, 7), dtype=np.float32)
+    res = naset._fs['10'].read_data_batch(specs, out=out)
+    for idx, name in enumerate(names):
+        assert np.allclose(out[idx], name)
+        assert np.shares_memory(res[idx], out)
+
+    with pytest.raises(ValueError):
+        naset._fs['10'].read_data_batch(specs, out=np.empty((3, 5, 7), dtype=np.float32))
+    with pytest.raises(ValueError):
+        naset._fs['10'].read_data_batch(specs, out=out.astype(np.float64))
+    rco.close()
+
+
+@pytest.mark.parametrize('variable_shape', [False, True])
+def test_write_data_batch_rolls_over_collections(repo, monkeypatch, variable_shape):
+    from hangar.backends import numpy_10
+    monkeypatch.setattr(numpy_10, 'COLLECTION_SIZE', 10)
+
+    wco = repo.checkout(write=True)
+    proto = np.zeros((5, 7), dtype=np.float32)
+    aset = wco.arraysets.init_arrayset(
+        'aset', prototype=proto, variable_shape=variable_shape, backend_opts='10')
+    aset[0] = proto  # batch starts partway through a collection
+    arrs = []
+    for i in range(1, 26):
+        arr = proto[:(i % 5) + 1, :] if variable_shape else proto
+        arrs.append(np.full_like(arr, i))
+    hashVals = aset._fs['10'].write_data_batch(arrs)
+    specs = [numpy_10.numpy_10_decode(v) for v in hashVals]
+    assert [spec.collection_idx for spec in specs] == [*range(1, 10), *range(10), *range(6)]
+    assert len(set(spec.uid for spec in specs)) == 3
+    for arr, spec in zip(arrs, specs):
+        assert spec.shape == arr.shape
+        assert np.allclose(aset._fs['10'].read_data(spec), arr)
+    wco.close()
+
+
+def test_collection_size_adapts_to_sample_nbytes(repo, monkeypatch):
+    from hangar.backends import numpy_10
+
+    assert numpy_10._collection_size(4) == numpy_10.COLLECTION_SIZE
+    assert numpy_10._collection_size(1_000_000) == numpy_10.TARGET_FILE_NBYTES // 1_000_000
+    assert numpy_10._collection_size(10 * numpy_10.TARGET_FILE_NBYTES) == 1
+
+    monkeypatch.setattr(numpy_10, 'TARGET_FILE_NBYTES', 1_000)
+    wco = repo.checkout(write=True)
+    proto = np.zeros((10, 10), dtype=np.uint8)
+    aset = wco.arraysets.init_arrayset('aset', prototype=proto, backend_opts='10')
+    aset.add_batch([np.full_like(proto, i) for i in range(25)], names=list(range(25)))
+    aset[25] = np.full_like(proto, 25)
+    assert aset._fs['10'].hMaxSize == 10
+    assert len(set(aset._sspecs[i].uid for i in range(26))) == 3
+    assert aset._fs['10'].wFp[aset._fs['10'].w_uid].shape == (10, 10, 10)
+    wco.commit('hello')
+    wco.close()
+
+    monkeypatch.undo()
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    for i in range(26):
+        assert np.allclose(naset[i], i)
+    rco.close()
@@ -0,0 +1,192 @@
+import os
+
+import pytest
+import numpy as np
+
+
+def test_encode_decode_roundtrip():
+    from hangar.backends.pack_30 import pack_30_encode, pack_30_decode, PACK_30_DataHashSpec
+
+    db_val = pack_30_encode('rlUK3C', '8067007c0f05c359', 32, 47, (20, 2, 3))
+    assert db_val == b'30:rlUK3C$8067007c0f05c359$32$47*20 2 3'
+    assert pack_30_decode(db_val) == PACK_30_DataHashSpec(
+        '30', 'rlUK3C', '8067007c0f05c359', 32, 47, (20, 2, 3))
+    assert pack_30_decode(pack_30_encode('rlUK3C', 'a', 32, 16, ())).shape == ()
+
+
+@pytest.mark.parametrize('complib', ['blosclz', 'lz4', 'zlib', 'zstd'])
+@pytest.mark.parametrize('shuffle', [None, 'byte', 'bit'])
+def test_compression_opts_roundtrip(repo, complib, shuffle):
+    wco = repo.checkout(write=True)
+    opts = {'backend': '30', 'complib': complib, 'complevel': 5, 'shuffle': shuffle}
+    aset = wco.arraysets.init_arrayset('aset', shape=(50, 50), dtype=np.uint16,
+                                       variable_shape=True, backend_opts=opts)
+    arr = np.arange(2500, dtype=np.uint16).reshape(50, 50) // 100
+    aset[0] = arr
+    aset[1] = np.ascontiguousarray(arr[:3, :7])
+    assert aset._sspecs[0].length < arr.nbytes
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    assert np.array_equal(naset[0], arr)
+    assert np.array_equal(naset[1], arr[:3, :7])
+    rco.close()
+
+
+def test_variable_shape_samples_stored_without_padding(repo):
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(1000,), dtype=np.float64,
+                                       variable_shape=True, backend_opts='30')
+    rng = np.random.RandomState(0)
+    for i in range(20):
+        aset[i] = rng.rand(i + 1)
+    specs = [aset._sspecs[i] for i in range(20)]
+    assert len(set(spec.uid for spec in specs)) == 1
+    # blobs are appended back to back after the header
+    from hangar.backends.pack_30 import PACK_HEADER_NBYTES
+    assert specs[0].offset == PACK_HEADER_NBYTES
+    for prev, cur in zip(specs, specs[1:]):
+        assert cur.offset == prev.offset + prev.length
+    packSize = os.path.getsize(aset._fs['30']._file_path(specs[0].uid))
+    assert packSize == specs[-1].offset + specs[-1].length
+    assert packSize < 20 * 1000 * 8
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    rng = np.random.RandomState(0)
+    expected = [rng.rand(i + 1) for i in range(20)]
+    names = [3, 4, 5, 19, 0, 7, 6, 5]
+    res = naset._fs['30'].read_data_batch([naset._sspecs[n] for n in names])
+    for name, arr in zip(names, res):
+        assert np.array_equal(arr, expected[name])
+        assert arr.flags.writeable
+    for i in range(20):
+        assert np.array_equal(naset[i], expected[i])
+    rco.close()
+
+
+@pytest.mark.parametrize('bucket_width,n_files', [(0, 1), (1, 3), (2, 2)])
+def test_samples_of_a_shape_bucket_stored_together(repo, bucket_width, n_files):
+    wco = repo.checkout(write=True)
+    opts = {'backend': '30', 'bucket_width': bucket_width}
+    aset = wco.arraysets.init_arrayset('aset', shape=(4, 4), dtype=np.float32,
+                                       variable_shape=True, backend_opts=opts)
+    shapes = [(2, 3), (4, 4), (2, 3), (3, 4), (4, 4)] * 2
+    aset.add_batch([np.full(shape, i, dtype=np.float32) for i, shape in enumerate(shapes[:5])],
+                   names=list(range(5)))
+    for i, shape in enumerate(shapes[5:], start=5):
+        aset[i] = np.full(shape, i, dtype=np.float32)
+    assert len(set(aset._sspecs[i].uid for i in range(10))) == n_files
+    for names in aset.shape_buckets(bucket_width=max(bucket_width, 1)).values():
+        specs = sorted((aset._sspecs[n] for n in names), key=lambda spec: spec.offset)
+        assert len(set(spec.uid for spec in specs)) == 1
+        if bucket_width:
+            # back to back, so the bucket is fetched with a single read
+            for prev, cur in zip(specs, specs[1:]):
+                assert cur.offset == prev.offset + prev.length
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    for names in naset.shape_buckets().values():
+        for name, arr in zip(names, naset.get_batch(names, n_cpus=1)):
+            assert np.array_equal(arr, np.full(shapes[name], name, dtype=np.float32))
+    rco.close()
+
+
+def test_open_write_files_capped(repo, monkeypatch):
+    from hangar.backends import pack_30
+    monkeypatch.setattr(pack_30, 'MAX_OPEN_WRITE_FILES', 2)
+
+    wco = repo.checkout(write=True)
+    opts = {'backend': '30', 'bucket_width': 1}
+    aset = wco.arraysets.init_arrayset('aset', shape=(10,), dtype=np.int64,
+                                       variable_shape=True, backend_opts=opts)
+    fs = aset._fs['30']
+    aset.add_batch([np.arange(i % 10 + 1) + i for i in range(10)], names=list(range(10)))
+    assert len(fs.wOpen) == 2
+    assert sum(isinstance(fd, int) for fd in fs.wFp.values()) == 2
+    for i in range(10, 30):
+        aset[i] = np.arange(i % 10 + 1) + i
+        assert sum(isinstance(fd, int) for fd in fs.wFp.values()) <= 2
+    assert len(fs.wFp) == 10
+    for names in aset.shape_buckets().values():
+        specs = sorted((aset._sspecs[n] for n in names), key=lambda spec: spec.offset)
+        assert len(set(spec.uid for spec in specs)) == 1
+        for prev, cur in zip(specs, specs[1:]):
+            assert cur.offset == prev.offset + prev.length
+    for i in range(30):
+        assert np.array_equal(aset[i], np.arange(i % 10 + 1) + i)
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    for i, arr in enumerate(naset.get_batch(list(range(30)), n_cpus=1)):
+        assert np.array_equal(arr, np.arange(i % 10 + 1) + i)
+    rco.close()
+
+
+def test_new_pack_file_started_when_full(repo, monkeypatch):
+    from hangar.backends import pack_30
+    monkeypatch.setattr(pack_30, 'PACK_MAX_NBYTES', 200)
+
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(10,), dtype=np.int64, backend_opts='30')
+    aset.add_batch([np.arange(10) * i for i in range(12)], names=list(range(12)))
+    for i in range(12, 20):
+        aset[i] = np.arange(10) * i
+    uids = [aset._sspecs[i].uid for i in range(20)]
+    assert len(set(uids)) > 1
+    assert uids == sorted(uids, key=uids.index)  # files are filled one after the other
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    assert np.array_equal(naset.get_batch(list(range(20)), n_cpus=1),
+                          [np.arange(10) * i for i in range(20)])
+    rco.close()
+
+
+def test_corrupt_blob_detected_on_read(repo):
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(10, 10), dtype=np.float32, backend_opts='30')
+    aset[0] = np.ones((10, 10), dtype=np.float32)
+    spec = aset._sspecs[0]
+    wco.commit('hello')
+    wco.close()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    accessor = naset._fs['30']
+    with pytest.raises(RuntimeError, match='DATA CORRUPTION'):
+        accessor.read_data(spec._replace(length=spec.length - 1))
+    with pytest.raises(RuntimeError, match='DATA CORRUPTION'):
+        accessor.read_data(spec._replace(shape=(10, 9)))
+    with pytest.raises(RuntimeError, match='DATA CORRUPTION'):
+        accessor.read_data(spec._replace(checksum='0' * 16))
+    rco.close()
+
+
+def test_read_without_schema_dtype_uses_file_header(repo):
+    from hangar.backends.pack_30 import PACK_30_FileHandles
+
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(3, 4), dtype=np.int16, backend_opts='30')
+    aset[0] = np.arange(12, dtype=np.int16).reshape(3, 4)
+    spec = aset._sspecs[0]
+    wco.commit('hello')
+    wco.close()
+
+    accessor = PACK_30_FileHandles(repo_path=repo._repo_path, schema_shape=None, schema_dtype=None)
+    accessor.open(mode='r')
+    out = accessor.read_data(spec)
+    assert out.dtype == np.int16
+    assert np.array_equal(out, np.arange(12, dtype=np.int16).reshape(3, 4))
+    accessor.close()
@@ -0,0 +1,117 @@
+import pytest
+import numpy as np
+from conftest import backend_params
+
+from hangar.cache import SampleCache
+
+
+class TestSampleCache(object):
+
+    @pytest.mark.parametrize('max_nbytes', [0, -1, 1.5, None])
+    def test_invalid_budget_fails(self, max_nbytes):
+        with pytest.raises(ValueError):
+            SampleCache(max_nbytes=max_nbytes)
+
+    def test_lru_eviction_respects_byte_budget(self):
+        cache = SampleCache(max_nbytes=300)
+        arrs = [np.full((10,), i, dtype=np.float64) for i in range(4)]  # 80 bytes each
+        for i, arr in enumerate(arrs[:3]):
+            cache.put(str(i), arr)
+        assert cache.stats == (0, 0, 0, 3, 240, 300)
+
+        assert np.allclose(cache.get('0'), arrs[0])  # '1' is now least recently used
+        cache.put('3', arrs[3])
+        assert '1' not in cache
+        assert all(k in cache for k in ('0', '2', '3'))
+        assert cache.get('1') is None
+        assert cache.stats == (1, 1, 1, 3, 240, 300)
+
+    def test_cached_arrays_are_read_only_and_owned(self):
+        cache = SampleCache(max_nbytes=1000)
+        buf = np.arange(20, dtype=np.int64)
+        res = cache.put('view', buf[:10])
+        assert res.flags.owndata is True
+        assert res.flags.writeable is False
+        assert buf.flags.writeable is True
+        assert cache.get('view') is res
+        with pytest.raises(ValueError):
+            res[0] = 1
+
+    def test_array_larger_than_budget_is_not_cached(self):
+        cache = SampleCache(max_nbytes=10)
+        arr = np.zeros((10,), dtype=np.float64)
+        res = cache.put('big', arr)
+        assert res is arr
+        assert res.flags.writeable is False
+        assert len(cache) == 0
+
+    def test_clear_resets_contents_and_stats(self):
+        cache = SampleCache(max_nbytes=1000)
+        cache.put('a', np.zeros(5))
+        cache.get('a')
+        cache.get('b')
+        cache.clear()
+        assert cache.stats == (0, 0, 0, 0, 0, 1000)
+
+
+@pytest.mark.parametrize('backend', backend_params)
+def test_arrayset_reads_share_cache_across_names_and_checkouts(repo, array5by7, backend):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7, backend_opts=backend)
+    for i in range(5):
+        aset[i] = array5by7 + i
+    aset['dup'] = array5by7  # same content as sample 0
+    cmt1 = co.commit('first')
+    aset[100] = array5by7 + 100
+    cmt2 = co.commit('second')
+    co.close()
+
+    cache = SampleCache(max_nbytes=1024 ** 2)
+    co = repo.checkout(commit=cmt1)
+    aset = co.arraysets['aset']
+    with pytest.raises(TypeError):
+        aset.sample_cache = 'foo'
+    aset.sample_cache = cache
+    assert aset.sample_cache is cache
+    for i in range(5):
+        assert np.allclose(aset[i], array5by7 + i)
+    assert cache.stats[:2] == (0, 5)
+    assert np.allclose(aset['dup'], array5by7)
+    assert cache.stats[:2] == (1, 5)
+
+    res = aset.get_batch(list(range(5)), n_cpus=2)
+    for i, arr in enumerate(res):
+        assert np.allclose(arr, array5by7 + i)
+        assert arr.flags.writeable is False
+    assert cache.stats[:2] == (6, 5)
+    with pytest.raises(KeyError):
+        aset.get_batch([0, 'doesnotexist'])
+    co.close()
+
+    co = repo.checkout(commit=cmt2)
+    naset = co.arraysets['aset']
+    naset.sample_cache = cache
+    res = naset.get_batch([0, 1, 100], n_cpus=1)
+    assert np.allclose(res[2], array5by7 + 100)
+    assert cache.stats[:2] == (8, 6)
+    naset.sample_cache = None
+    assert naset[0].flags.writeable is True
+    co.close()
+
+
+def test_writer_arrayset_cache_tracks_overwritten_samples(repo, array5by7):
+    cache = SampleCache(max_nbytes=1024 ** 2)
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset.sample_cache = cache
+    aset['0'] = array5by7
+    assert np.allclose(aset['0'], array5by7)
+    aset['0'] = array5by7 + 1
+    assert np.allclose(aset['0'], array5by7 + 1)
+    aset['1'] = array5by7
+    assert np.allclose(aset['1'], array5by7)
+    assert cache.stats.hits == 1
+    del aset['0']
+    with pytest.raises(KeyError):
+        aset['0']
+    co.close()
@@ -623,3 +623,58 @@ def test_checkout_branch_not_existing_does_not_hold_writer_lock(written_two_cmt_
     assert repo.writer_lock_held is False
     with pytest.raises(NameError):
         co.branch_name  # should not even exist
+
+
+class TestChecksumPolicy(object):
+
+    def test_default_policy_verifies_every_read(self, written_two_cmt_repo):
+        co = written_two_cmt_repo.checkout()
+        assert co.checksum_policy == 'always'
+        aset = co.arraysets['writtenaset']
+        for _ in range(2):
+            for k in aset.keys():
+                aset[k]
+        assert co.checksum_counts == (20, 0)
+        co.close()
+
+    def test_once_policy_verifies_each_sample_once(self, written_two_cmt_repo):
+        co = written_two_cmt_repo.checkout(checksum_policy='once')
+        assert co.checksum_policy == 'once'
+        aset = co.arraysets['writtenaset']
+        keys = list(aset.keys())
+        for _ in range(3):
+            for k in keys:
+                aset[k]
+        assert co.checksum_counts.verified == 10
+        assert co.checksum_counts.skipped == 20
+        aset.get_batch(keys, n_cpus=1)
+        assert co.checksum_counts == (10, 30)
+        co.close()
+
+    @pytest.mark.parametrize('fraction,expected_verified', [(0.0, 0), (1.0, 50)])
+    def test_sampled_policy_verifies_fraction(self, written_two_cmt_repo, fraction, expected_verified):
+        co = written_two_cmt_repo.checkout(checksum_policy='sampled', checksum_fraction=fraction)
+        aset = co.arraysets['writtenaset']
+        for _ in range(5):
+            for k in aset.keys():
+                aset[k]
+        assert co.checksum_counts == (expected_verified, 50 - expected_verified)
+        co.close()
+
+    def test_never_policy_skips_verification(self, written_two_cmt_repo):
+        co = written_two_cmt_repo.checkout(checksum_policy='never')
+        aset = co.arraysets['writtenaset']
+        for k in aset.keys():
+            assert isinstance(aset[k], np.ndarray)
+        assert co.checksum_counts == (0, 10)
+        co.close()
+
+    def test_invalid_policy_values_fail(self, written_two_cmt_repo):
+        repo = written_two_cmt_repo
+        with pytest.raises(ValueError):
+            repo.checkout(checksum_policy='sometimes')
+        with pytest.raises(ValueError):
+            repo.checkout(checksum_policy='sampled', checksum_fraction=1.5)
+        with pytest.raises(ValueError):
+            repo.checkout(write=True, checksum_policy='never')
+        assert repo.writer_lock_held is False
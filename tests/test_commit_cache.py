@@ -0,0 +1,99 @@
+import os
+
+import pytest
+import numpy as np
+
+
+def _commit_cache_dir(repo):
+    return os.path.join(repo._repo_path, 'commit_cache')
+
+
+def _reopen(repo):
+    from hangar import Repository
+    repo._env._close_environments()
+    return Repository(path=os.path.dirname(repo._repo_path), exists=True)
+
+
+class TestCommitCache(object):
+
+    def test_reader_checkout_builds_then_reuses_environment(self, written_two_cmt_repo, monkeypatch):
+        from hangar.records import commiting
+
+        repo = written_two_cmt_repo
+        cmt = repo.log(return_contents=True)['head']
+        co = repo.checkout()
+        expected = {k: v for k, v in co.arraysets['writtenaset'].items()}
+        co.close()
+        assert os.listdir(_commit_cache_dir(repo)) == [f'{cmt}.lmdb']
+
+        # later checkouts (in this or other processes) never unpack the commit again
+        def unpack_not_allowed(*args, **kwargs):
+            raise AssertionError('commit unpacked again')
+        monkeypatch.setattr(commiting, 'unpack_commit_ref', unpack_not_allowed)
+        co = repo.checkout()
+        co.close()
+
+        repo = _reopen(repo)
+        co = repo.checkout(commit=cmt)
+        aset = co.arraysets['writtenaset']
+        assert set(aset.keys()) == set(expected.keys())
+        for k, v in expected.items():
+            assert np.allclose(aset[k], v)
+        co.close()
+        repo._env._close_environments()
+
+    def test_commit_verified_when_environment_built(self, written_two_cmt_repo):
+        from hangar.records.parsing import commit_ref_db_key_from_raw_key
+
+        repo = written_two_cmt_repo
+        cmts = repo.log(return_contents=True)['order']
+        repo.checkout(commit=cmts[0]).close()
+
+        # swap the refs of the two commits
+        firstKey, secondKey = map(commit_ref_db_key_from_raw_key, cmts)
+        with repo._env.refenv.begin(write=True) as txn:
+            firstVal, secondVal = txn.get(firstKey), txn.get(secondKey)
+            txn.put(firstKey, secondVal)
+            txn.put(secondKey, firstVal)
+        repo = _reopen(repo)
+        # already verified and unpacked
+        repo.checkout(commit=cmts[0]).close()
+        with pytest.raises(IOError):
+            repo.checkout(commit=cmts[1])
+        assert os.listdir(_commit_cache_dir(repo)) == [f'{cmts[0]}.lmdb']
+        repo._env._close_environments()
+
+    def test_nonexistent_commit_fails(self, written_repo):
+        repo = written_repo
+        with pytest.raises(ValueError):
+            repo.checkout(commit='a' * 40)
+        with pytest.raises(ValueError):
+            repo.checkout(commit='../../foo')
+        assert not os.path.isdir(_commit_cache_dir(repo))
+
+    def test_least_recently_used_commits_evicted(self, written_two_cmt_repo):
+        from hangar.records.commit_cache import CommitCache
+
+        repo = written_two_cmt_repo
+        cmts = repo.log(return_contents=True)['order']
+        firstPth = os.path.join(_commit_cache_dir(repo), f'{cmts[1]}.lmdb')
+        secondPth = os.path.join(_commit_cache_dir(repo), f'{cmts[0]}.lmdb')
+        repo.checkout(commit=cmts[1]).close()
+        assert os.path.isfile(firstPth)
+        os.utime(firstPth, (0, 0))  # ensure the first commit is least recently used
+
+        env = CommitCache(repo._repo_path, repo._env.refenv, max_nbytes=1).open(cmts[0])
+        env.close()
+        assert os.path.isfile(secondPth)
+        assert not os.path.isfile(firstPth)
+
+    def test_unreadable_environment_rebuilt(self, written_two_cmt_repo):
+        repo = written_two_cmt_repo
+        cmt = repo.log(return_contents=True)['head']
+        os.makedirs(_commit_cache_dir(repo))
+        with open(os.path.join(_commit_cache_dir(repo), f'{cmt}.lmdb'), 'wb') as f:
+            f.write(b'not an lmdb file')
+
+        co = repo.checkout(commit=cmt)
+        assert len(co.arraysets['writtenaset']) == 10
+        co.close()
@@ -0,0 +1,220 @@
+import pytest
+import numpy as np
+
+
+def _stored_ref_kind(repo, commit_hash):
+    from hangar.records.parsing import commit_ref_db_key_from_raw_key
+    from hangar.records.parsing import commit_ref_delta_db_key_from_raw_key
+
+    with repo._env.refenv.begin() as txn:
+        isFull = txn.get(commit_ref_db_key_from_raw_key(commit_hash)) is not None
+        isDelta = txn.get(commit_ref_delta_db_key_from_raw_key(commit_hash)) is not None
+    assert isFull != isDelta
+    return 'full' if isFull else 'delta'
+
+
+def test_delta_encode_decode_roundtrip():
+    from hangar.records.parsing import commit_ref_delta_db_val_from_raw_val
+    from hangar.records.parsing import commit_ref_delta_raw_val_from_db_val
+
+    db_kvs = ((b'a:aset:0', b'foo'), (b'a:aset:1', b'bar'))
+    removed = (b'a:aset:2', b'a:aset:3')
+    db_val = commit_ref_delta_db_val_from_raw_val('abc', 3, db_kvs, removed)
+    delta = commit_ref_delta_raw_val_from_db_val(db_val)
+    assert delta == ('abc', 3, db_kvs, removed)
+    assert commit_ref_delta_raw_val_from_db_val(
+        commit_ref_delta_db_val_from_raw_val('abc', 1, (), ())) == ('abc', 1, (), ())
+
+
+def test_diff_of_sorted_record_streams():
+    from hangar.records.commiting import _diff_commit_ref_records
+
+    parent = ((b'a', b'1'), (b'b', b'2'), (b'd', b'4'), (b'f', b'6'))
+    records = ((b'0', b'0'), (b'b', b'2'), (b'c', b'3'), (b'd', b'x'), (b'g', b'7'))
+    changed, removed = _diff_commit_ref_records(iter(parent), records, 10)
+    assert changed == ((b'0', b'0'), (b'c', b'3'), (b'd', b'x'), (b'g', b'7'))
+    assert removed == (b'a', b'f')
+    assert _diff_commit_ref_records(iter(parent), records, 5) is None
+    assert _diff_commit_ref_records(iter(parent), parent, 0) == ((), ())
+    assert _diff_commit_ref_records(iter(()), parent, 4) == (parent, ())
+    assert _diff_commit_ref_records(iter(parent), (), 4) == ((), tuple(k for k, _ in parent))
+
+    consumed = []
+    stream = (consumed.append(kv) or kv for kv in parent)
+    assert _diff_commit_ref_records(stream, (), 1) is None
+    assert len(consumed) == 2
+
+
+@pytest.fixture()
+def many_commit_repo(repo, monkeypatch):
+    from hangar.records import commiting
+    monkeypatch.setattr(commiting, 'COMMIT_REF_CHECKPOINT_INTERVAL', 3)
+
+    expected, commits = {}, []
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', shape=(2,), dtype=np.int64)
+    for i in range(20):
+        aset[i] = np.array([i, 0])
+        expected[i] = np.array([i, 0])
+    commits.append((co.commit('first'), dict(expected)))
+    for cIdx in range(1, 7):
+        aset[cIdx] = np.array([cIdx, cIdx])
+        expected[cIdx] = np.array([cIdx, cIdx])
+        del aset[cIdx + 10]
+        del expected[cIdx + 10]
+        aset[cIdx + 100] = np.array([cIdx, 100])
+        expected[cIdx + 100] = np.array([cIdx, 100])
+        commits.append((co.commit(f'commit {cIdx}'), dict(expected)))
+    co.close()
+    yield repo, commits
+
+
+def test_commits_store_deltas_between_checkpoints(many_commit_repo):
+    repo, commits = many_commit_repo
+    kinds = [_stored_ref_kind(repo, cmt) for cmt, _ in commits]
+    assert kinds == ['full', 'delta', 'delta', 'full', 'delta', 'delta', 'full']
+
+
+def test_checkout_replays_deltas_from_checkpoint(many_commit_repo):
+    repo, commits = many_commit_repo
+    for cmt, expected in commits:
+        co = repo.checkout(commit=cmt)
+        aset = co.arraysets['aset']
+        assert set(aset.keys()) == set(expected.keys())
+        for k, v in expected.items():
+            assert np.array_equal(aset[k], v)
+        co.close()
+
+    co = repo.checkout(write=True)
+    assert set(co.arraysets['aset'].keys()) == set(commits[-1][1].keys())
+    co.close()
+
+
+@pytest.mark.parametrize('chunked', [False, True])
+def test_full_ref_db_val_of_delta_commit_matches_records(many_commit_repo, chunked):
+    from hangar.constants import CMT_REF_CHUNKED_PREFIX
+    from hangar.records.commiting import get_commit_ref, get_commit_ref_db_val
+    from hangar.records.parsing import commit_ref_raw_val_from_db_val
+
+    repo, commits = many_commit_repo
+    for cmt, _ in commits:
+        refVal = get_commit_ref_db_val(repo._env.refenv, cmt, chunked=chunked)
+        assert refVal.startswith(CMT_REF_CHUNKED_PREFIX) is chunked
+        refs = commit_ref_raw_val_from_db_val(refVal)
+        assert refs.db_kvs == get_commit_ref(repo._env.refenv, cmt)
+    assert get_commit_ref_db_val(repo._env.refenv, 'a' * 40, chunked=chunked) is False
+
+
+def test_commit_ref_streams_staged_records(repo, monkeypatch):
+    from hangar.records import commiting
+
+    diffCalls = []
+
+    def spy_diff(parentRecords, records, max_changes):
+        diffCalls.append((records, max_changes))
+        return _diff_commit_ref_records(parentRecords, records, max_changes)
+
+    _diff_commit_ref_records = commiting._diff_commit_ref_records
+    monkeypatch.setattr(commiting, '_diff_commit_ref_records', spy_diff)
+
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', shape=(2,), dtype=np.int64)
+    for i in range(10):
+        aset[i] = np.array([i, 0])
+    co.commit('first')
+    aset[0] = np.array([1, 1])
+    second = co.commit('second')
+    co.close()
+
+    assert _stored_ref_kind(repo, second) == 'delta'
+    assert len(diffCalls) == 1
+    records, max_changes = diffCalls[0]
+    assert not isinstance(records, (tuple, list))
+    assert max_changes == 11 // 2
+
+
+def test_large_change_stores_checkpoint(repo):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', shape=(2,), dtype=np.int64)
+    for i in range(10):
+        aset[i] = np.array([i, 0])
+    first = co.commit('first')
+    aset[0] = np.array([1, 1])
+    second = co.commit('second')
+    for i in range(10):
+        aset[i] = np.array([i, 2])
+    third = co.commit('third')
+    co.close()
+    assert _stored_ref_kind(repo, first) == 'full'
+    assert _stored_ref_kind(repo, second) == 'delta'
+    assert _stored_ref_kind(repo, third) == 'full'
+
+
+def test_verify_corruption_in_commit_ref_delta_alerts(many_commit_repo):
+    from hangar.records.parsing import commit_ref_delta_db_key_from_raw_key
+    from hangar.records.parsing import commit_ref_delta_raw_val_from_db_val
+    from hangar.records.parsing import commit_ref_delta_db_val_from_raw_val
+
+    repo, commits = many_commit_repo
+    cmt = commits[1][0]
+    deltaKey = commit_ref_delta_db_key_from_raw_key(cmt)
+    with repo._env.refenv.begin(write=True) as txn:
+        delta = commit_ref_delta_raw_val_from_db_val(txn.get(deltaKey))
+        modified_kvs = ((delta.db_kvs[0][0], b'corrupt!'), *delta.db_kvs[1:])
+        modifiedVal = commit_ref_delta_db_val_from_raw_val(
+            delta.parent, delta.depth, modified_kvs, delta.removed)
+        txn.put(deltaKey, modifiedVal, overwrite=True)
+
+    with pytest.raises(IOError):
+        _ = repo.checkout(commit=cmt)
+    # the delta of the next commit is replayed on top of the corrupt one
+    with pytest.raises(IOError):
+        _ = repo.checkout(commit=commits[2][0])
+    # checkpoints are unaffected
+    co = repo.checkout(commit=commits[3][0])
+    co.close()
+
+
+def test_new_repo_records_commit_ref_format(repo):
+    from hangar import __version__
+    from hangar.constants import CMT_REF_FORMAT
+    from hangar.records.parsing import VersionSpec, repo_version_raw_spec_from_raw_string
+    from hangar.records.vcompat import get_repository_commit_ref_format
+    from hangar.records.vcompat import is_repo_software_version_compatible
+
+    assert get_repository_commit_ref_format(repo._env.branchenv) == CMT_REF_FORMAT
+    # the format is not tied to the software version; 0.4 repos still open
+    curr = repo_version_raw_spec_from_raw_string(__version__)
+    assert is_repo_software_version_compatible(VersionSpec(major=0, minor=4, micro=0), curr)
+
+
+def test_repo_without_commit_ref_format_writes_single_buffer_refs(repo):
+    from hangar.constants import CMT_REF_CHUNKED_PREFIX
+    from hangar.records.commiting import get_commit_ref
+    from hangar.records.parsing import commit_ref_db_key_from_raw_key
+    from hangar.records.parsing import repo_commit_ref_format_db_key
+    from hangar.records.vcompat import get_repository_commit_ref_format
+
+    # as if the repository was initialized by an earlier release
+    with repo._env.branchenv.begin(write=True) as txn:
+        assert txn.delete(repo_commit_ref_format_db_key())
+    assert get_repository_commit_ref_format(repo._env.branchenv) == 0
+
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', shape=(2,), dtype=np.int64)
+    commits = []
+    for i in range(4):
+        aset[i] = np.array([i, 0])
+        commits.append(co.commit(f'commit {i}'))
+    co.close()
+
+    for cIdx, cmt in enumerate(commits):
+        assert _stored_ref_kind(repo, cmt) == 'full'
+        with repo._env.refenv.begin() as txn:
+            refVal = txn.get(commit_ref_db_key_from_raw_key(cmt))
+        assert not refVal.startswith(CMT_REF_CHUNKED_PREFIX)
+        assert len(get_commit_ref(repo._env.refenv, cmt)) == cIdx + 2
+
+        co = repo.checkout(commit=cmt)
+        assert len(co.arraysets['aset']) == cIdx + 1
+        co.close()
@@ -87,4 +87,94 @@ def test_verify_corruption_in_spec_val_alerts(written_two_cmt_repo):
     with pytest.raises(IOError):
         _ = repo.checkout(write=False)
     with pytest.raises(IOError):
-        _ = repo.checkout(write=False, commit=head_commit)
\ No newline at end of file
+        _ = repo.checkout(write=False, commit=head_commit)
+
+
+def test_commit_refs_compressed_in_chunks_stream_in_order():
+    from hangar.records.parsing import commit_ref_db_val_from_raw_val
+    from hangar.records.parsing import commit_ref_raw_val_from_db_val
+    from hangar.records.parsing import commit_ref_digest_from_raw_val
+    from hangar.records.parsing import iter_commit_ref_db_kvs
+    from hangar.records.parsing import iter_commit_ref_joined_chunks
+
+    db_kvs = tuple((f'a:aset:{i:04}'.encode(), f'{i}'.encode()) for i in range(500))
+    refVal = commit_ref_db_val_from_raw_val(db_kvs, chunk_nbytes=100)
+    assert len(list(iter_commit_ref_joined_chunks(refVal.raw))) > 1
+    assert tuple(iter_commit_ref_db_kvs(refVal.raw)) == db_kvs
+    assert tuple(iter_commit_ref_db_kvs(bytearray(refVal.raw))) == db_kvs
+    assert refVal.digest == commit_ref_digest_from_raw_val(db_kvs)
+    assert commit_ref_raw_val_from_db_val(refVal.raw).db_kvs == db_kvs
+
+    empty = commit_ref_db_val_from_raw_val(())
+    assert commit_ref_raw_val_from_db_val(empty.raw).db_kvs == ()
+
+
+def test_commit_refs_stored_in_single_buffer_still_read(written_two_cmt_repo):
+    import blosc
+    from hangar import constants as c
+    from hangar.records.commiting import get_commit_ref
+    from hangar.records.parsing import commit_ref_db_key_from_raw_key
+
+    repo = written_two_cmt_repo
+    cmts = repo.log(return_contents=True)['order']
+    expected = {cmt: get_commit_ref(repo._env.refenv, cmt) for cmt in cmts}
+    with repo._env.refenv.begin(write=True) as txn:
+        for cmt in cmts:
+            refKey = commit_ref_db_key_from_raw_key(cmt)
+            if txn.get(refKey) is None:
+                continue
+            pck = c.CMT_REC_JOIN_KEY.join(map(c.CMT_KV_JOIN_KEY.join, expected[cmt]))
+            txn.put(refKey, blosc.compress(pck, typesize=1, clevel=9, shuffle=blosc.SHUFFLE, cname='zlib'))
+
+    for cmt in cmts:
+        assert get_commit_ref(repo._env.refenv, cmt) == expected[cmt]
+    co = repo.checkout(write=False, commit=cmts[0])
+    assert len(co.arraysets['writtenaset']) == 10
+    co.close()
+
+
+def test_commit_refs_sent_to_remotes_in_single_buffer(written_two_cmt_repo):
+    import blosc
+    from hangar import constants as c
+    from hangar.records.commiting import get_commit_ref, get_commit_ref_db_val
+    from hangar.records.parsing import commit_ref_db_val_from_raw_val
+    from hangar.records.parsing import commit_ref_single_buffer_db_val_from_db_val
+
+    repo = written_two_cmt_repo
+    for cmt in repo.log(return_contents=True)['order']:
+        db_kvs = get_commit_ref(repo._env.refenv, cmt)
+        refVal = get_commit_ref_db_val(repo._env.refenv, cmt)
+        assert not refVal.startswith(c.CMT_REF_CHUNKED_PREFIX)
+        assert blosc.decompress(refVal) == c.CMT_REC_JOIN_KEY.join(map(c.CMT_KV_JOIN_KEY.join, db_kvs))
+
+    db_kvs = tuple((f'a:aset:{i:04}'.encode(), f'{i}'.encode()) for i in range(500))
+    chunked = commit_ref_db_val_from_raw_val(db_kvs, chunk_nbytes=100).raw
+    single = commit_ref_single_buffer_db_val_from_db_val(chunked)
+    assert blosc.decompress(single) == c.CMT_REC_JOIN_KEY.join(map(c.CMT_KV_JOIN_KEY.join, db_kvs))
+    assert commit_ref_single_buffer_db_val_from_db_val(single) == single
+
+
+def test_records_of_corrupt_commit_not_left_in_unpacked_env(written_two_cmt_repo, managed_tmpdir):
+    import os
+    import lmdb
+    from hangar import constants as c
+    from hangar.records.commiting import unpack_commit_ref
+    from hangar.records.parsing import commit_ref_db_key_from_raw_key
+    from hangar.records.parsing import commit_ref_db_val_from_raw_val
+    from hangar.records.parsing import commit_ref_raw_val_from_db_val
+
+    repo = written_two_cmt_repo
+    head_commit = repo.log(return_contents=True)['head']
+    refKey = commit_ref_db_key_from_raw_key(head_commit)
+    with repo._env.refenv.begin(write=True) as txn:
+        db_kvs = commit_ref_raw_val_from_db_val(txn.get(refKey)).db_kvs
+        txn.put(refKey, commit_ref_db_val_from_raw_val(db_kvs[:-1]).raw)
+
+    env = lmdb.open(path=os.path.join(managed_tmpdir, 'unpacked.lmdb'), **c.LMDB_SETTINGS)
+    try:
+        with pytest.raises(IOError):
+            unpack_commit_ref(repo._env.refenv, env, head_commit)
+        with env.begin() as txn:
+            assert txn.stat()['entries'] == 0
+    finally:
+        env.close()
@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+
+from hangar.backends.handle_pool import FileHandlePool, HANDLE_POOL
+
+
+class FakeAccessor(object):
+
+    def __init__(self):
+        self.evicted = []
+
+    def evict_handle(self, uid):
+        self.evicted.append(uid)
+
+
+class TestFileHandlePool(object):
+
+    def test_invalid_configuration_fails(self):
+        with pytest.raises(ValueError):
+            FileHandlePool(0)
+        with pytest.raises(ValueError):
+            FileHandlePool(2, chunk_cache_nbytes=-1)
+        pool = FileHandlePool(2)
+        with pytest.raises(ValueError):
+            pool.configure(max_open=1.5)
+        assert pool.max_open == 2
+
+    def test_least_recently_used_handle_evicted(self):
+        pool = FileHandlePool(2)
+        a, b = FakeAccessor(), FakeAccessor()
+        pool.acquire(a, 'x')
+        pool.acquire(b, 'y')
+        pool.acquire(a, 'x')
+        pool.acquire(b, 'z')
+        assert len(pool) == 2
+        assert b.evicted == ['y']
+        assert a.evicted == []
+        pool.configure(max_open=1)
+        assert a.evicted == ['x']
+        assert len(pool) == 1
+
+    def test_released_and_collected_owners_forgotten(self):
+        pool = FileHandlePool(4)
+        a, b = FakeAccessor(), FakeAccessor()
+        pool.acquire(a, 'x')
+        pool.acquire(a, 'y')
+        pool.acquire(b, 'x')
+        pool.release(a)
+        assert len(pool) == 1
+        del b
+        assert len(pool) == 0
+
+    def test_chunk_cache_budget_shared_by_handles(self):
+        pool = FileHandlePool(4, chunk_cache_nbytes=4_000_000)
+        assert pool.chunk_cache_nbytes == 1_000_000
+        pool.configure(max_open=8)
+        assert pool.chunk_cache_nbytes == 500_000
+
+
+@pytest.fixture()
+def small_handle_pool():
+    max_open = HANDLE_POOL.max_open
+    HANDLE_POOL.configure(max_open=2)
+    yield HANDLE_POOL
+    HANDLE_POOL.configure(max_open=max_open)
+
+
+@pytest.mark.parametrize('backend,collection_size', [('00', 'TARGET_COLLECTION_NBYTES'),
+                                                     ('10', 'TARGET_FILE_NBYTES')])
+def test_reads_reopen_evicted_files(repo, monkeypatch, small_handle_pool, backend, collection_size):
+    from hangar.backends import hdf5_00, numpy_10
+    module = hdf5_00 if backend == '00' else numpy_10
+    monkeypatch.setattr(module, collection_size, 140)  # 1 sample per collection
+    if backend == '00':
+        monkeypatch.setattr(hdf5_00, 'TARGET_FILE_NBYTES', 140)  # 1 collection per file
+
+    wco = repo.checkout(write=True)
+    aset = wco.arraysets.init_arrayset('aset', shape=(5, 7), dtype=np.float32,
+                                       backend_opts=backend)
+    for i in range(6):
+        aset[i] = np.full((5, 7), i, dtype=np.float32)
+    wco.commit('hello')
+    wco.close()
+    monkeypatch.undo()
+
+    rco = repo.checkout()
+    naset = rco.arraysets['aset']
+    accessor = naset._fs[backend]
+    assert len(set(naset._sspecs[i].uid for i in range(6))) == 6
+    for _ in range(2):
+        for i in range(6):
+            assert np.allclose(naset[i], i)
+            opened = [uid for uid, fh in accessor.rFp.items() if not callable(fh)]
+            assert len(opened) <= 2
+    assert np.allclose(naset.get_batch(list(range(6)), n_cpus=1),
+                       [np.full((5, 7), i) for i in range(6)])
+    rco.close()
+    assert len(small_handle_pool) == 0
@@ -0,0 +1,56 @@
+import hashlib
+import struct
+
+import pytest
+import numpy as np
+from xxhash import xxh64_hexdigest
+
+from hangar.hashing import HashingEngine, data_hash_digest
+
+
+def _expected_digest(arr):
+    hasher = hashlib.blake2b(arr, digest_size=20)
+    hasher.update(struct.pack(f'<{len(arr.shape)}QB', *arr.shape, arr.dtype.num))
+    return hasher.hexdigest()
+
+
+class TestHashingEngine(object):
+
+    @pytest.mark.parametrize('max_workers', [0, 1, 4])
+    @pytest.mark.parametrize('nbytes', [80, 800_000])
+    def test_hashes_match_serial_computation(self, max_workers, nbytes):
+        engine = HashingEngine(max_workers=max_workers)
+        arrs = [np.random.random(nbytes // 8) for _ in range(6)]
+        assert engine.digests(arrs) == [_expected_digest(arr) for arr in arrs]
+        assert [fut.result() for fut in engine.checksums(arrs)] == [xxh64_hexdigest(a) for a in arrs]
+        digest, checksum = engine.hash(arrs[0])
+        assert digest == data_hash_digest(arrs[0]) == _expected_digest(arrs[0])
+        assert checksum == xxh64_hexdigest(arrs[0])
+        engine.close()
+
+    def test_stats_count_samples_and_time(self):
+        engine = HashingEngine(max_workers=2, min_threaded_nbytes=0)
+        arrs = [np.zeros((100, 100)) + i for i in range(5)]
+        engine.digests(arrs)
+        engine.hash(arrs[0])
+        stats = engine.stats
+        assert stats.samples == 6
+        assert stats.seconds > 0
+        assert stats.seconds_per_sample == pytest.approx(stats.seconds / 6)
+        engine.reset_stats()
+        assert engine.stats == (0, 0.0, 0.0)
+        engine.close()
+        # threads are restarted on use after close
+        assert engine.digests(arrs[:1]) == [_expected_digest(arrs[0])]
+        engine.close()
+
+
+def test_writer_checkout_reports_hashing_stats(repo, array5by7):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    assert co.hashing_stats.samples == 0
+    aset['a'] = array5by7
+    aset.add_batch([array5by7 + 1, array5by7 + 2], ['b', 'c'])
+    assert co.hashing_stats.samples == 3
+    assert co.hashing_stats.seconds_per_sample > 0
+    co.close()
@@ -0,0 +1,179 @@
+import os
+import shutil
+
+import lmdb
+import pytest
+import numpy as np
+
+
+DB_KVS = (
+    (b'a:aset:0', b'spec0'),
+    (b'a:aset:1', b'spec1'),
+    (b'a:aset:10', b''),
+    (b'a:other:x', b'spec with spaces'),
+    (b'l:meta', b'value'),
+    (b's:aset', b'schema'),
+)
+
+
+@pytest.fixture()
+def view_and_env(managed_tmpdir):
+    from hangar.records.record_view import RecordView
+    from hangar.constants import LMDB_SETTINGS
+
+    env = lmdb.open(path=os.path.join(managed_tmpdir, 'records.lmdb'), **LMDB_SETTINGS)
+    with env.begin(write=True) as txn:
+        for k, v in DB_KVS:
+            txn.put(k, v)
+    yield RecordView.from_db_kvs(DB_KVS, name='records'), env
+    env.close()
+
+
+@pytest.mark.parametrize('key', [k for k, _ in DB_KVS] + [b'a:', b'a:aset:2', b'zzz'])
+def test_lookups_match_lmdb(view_and_env, key):
+    view, env = view_and_env
+    with view.begin() as vtxn, env.begin() as etxn:
+        assert vtxn.get(key, default=False) == etxn.get(key, default=False)
+        with vtxn.cursor() as vcur, etxn.cursor() as ecur:
+            assert vcur.set_key(key) == ecur.set_key(key)
+            assert vcur.item() == ecur.item()
+            assert vcur.set_range(key) == ecur.set_range(key)
+            assert list(vcur.iternext()) == list(ecur.iternext())
+
+
+def test_iteration_matches_lmdb(view_and_env):
+    view, env = view_and_env
+    with view.begin() as vtxn, env.begin() as etxn:
+        assert vtxn.stat()['entries'] == etxn.stat()['entries']
+        with vtxn.cursor() as vcur, etxn.cursor() as ecur:
+            assert list(vcur.iternext(keys=True, values=False)) == list(ecur.iternext(keys=True, values=False))
+            assert vcur.first() and ecur.first()
+            assert list(vcur.iternext(keys=False, values=True)) == list(ecur.iternext(keys=False, values=True))
+            assert vcur.next() is ecur.next() is False
+            assert vcur.key() == ecur.key() == b''
+    assert [bytes(r) for r in view.joined_records()] == [b' '.join(kv) for kv in DB_KVS]
+
+
+def test_empty_view():
+    from hangar.records.record_view import RecordView
+
+    view = RecordView(b'')
+    assert len(view) == 0
+    with view.begin() as txn:
+        assert txn.get(b'a:aset:0') is None
+        with txn.cursor() as cur:
+            assert cur.first() is False
+            assert cur.set_range(b'') is False
+            assert list(cur.iternext()) == []
+
+
+def test_view_is_read_only():
+    from hangar.records.record_view import RecordView
+
+    with pytest.raises(PermissionError):
+        RecordView.from_db_kvs(DB_KVS).begin(write=True)
+    with pytest.raises(ValueError):
+        RecordView(b'a:aset:0 spec0$a:aset:1')
+
+
+def test_record_query_matches_unpacked_environment(written_two_cmt_repo):
+    from hangar.records import commiting
+    from hangar.records.queries import RecordQuery
+
+    repo = written_two_cmt_repo
+    cmt = repo.log(return_contents=True)['head']
+    view = commiting.get_commit_ref_view(repo._env.refenv, cmt)
+    env = repo._env.checkout_commit(commit=cmt) and repo._env.cmtenv[cmt]
+    assert not isinstance(env, type(view))
+    viewQuery, envQuery = RecordQuery(view), RecordQuery(env)
+    assert viewQuery.arrayset_names() == envQuery.arrayset_names()
+    assert viewQuery.schema_specs() == envQuery.schema_specs()
+    assert viewQuery.metadata_names() == envQuery.metadata_names()
+    assert list(viewQuery.arrayset_data_records('writtenaset')) == \
+        list(envQuery.arrayset_data_records('writtenaset'))
+
+
+def _repo_files(repo):
+    res = {}
+    for root, _, fnames in os.walk(repo._repo_path):
+        for fname in fnames:
+            pth = os.path.join(root, fname)
+            res[pth] = os.stat(pth).st_mtime_ns
+    return res
+
+
+def test_in_memory_checkout_writes_nothing_to_disk(written_two_cmt_repo):
+    repo = written_two_cmt_repo
+    cmts = repo.log(return_contents=True)['order']
+    expected = {}
+    for cmt in cmts:
+        co = repo.checkout(commit=cmt)
+        expected[cmt] = {k: v for k, v in co.arraysets['writtenaset'].items()}
+        co.close()
+    repo._env._close_environments()
+    from hangar import Repository
+    repo = Repository(path=os.path.dirname(repo._repo_path), exists=True)
+    cacheDir = os.path.join(repo._repo_path, 'commit_cache')
+    for fname in os.listdir(cacheDir):
+        os.remove(os.path.join(cacheDir, fname))
+    shutil.rmtree(os.path.join(repo._repo_path, 'spec_index'), ignore_errors=True)
+    before = _repo_files(repo)
+
+    for cmt in cmts:
+        co = repo.checkout(commit=cmt, in_memory=True)
+        aset = co.arraysets['writtenaset']
+        assert set(aset.keys()) == set(expected[cmt].keys())
+        for k, v in expected[cmt].items():
+            assert np.allclose(aset[k], v)
+        co.close()
+    assert _repo_files(repo) == before
+    repo._env._close_environments()
+
+
+def test_in_memory_view_of_delta_commit(repo, array5by7):
+    from hangar.records import commiting
+    from hangar.records.parsing import commit_ref_db_key_from_raw_key
+
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset.add_batch([array5by7 + i for i in range(10)], names=list(range(10)))
+    co.commit('first')
+    aset[10] = array5by7 + 10
+    del aset[0]
+    cmt = co.commit('second')
+    co.close()
+
+    with repo._env.refenv.begin() as txn:
+        assert txn.get(commit_ref_db_key_from_raw_key(cmt)) is None
+    view = commiting.get_commit_ref_view(repo._env.refenv, cmt)
+    with view.begin() as txn:
+        assert tuple(txn.cursor().iternext()) == commiting.get_commit_ref(repo._env.refenv, cmt)
+
+    co = repo.checkout(commit=cmt, in_memory=True)
+    assert sorted(co.arraysets['aset'].keys()) == list(range(1, 11))
+    assert np.allclose(co.arraysets['aset'][10], array5by7 + 10)
+    co.close()
+
+
+def test_in_memory_view_verifies_commit(written_two_cmt_repo):
+    from hangar.records import commiting
+    from hangar.records.parsing import commit_ref_db_key_from_raw_key
+
+    repo = written_two_cmt_repo
+    cmts = repo.log(return_contents=True)['order']
+    firstKey, secondKey = map(commit_ref_db_key_from_raw_key, cmts)
+    with repo._env.refenv.begin(write=True) as txn:
+        firstVal, secondVal = txn.get(firstKey), txn.get(secondKey)
+        txn.put(firstKey, secondVal)
+        txn.put(secondKey, firstVal)
+    with pytest.raises(IOError):
+        commiting.get_commit_ref_view(repo._env.refenv, cmts[0])
+    with pytest.raises(IOError):
+        repo.checkout(commit=cmts[1], in_memory=True)
+    with pytest.raises(ValueError):
+        commiting.get_commit_ref_view(repo._env.refenv, 'a' * 40)
+
+
+def test_in_memory_not_allowed_for_write_checkout(written_repo):
+    with pytest.raises(ValueError):
+        written_repo.checkout(write=True, in_memory=True)
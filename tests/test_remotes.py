@@ -564,6 +564,131 @@ def test_push_clone_three_way_merge(server_instance, repo_2_br_no_conf, managed_
     newRepo._env._close_environments()
 
 
+def _sorted_refs_commit_digest(parentVal, specVal, refVal):
+    """commit hash as verified by earlier releases, from the refs sent to a remote."""
+    from hashlib import blake2b
+    import blosc
+
+    def _hash(val):
+        return blake2b(val, digest_size=20).hexdigest()
+
+    joined = blosc.decompress(refVal)
+    recordDigests = sorted(map(_hash, joined.split(b'$'))) if joined else []
+    refsDigest = _hash(''.join(recordDigests).encode())
+    specDigest = _hash(blosc.decompress(specVal))
+    return _hash(''.join(sorted([_hash(parentVal), specDigest, refsDigest])).encode())
+
+
+@pytest.fixture()
+def server_and_env_instance(managed_tmpdir, worker_id):
+    from hangar.remote.server import serve
+
+    address = f'localhost:{randint(50000, 59999)}'
+    base_tmpdir = pjoin(managed_tmpdir, f'{worker_id[-1]}')
+    mkdir(base_tmpdir)
+    server, hangserver, _ = serve(base_tmpdir, overwrite=True, channel_address=address)
+    server.start()
+    yield address, hangserver.env
+
+    hangserver.env._close_environments()
+    server.stop(0.1)
+    time.sleep(0.2)
+
+
+@pytest.fixture()
+def four_cmt_repo(repo, array5by7):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    for cIdx in range(4):
+        aset[cIdx] = array5by7 + cIdx
+        co.metadata[f'meta{cIdx}'] = f'{cIdx}'
+        co.commit(f'commit {cIdx}')
+    co.close()
+    yield repo
+
+
+def _remove_commit_ref_format(branchenv):
+    """as if the repository was initialized by an earlier release."""
+    from hangar.records.parsing import repo_commit_ref_format_db_key
+    with branchenv.begin(write=True) as txn:
+        assert txn.delete(repo_commit_ref_format_db_key())
+
+
+def _stored_commit_refs(env, commits):
+    from hangar.records import parsing
+
+    res = {}
+    with env.refenv.begin() as txn:
+        for cmt in commits:
+            parentVal = txn.get(parsing.commit_parent_db_key_from_raw_key(cmt))
+            specVal = txn.get(parsing.commit_spec_db_key_from_raw_key(cmt))
+            refVal = txn.get(parsing.commit_ref_db_key_from_raw_key(cmt))
+            res[cmt] = (parentVal, specVal, refVal)
+    return res
+
+
+def test_pushed_commits_verify_with_sorted_refs_digest(server_and_env_instance, four_cmt_repo):
+    address, serverEnv = server_and_env_instance
+    _remove_commit_ref_format(serverEnv.branchenv)
+
+    repo = four_cmt_repo
+    commits = repo.log(return_contents=True)['order']
+    repo.remote.add('origin', address)
+    assert repo.remote.push('origin', 'master') == 'master'
+    for cmt, (parentVal, specVal, refVal) in _stored_commit_refs(serverEnv, commits).items():
+        assert _sorted_refs_commit_digest(parentVal, specVal, refVal) == cmt
+
+
+def test_push_and_clone_send_chunked_refs_when_supported(
+        server_and_env_instance, four_cmt_repo, managed_tmpdir):
+    from hangar import Repository
+    from hangar.constants import CMT_REF_CHUNKED_PREFIX
+    from hangar.records.commiting import get_commit_ref
+
+    address, serverEnv = server_and_env_instance
+    repo = four_cmt_repo
+    commits = repo.log(return_contents=True)['order']
+    repo.remote.add('origin', address)
+    assert repo.remote.push('origin', 'master') == 'master'
+    for cmt, (_, _, refVal) in _stored_commit_refs(serverEnv, commits).items():
+        assert bytes(refVal).startswith(CMT_REF_CHUNKED_PREFIX)
+        assert get_commit_ref(serverEnv.refenv, cmt) == get_commit_ref(repo._env.refenv, cmt)
+
+    new_tmpdir = pjoin(managed_tmpdir, 'new')
+    mkdir(new_tmpdir)
+    newRepo = Repository(path=new_tmpdir, exists=False)
+    newRepo.clone('Test User', 'tester@foo.com', address, remove_old=True)
+    for cmt, (_, _, refVal) in _stored_commit_refs(newRepo._env, commits).items():
+        assert bytes(refVal).startswith(CMT_REF_CHUNKED_PREFIX)
+        assert get_commit_ref(newRepo._env.refenv, cmt) == get_commit_ref(repo._env.refenv, cmt)
+    newRepo._env._close_environments()
+
+
+def test_fetch_sends_single_buffer_refs_to_clients_without_chunked_refs(
+        server_and_env_instance, four_cmt_repo, managed_tmpdir):
+    from hangar import Repository
+    from hangar.constants import CMT_REF_CHUNKED_PREFIX
+    from hangar.records.commiting import get_commit_ref
+
+    address, serverEnv = server_and_env_instance
+    repo = four_cmt_repo
+    commits = repo.log(return_contents=True)['order']
+    repo.remote.add('origin', address)
+    assert repo.remote.push('origin', 'master') == 'master'
+
+    new_tmpdir = pjoin(managed_tmpdir, 'new')
+    mkdir(new_tmpdir)
+    newRepo = Repository(path=new_tmpdir, exists=False)
+    newRepo.init(user_name='Test User', user_email='tester@foo.com', remove_old=True)
+    _remove_commit_ref_format(newRepo._env.branchenv)
+    newRepo.remote.add('origin', address)
+    assert newRepo.remote.fetch('origin', 'master') == 'origin/master'
+    for cmt, (_, _, refVal) in _stored_commit_refs(newRepo._env, commits).items():
+        assert not bytes(refVal).startswith(CMT_REF_CHUNKED_PREFIX)
+        assert get_commit_ref(newRepo._env.refenv, cmt) == get_commit_ref(repo._env.refenv, cmt)
+    newRepo._env._close_environments()
+
+
 # ---------------------------- fixture func servers ---------------------------
 
 
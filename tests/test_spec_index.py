@@ -0,0 +1,104 @@
+import os
+
+import pytest
+import numpy as np
+
+from hangar.records.sample_specs import SampleSpecTable
+from hangar.records.spec_index import SpecIndex, spec_index_stamp
+
+
+def _spec_index_dir(repo):
+    return os.path.join(repo._repo_path, 'spec_index')
+
+
+class TestSpecIndex(object):
+
+    def test_reader_checkout_saves_then_memory_maps_index(self, repo_with_20_samples):
+        repo = repo_with_20_samples
+        cmt = repo.log(return_contents=True)['head']
+        assert not os.path.isdir(os.path.join(_spec_index_dir(repo), cmt))
+
+        co = repo.checkout()
+        built = {n: dict(aset._sspecs.items()) for n, aset in co.arraysets.items()}
+        assert not isinstance(co.arraysets['writtenaset']._sspecs._rows, np.memmap)
+        co.close()
+        assert os.path.isfile(os.path.join(_spec_index_dir(repo), cmt, 'writtenaset.json'))
+        assert os.path.isfile(os.path.join(_spec_index_dir(repo), cmt, 'second_aset.rows.npy'))
+
+        co = repo.checkout()
+        for asetn, aset in co.arraysets.items():
+            assert isinstance(aset._sspecs, SampleSpecTable)
+            assert isinstance(aset._sspecs._rows, np.memmap)
+            assert dict(aset._sspecs.items()) == built[asetn]
+        for i in range(20):
+            assert np.allclose(co.arraysets['writtenaset'][str(i)], i)
+            assert np.allclose(co.arraysets['second_aset'][str(i)], -i)
+        co.close()
+
+    def test_index_with_other_version_stamp_is_replaced(self, repo_with_20_samples):
+        repo = repo_with_20_samples
+        cmt = repo.log(return_contents=True)['head']
+        repo.checkout().close()
+        stampPth = os.path.join(_spec_index_dir(repo), cmt, 'VERSION')
+        with open(stampPth, 'w') as f:
+            f.write('0:00')
+
+        index = SpecIndex(repo._repo_path, cmt)
+        assert index.load('writtenaset') is None
+        co = repo.checkout()
+        assert not isinstance(co.arraysets['writtenaset']._sspecs._rows, np.memmap)
+        co.close()
+        with open(stampPth, 'r') as f:
+            assert f.read() == spec_index_stamp()
+        assert index.load('writtenaset') is not None
+
+    def test_least_recently_used_commits_evicted(self, written_two_cmt_repo):
+        repo = written_two_cmt_repo
+        cmts = list(repo.log(return_contents=True)['order'])
+        firstPth = os.path.join(_spec_index_dir(repo), cmts[1])
+        secondPth = os.path.join(_spec_index_dir(repo), cmts[0])
+        repo.checkout(commit=cmts[1]).close()
+        assert os.path.isdir(firstPth)
+        os.utime(firstPth, (0, 0))  # ensure the first commit is least recently used
+
+        index = SpecIndex(repo._repo_path, cmts[0], max_nbytes=1)
+        co = repo.checkout(commit=cmts[0])
+        assert index.save('writtenaset', co.arraysets['writtenaset']._sspecs) is True
+        co.close()
+        assert os.path.isdir(secondPth)
+        assert not os.path.isdir(firstPth)
+
+    def test_table_with_remote_references_not_saved(self, repo):
+        from hangar.backends.remote_50 import REMOTE_50_DataHashSpec
+        table = SampleSpecTable(['a'], [REMOTE_50_DataHashSpec('50', 'schemahash')], ['aa' * 20])
+        assert table.is_local is False
+        index = SpecIndex(repo._repo_path, 'a' * 40)
+        assert index.save('aset', table) is False
+        assert index.load('aset') is None
+
+
+class TestSampleSpecTableFiles(object):
+
+    @pytest.mark.parametrize('mmap', [True, False])
+    def test_save_load_roundtrip(self, tmp_path, mmap):
+        from hangar.backends.hdf5_00 import HDF5_00_DataHashSpec
+        from hangar.backends.numpy_10 import NUMPY_10_DataHashSpec
+        specs = {
+            'a': HDF5_00_DataHashSpec('00', 'uid0', '0123456789abcdef', '0', 4, (2, 3)),
+            'b': NUMPY_10_DataHashSpec('10', 'uid1', 'notahexchecksum', 1, (5,)),
+            3: NUMPY_10_DataHashSpec('10', 'uid1', 'f123456789abcdef', 0, ()),
+        }
+        digests = ['aa' * 20, 'bb' * 20, 'cc' * 20]
+        table = SampleSpecTable(list(specs.keys()), list(specs.values()), digests)
+        pth = str(tmp_path / 'table')
+        table.save(pth)
+        loaded = SampleSpecTable.load(pth, mmap=mmap)
+        assert isinstance(loaded._rows, np.memmap) is mmap
+        assert dict(loaded.items()) == specs
+        assert [type(v) for v in loaded.values()] == [type(v) for v in table.values()]
+        assert list(loaded.digests.values()) == list(table.digests.values())
+        assert loaded.backends == {'00', '10'}
+
+    def test_load_incomplete_table_fails(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            SampleSpecTable.load(str(tmp_path / 'missing'))
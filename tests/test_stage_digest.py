@@ -0,0 +1,196 @@
+import pytest
+import numpy as np
+
+
+def _assert_digest_matches_records(repo):
+    from hangar.records import stage_digest
+    from hangar.records.queries import RecordQuery
+    from hangar.records.parsing import commit_ref_digest_from_raw_val
+
+    stageenv = repo._env.stageenv
+    records = tuple(RecordQuery(stageenv)._traverse_all_records())
+    assert not any(stage_digest.is_digest_key(k) for k, _ in records)
+    expected = commit_ref_digest_from_raw_val(records)
+    assert stage_digest.staging_digest(stageenv) == expected
+
+    # the index is identical to one built from scratch
+    with stageenv.begin(write=True) as txn:
+        with txn.cursor() as cur:
+            stored = dict(cur.iternext()) if cur.first() else {}
+        stage_digest.reset(txn)
+        with txn.cursor() as cur:
+            rebuilt = dict(cur.iternext()) if cur.first() else {}
+    assert stored == rebuilt
+
+
+def test_commit_ref_digest_from_record_digests():
+    from hangar.records import parsing
+
+    db_kvs = [(b'a:aset:0', b'foo'), (b'a:aset:1', b'bar'), (b'l:meta', b'baz')]
+    digest = parsing.commit_ref_digest_from_raw_val(db_kvs)
+    recordDigests = [parsing.commit_ref_record_digest(k, v) for k, v in reversed(db_kvs)]
+    assert parsing.commit_ref_digest_from_record_digests(recordDigests) == digest
+    assert recordDigests == sorted(recordDigests)
+    assert digest != parsing.commit_ref_digest_from_raw_val(db_kvs[:2])
+    assert digest != parsing.commit_ref_digest_from_raw_val(
+        [(b'a:aset:0', b'bar'), (b'a:aset:1', b'foo'), (b'l:meta', b'baz')])
+
+
+def test_digest_maintained_as_records_are_written(repo, array5by7):
+    co = repo.checkout(write=True)
+    _assert_digest_matches_records(repo)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    _assert_digest_matches_records(repo)
+    aset[0] = array5by7
+    aset['foo'] = array5by7 + 1
+    aset[0] = array5by7 + 2
+    _assert_digest_matches_records(repo)
+    aset.add_batch([array5by7 + i for i in range(5)], names=list(range(1, 6)))
+    _assert_digest_matches_records(repo)
+    aset.add_batch([array5by7 + i for i in range(5)], names=list(range(3, 8)))
+    _assert_digest_matches_records(repo)
+    del aset['foo']
+    co.metadata['hello'] = 'world'
+    co.metadata['hello'] = 'there'
+    co.metadata['other'] = 'value'
+    _assert_digest_matches_records(repo)
+    del co.metadata['other']
+    _assert_digest_matches_records(repo)
+
+    aset2 = co.arraysets.init_arrayset('aset2', shape=(10,), dtype=np.float32, variable_shape=True)
+    aset2[0] = np.ones(3, dtype=np.float32)
+    aset2.change_backend('00')
+    _assert_digest_matches_records(repo)
+    for k in list(aset.keys()):
+        del aset[k]
+    _assert_digest_matches_records(repo)
+    co.arraysets.remove_aset('aset2')
+    _assert_digest_matches_records(repo)
+    co.close()
+
+
+def test_digest_maintained_on_reset_and_checkout(written_two_cmt_repo):
+    repo = written_two_cmt_repo
+    co = repo.checkout(write=True)
+    co.arraysets['writtenaset']['0'] = co.arraysets['writtenaset']['1'] + 1
+    co.metadata['foo'] = 'bar'
+    co.reset_staging_area()
+    _assert_digest_matches_records(repo)
+    co.close()
+
+    first_commit = repo.log(return_contents=True)['order'][-1]
+    repo.create_branch('first', base_commit=first_commit)
+    co = repo.checkout(write=True, branch='first')
+    _assert_digest_matches_records(repo)
+    assert co.diff.status() == 'CLEAN'
+    co.close()
+
+
+def test_digest_maintained_on_merge(repo, array5by7):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset[0] = array5by7
+    co.commit('first')
+    co.close()
+    repo.create_branch('testbranch')
+
+    co = repo.checkout(write=True, branch='testbranch')
+    co.arraysets['aset'][1] = array5by7 + 1
+    co.commit('on testbranch')
+    co.close()
+    co = repo.checkout(write=True, branch='master')
+    co.metadata['foo'] = 'bar'
+    co.commit('on master')
+    co.close()
+
+    repo.merge('merge commit', 'master', 'testbranch')
+    _assert_digest_matches_records(repo)
+    co = repo.checkout(write=True)
+    assert co.diff.status() == 'CLEAN'
+    assert sorted(co.arraysets['aset'].keys()) == [0, 1]
+    co.close()
+
+
+def _commit_digest(refenv, cmt, refs_digest):
+    from hangar.records import parsing
+
+    with refenv.begin() as txn:
+        parentVal = txn.get(parsing.commit_parent_db_key_from_raw_key(cmt))
+        specVal = txn.get(parsing.commit_spec_db_key_from_raw_key(cmt))
+    return parsing.cmt_final_digest(
+        parent_digest=parsing.commit_parent_raw_val_from_db_val(parentVal).digest,
+        spec_digest=parsing.commit_spec_raw_val_from_db_val(specVal).digest,
+        refs_digest=refs_digest)
+
+
+def test_commit_digest_uses_maintained_digest(repo, array5by7):
+    from hangar.records import stage_digest
+
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset[0] = array5by7
+    cmt = co.commit('first')
+    assert _commit_digest(repo._env.refenv, cmt, stage_digest.staging_digest(repo._env.stageenv)) == cmt
+    assert co.diff.status() == 'CLEAN'
+    aset[1] = array5by7
+    assert co.diff.status() == 'DIRTY'
+    del aset[1]
+    assert co.diff.status() == 'CLEAN'
+    co.close()
+
+
+def test_digest_rebuilt_when_missing(repo, array5by7):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset[0] = array5by7
+    # as if the staging area was written by a version of hangar without digests
+    with repo._env.stageenv.begin(write=True) as txn:
+        with txn.cursor() as cur:
+            cur.set_range(b'~:')
+            while cur.key().startswith(b'~:'):
+                cur.delete()
+    aset[1] = array5by7 + 1
+    _assert_digest_matches_records(repo)
+    co.commit('first')
+    co.close()
+
+    with repo._env.stageenv.begin(write=True) as txn:
+        txn.delete(b'~:#')
+    _assert_digest_matches_records(repo)
+    co = repo.checkout(write=True)
+    assert co.diff.status() == 'CLEAN'
+    co.close()
+
+
+def test_digest_of_previous_format_rebuilt(repo, array5by7):
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset[0] = array5by7
+    # digest sums stored by previous versions in place of the index
+    with repo._env.stageenv.begin(write=True) as txn:
+        txn.delete(b'~:#')
+        txn.put(b'~:', b'0' * 2048)
+        txn.put(b'~:a:aset', b'0' * 2048)
+    aset[1] = array5by7 + 1
+    _assert_digest_matches_records(repo)
+    with repo._env.stageenv.begin(write=True) as txn:
+        assert txn.get(b'~:a:aset') is None
+    co.close()
+
+
+def test_commit_hash_uses_sorted_record_digests(repo, array5by7):
+    """commit hashes are identical to those calculated by earlier releases."""
+    from hashlib import blake2b
+    from hangar.records import commiting
+
+    co = repo.checkout(write=True)
+    aset = co.arraysets.init_arrayset('aset', prototype=array5by7)
+    aset[0] = array5by7
+    co.metadata['foo'] = 'bar'
+    cmt = co.commit('first')
+    co.close()
+
+    db_kvs = commiting.get_commit_ref(repo._env.refenv, cmt)
+    recordDigests = sorted(blake2b(b' '.join(kv), digest_size=20).hexdigest() for kv in db_kvs)
+    refsDigest = blake2b(''.join(recordDigests).encode(), digest_size=20).hexdigest()
+    assert _commit_digest(repo._env.refenv, cmt, refsDigest) == cmt
@@ -0,0 +1,164 @@
+import threading
+
+import pytest
+import numpy as np
+
+from hangar.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue(object):
+
+    def test_invalid_maxsize_fails(self):
+        with pytest.raises(ValueError):
+            WriteBehindQueue(0)
+        with pytest.raises(ValueError):
+            WriteBehindQueue(1.5)
+
+    def test_results_applied_in_order_on_flush(self):
+        wbq = WriteBehindQueue(4)
+        results, synced = [], []
+
+        def sync():
+            synced.append(True)
+
+        for i in range(10):
+            wbq.submit(lambda i=i: i * 2, results.append, sync=sync)
+        wbq.flush()
+        assert results == [i * 2 for i in range(10)]
+        assert len(synced) == 1
+        assert len(wbq) == 0
+        wbq.close()
+
+    def test_submit_blocks_when_full(self):
+        wbq = WriteBehindQueue(1)
+        release = threading.Event()
+        wbq.submit(release.wait, lambda res: None)   # taken by the worker thread
+        wbq.submit(lambda: None, lambda res: None)   # fills the queue
+        submitted = threading.Event()
+
+        def producer():
+            wbq.submit(lambda: None, lambda res: None)
+            submitted.set()
+
+        t = threading.Thread(target=producer)
+        t.start()
+        assert submitted.wait(0.2) is False
+        release.set()
+        assert submitted.wait(5) is True
+        t.join()
+        wbq.close()
+
+    def test_error_raised_once_and_later_writes_discarded(self):
+        wbq = WriteBehindQueue(8)
+        release = threading.Event()
+        results = []
+
+        def fail():
+            release.wait()
+            raise OSError('disk full')
+
+        wbq.submit(lambda: 'first', results.append)
+        wbq.submit(fail, results.append)
+        wbq.submit(lambda: 'third', results.append)
+        release.set()
+        with pytest.raises(RuntimeError, match='disk full'):
+            wbq.flush()
+        assert results == ['first', None, None]
+        wbq.flush()
+        wbq.submit(lambda: 'fourth', results.append)
+        wbq.close()
+        assert results[-1] == 'fourth'
+
+
+@pytest.fixture(params=['00', '10'])
+def write_behind_aset(request, repo):
+    co = repo.checkout(write=True, write_behind=4)
+    co.arraysets.init_arrayset('aset', shape=(5, 7), dtype=np.float32,
+                               backend_opts=request.param)
+    yield co
+
+
+class TestWriteBehindCheckout(object):
+
+    def test_added_samples_readable_and_committed(self, write_behind_aset):
+        co = write_behind_aset
+        assert co.write_behind is True
+        aset = co.arraysets['aset']
+        buf = np.zeros((5, 7), dtype=np.float32)
+        for i in range(20):
+            buf[:] = i
+            aset[str(i)] = buf  # buffer is reused by the producer
+        assert len(aset) == 20
+        for i in range(20):
+            assert np.allclose(aset[str(i)], i)
+        co.commit('write behind')
+        co.close()
+
+    def test_commit_stores_queued_samples(self, repo, write_behind_aset):
+        co = write_behind_aset
+        with co.arraysets['aset'] as aset:
+            for i in range(10):
+                aset[i] = np.full((5, 7), i, dtype=np.float32)
+        co.arraysets['aset'][3] = np.full((5, 7), 30, dtype=np.float32)
+        co.commit('write behind')
+        co.close()
+
+        rco = repo.checkout()
+        raset = rco.arraysets['aset']
+        assert len(raset) == 10
+        assert np.allclose(raset[3], 30)
+        assert np.allclose(raset[9], 9)
+        rco.close()
+
+    def test_last_add_of_queued_name_wins(self, write_behind_aset):
+        co = write_behind_aset
+        aset = co.arraysets['aset']
+        aset['a'] = np.ones((5, 7), dtype=np.float32)
+        aset['b'] = np.ones((5, 7), dtype=np.float32)
+        aset['a'] = np.full((5, 7), 2, dtype=np.float32)
+        aset['a'] = np.ones((5, 7), dtype=np.float32)
+        assert np.allclose(aset['a'], 1)
+        assert np.allclose(aset['b'], 1)
+        assert len(aset) == 2
+        co.close()
+
+    def test_write_error_raised_on_commit(self, write_behind_aset, monkeypatch):
+        co = write_behind_aset
+        aset = co.arraysets['aset']
+        aset['ok'] = np.ones((5, 7), dtype=np.float32)
+        co.flush()
+
+        accessor = aset._fs[aset.backend]
+
+        def fail(*args, **kwargs):
+            raise OSError('disk full')
+
+        monkeypatch.setattr(accessor, 'write_data', fail)
+        aset['bad'] = np.zeros((5, 7), dtype=np.float32)
+        with pytest.raises(RuntimeError, match='disk full'):
+            co.commit('should fail')
+        assert 'bad' not in aset
+        assert 'ok' in aset
+        monkeypatch.undo()
+
+        aset['bad'] = np.zeros((5, 7), dtype=np.float32)
+        co.commit('now passes')
+        assert np.allclose(aset['bad'], 0)
+        co.close()
+
+    def test_close_stores_queued_samples(self, repo, write_behind_aset):
+        co = write_behind_aset
+        aset = co.arraysets['aset']
+        for i in range(10):
+            aset[i] = np.full((5, 7), i, dtype=np.float32)
+        co.close()
+
+        wco = repo.checkout(write=True)
+        assert len(wco.arraysets['aset']) == 10
+        assert np.allclose(wco.arraysets['aset'][7], 7)
+        wco.close()
+
+
+def test_write_behind_not_allowed_for_reader_checkout(written_repo):
+    with pytest.raises(ValueError):
+        written_repo.checkout(write_behind=8)